@@ -10,6 +10,10 @@ from flask import request, current_app
 
 app = create_app()
 
+# Escalate complaints that pass their SLA deadline (COMPLAINT_SLA_SCHEDULER)
+from app.sla import start_sla_scheduler
+start_sla_scheduler(app)
+
 # Add CORS middleware to the app with better error handling
 CORS(app, 
      origins=["http://localhost:3000", "http://localhost:8080"],
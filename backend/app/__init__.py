@@ -3,15 +3,27 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from config import Config
 import logging
 from logging.handlers import RotatingFileHandler
 import os
+import sqlite3
 
 db = SQLAlchemy()
 jwt = JWTManager()
 mail = Mail()
 
+@event.listens_for(Engine, 'connect')
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Use WAL so readers never block the writer, and wait for write locks instead of failing"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA busy_timeout=15000')
+        cursor.close()
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -24,6 +36,9 @@ def create_app(config_class=Config):
     # Initialize extensions
     db.init_app(app)
     jwt.init_app(app)
+    # Password reset tokens are not logins
+    from app.tokens import reject_reset_tokens
+    jwt.token_in_blocklist_loader(reject_reset_tokens)
     mail.init_app(app)
     
     # Configure CORS to allow requests from frontend origins
@@ -47,6 +62,22 @@ def create_app(config_class=Config):
     with app.app_context():
         db.create_all()
         create_default_admin(app)
+        
+        # Full-text index for admin search, maintained by triggers
+        from app.search import install_search_index
+        try:
+            install_search_index()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.warning(f"Search index not installed at startup: {str(e)}")
+        
+        # Prefix index for admin student search; built lazily if this fails
+        from app.student_search import build_student_index
+        try:
+            build_student_index()
+        except Exception as e:
+            app.logger.warning(f"Student search index not built at startup: {str(e)}")
     
     # Configure logging
     if not app.debug and not app.testing:
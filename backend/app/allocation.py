@@ -0,0 +1,123 @@
+"""Batch room allocation for pending enrollment requests.
+
+plan_allocation() is a pure function over plain records (anything with the
+attributes used below, ORM rows included) so it can be dry-run and tested
+without a database. It runs in O(students + rooms * capacity): students are
+packed group by group, and every room sits in a handful of FIFO queues that
+are consumed from the front, so no student ever scans the room list.
+"""
+from collections import defaultdict, deque, namedtuple
+
+Placement = namedtuple('Placement', ['student', 'room'])
+Unplaced = namedtuple('Unplaced', ['student', 'reason'])
+
+
+def group_key(course, semesters_requested):
+    """Students sharing a course and stay length are housed together"""
+    return ((course or '').strip().lower(), semesters_requested or 0)
+
+
+def _normalize_type(room_type):
+    return (room_type or '').strip().lower() or None
+
+
+class _RoomPool:
+    """Rooms of one type that still have free seats.
+
+    A room is offered to a group in this order: rooms already shared with
+    members of the same group, then empty rooms (so a group fills fresh
+    rooms together), then any partially occupied room.
+    """
+
+    def __init__(self):
+        self.grouped = defaultdict(deque)
+        self.empty = deque()
+        self.partial = deque()
+        self._grouped_members = set()
+
+    def queue(self, stage, group):
+        if stage == 'grouped':
+            return self.grouped[group]
+        return self.empty if stage == 'empty' else self.partial
+
+    def add_group_member(self, room_id, group):
+        if (room_id, group) not in self._grouped_members:
+            self._grouped_members.add((room_id, group))
+            self.grouped[group].append(room_id)
+
+
+def _next_room(pools, group, free):
+    for stage in ('grouped', 'empty', 'partial'):
+        for pool in pools:
+            queue = pool.queue(stage, group)
+            # Lazily drop rooms filled since they were queued
+            while queue and free[queue[0]] <= 0:
+                queue.popleft()
+            if queue:
+                return pool, stage, queue[0]
+    return None, None, None
+
+
+def plan_allocation(students, rooms, occupant_groups=None):
+    """Pack students into rooms.
+
+    students - pending students with id, course, semesters_requested and
+               preferred_room_type
+    rooms - candidate rooms with id, room_number, room_type, capacity and
+            occupied_count
+    occupant_groups - {room_id: iterable of group_key()} for the students
+                      already living in each room
+
+    Returns (placements, unplaced).
+    """
+    occupant_groups = occupant_groups or {}
+    rooms_by_id = {}
+    free = {}
+    pools = defaultdict(_RoomPool)
+
+    for room in sorted(rooms, key=lambda r: (-(r.capacity or 0), r.room_number or '', r.id)):
+        seats = (room.capacity or 0) - (room.occupied_count or 0)
+        if seats <= 0:
+            continue
+        rooms_by_id[room.id] = room
+        free[room.id] = seats
+        pool = pools[_normalize_type(room.room_type)]
+        if not room.occupied_count:
+            pool.empty.append(room.id)
+        else:
+            pool.partial.append(room.id)
+            for key in occupant_groups.get(room.id, ()):
+                pool.add_group_member(room.id, key)
+
+    # Biggest groups first so they get the empty rooms; students with a room
+    # type preference are placed before the ones who will take any room
+    groups = defaultdict(list)
+    for student in sorted(students, key=lambda s: s.id):
+        groups[group_key(student.course, student.semesters_requested)].append(student)
+    ordered_groups = sorted(groups.items(), key=lambda item: (-len(item[1]), item[0]))
+
+    all_pools = [pools[room_type] for room_type in sorted(pools, key=lambda t: t or '')]
+    placements = []
+    unplaced = []
+
+    for key, members in ordered_groups:
+        members.sort(key=lambda s: (_normalize_type(s.preferred_room_type) is None, s.id))
+        for student in members:
+            preferred = _normalize_type(student.preferred_room_type)
+            candidates = [pools[preferred]] if preferred else all_pools
+            pool, stage, room_id = _next_room(candidates, key, free)
+            if room_id is None:
+                reason = f'No free {student.preferred_room_type} room' if preferred else 'No free rooms'
+                unplaced.append(Unplaced(student, reason))
+                continue
+
+            free[room_id] -= 1
+            if stage == 'empty':
+                pool.empty.popleft()
+                if free[room_id] > 0:
+                    pool.partial.append(room_id)
+            if free[room_id] > 0:
+                pool.add_group_member(room_id, key)
+            placements.append(Placement(student, rooms_by_id[room_id]))
+
+    return placements, unplaced
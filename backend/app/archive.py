@@ -0,0 +1,286 @@
+"""Semester rollover archival of students who have left the hostel.
+
+Rejected students nobody has touched for ARCHIVE_REJECTED_AFTER_DAYS, and
+students whose stay has ended (see app.stay), are moved out of the live
+tables together with their attendance, fees, fee notifications, leave
+requests, fingerprint, waitlist entry, room moves and complaints (with the
+replies, reply notifications and SLA escalation alerts). Each row is kept as JSON in ArchivedStudent / ArchivedRecord, so
+the archive stays queryable and a student can be restored as they were.
+Complaint signatures and LSH bands are derived from the text, so they are
+dropped rather than archived and rebuilt on restore.
+
+Students still holding a seat are skipped; the expiry job frees their room
+first. The job works in batches of ARCHIVE_BATCH_SIZE students, one
+transaction each, with one SELECT, INSERT and DELETE per table per batch.
+Their User rows are kept so the email stays reserved and restore has an
+account to attach to.
+"""
+import json
+import uuid
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, insert, or_, select
+
+from app import db
+from app.models import (
+    User, Student, StudentTombstone, Attendance, Fee, FeeNotification, RoomNotification,
+    LeaveRequest, FingerprintData, RoomWaitlistEntry, RoomChangeRequest, Complaint, ComplaintReply,
+    ComplaintNotification, ComplaintEscalation, ComplaintSignature, ComplaintBand,
+    ArchivedStudent, ArchivedRecord
+)
+from app.clustering import assign_cluster
+from app.stay import stay_ended
+from app.student_search import mark_students_changed
+
+ARCHIVE_BATCH_SIZE = 200
+
+# record type -> (model, column holding the owner); restored in this order and
+# deleted in the reverse
+ARCHIVED_TABLES = {
+    'attendance': (Attendance, Attendance.student_id),
+    'fee': (Fee, Fee.student_id),
+    'fee_notification': (FeeNotification, FeeNotification.student_id),
+    'room_notification': (RoomNotification, RoomNotification.student_id),
+    'leave_request': (LeaveRequest, LeaveRequest.student_id),
+    'fingerprint_data': (FingerprintData, FingerprintData.student_id),
+    'room_waitlist_entry': (RoomWaitlistEntry, RoomWaitlistEntry.student_id),
+    'room_change_request': (RoomChangeRequest, RoomChangeRequest.student_id),
+    'complaint': (Complaint, Complaint.user_id),
+    'complaint_reply': (ComplaintReply, ComplaintReply.complaint_id),
+    'complaint_notification': (ComplaintNotification, ComplaintNotification.complaint_id),
+    'complaint_escalation': (ComplaintEscalation, ComplaintEscalation.complaint_id)
+}
+# Complaint children that are not archived
+DERIVED_TABLES = (
+    (ComplaintSignature, ComplaintSignature.complaint_id),
+    (ComplaintBand, ComplaintBand.complaint_id)
+)
+COMPLAINT_CHILDREN = ('complaint_reply', 'complaint_notification', 'complaint_escalation')
+
+
+class ArchiveError(ValueError):
+    """Raised when a student cannot be restored"""
+
+
+def _dump(row):
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in row.items()
+    })
+
+
+def _load(table, data):
+    values = json.loads(data)
+    for column in table.columns:
+        value = values.get(column.key)
+        if value is None:
+            continue
+        if isinstance(column.type, db.DateTime):
+            values[column.key] = datetime.fromisoformat(value)
+        elif isinstance(column.type, db.Date):
+            values[column.key] = date.fromisoformat(value)
+    return values
+
+
+def _candidates(today):
+    rejected_before = datetime.utcnow() - timedelta(days=current_app.config.get('ARCHIVE_REJECTED_AFTER_DAYS', 30))
+    seated = and_(Student.room_id.isnot(None), Student.is_approved == True, Student.status == 'active')
+    return and_(~seated, or_(
+        and_(Student.status == 'rejected', Student.is_enrollment_requested == False,
+             Student.updated_at < rejected_before),
+        stay_ended(today)
+    ))
+
+
+class _Row:
+    """A selected student: the student table columns plus name, email and reason"""
+
+    def __init__(self, mapping):
+        self.name = mapping['name']
+        self.email = mapping['email']
+        self.reason = mapping['reason']
+        self.student = {column.key: mapping[column.key] for column in Student.__table__.columns}
+
+
+def _archive_batch(students, batch_id, now):
+    """Move one batch of (Student row, name, email, reason) into the archive"""
+    student_ids = [row.student['id'] for row in students]
+    owner = {row.student['id']: row.student['id'] for row in students}
+    user_owner = {row.student['user_id']: row.student['id'] for row in students}
+    records = 0
+
+    complaint_owner = {}
+    deletes = []
+    for record_type, (model, column) in ARCHIVED_TABLES.items():
+        if record_type == 'complaint':
+            keys, owners = list(user_owner), user_owner
+        elif record_type in COMPLAINT_CHILDREN:
+            keys, owners = list(complaint_owner), complaint_owner
+        else:
+            keys, owners = student_ids, owner
+        if not keys:
+            continue
+        rows = db.session.execute(select(model.__table__).where(column.in_(keys))).mappings().all()
+        if not rows:
+            continue
+        if record_type == 'complaint':
+            complaint_owner = {row['id']: user_owner[row['user_id']] for row in rows}
+        db.session.execute(insert(ArchivedRecord), [
+            {'student_id': owners[row[column.key]], 'record_type': record_type,
+             'record_id': row['id'], 'data': _dump(row)}
+            for row in rows
+        ])
+        deletes.append(delete(model.__table__).where(column.in_(keys)))
+        records += len(rows)
+
+    if complaint_owner:
+        deletes.extend(delete(model.__table__).where(column.in_(list(complaint_owner)))
+                       for model, column in DERIVED_TABLES)
+    # Children before the rows they reference
+    for statement in reversed(deletes):
+        db.session.execute(statement)
+
+    db.session.execute(insert(ArchivedStudent), [
+        {'student_id': row.student['id'], 'user_id': row.student['user_id'], 'name': row.name,
+         'email': row.email, 'roll_number': row.student['roll_number'], 'course': row.student['course'],
+         'status': row.student['status'], 'reason': row.reason, 'batch_id': batch_id,
+         'archived_at': now, 'data': _dump(row.student)}
+        for row in students
+    ])
+    # Core DELETE skips the ORM hook, so write the delta-sync tombstones here
+    db.session.execute(delete(Student.__table__).where(Student.id.in_(student_ids)))
+    db.session.execute(insert(StudentTombstone), [
+        {'student_id': student_id, 'deleted_at': now} for student_id in student_ids
+    ])
+    mark_students_changed(student_ids)
+    return records
+
+
+def archive_students(today=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive every eligible student, committing batch by batch.
+
+    Returns {'batch_id', 'students', 'records', 'batches'}.
+    """
+    today = today or datetime.utcnow().date()
+    batch_id = uuid.uuid4().hex
+    summary = {'batch_id': batch_id, 'students': 0, 'records': 0, 'batches': 0}
+    condition = _candidates(today)
+    reason = case((Student.status == 'rejected', 'rejected'), else_='stay_ended')
+
+    while True:
+        page = db.session.execute(
+            select(Student.__table__, User.name, User.email, reason.label('reason'))
+            .join(User, Student.user_id == User.id)
+            .where(condition)
+            .order_by(Student.id)
+            .limit(batch_size)
+        ).mappings().all()
+        if not page:
+            break
+        students = [_Row(row) for row in page]
+        now = datetime.utcnow()
+        summary['records'] += _archive_batch(students, batch_id, now)
+        db.session.commit()
+        summary['students'] += len(students)
+        summary['batches'] += 1
+    return summary
+
+
+def archived_student(student_id):
+    """Return the archive entry for a student with its records grouped by type, or None"""
+    archived = ArchivedStudent.query.filter_by(student_id=student_id).first()
+    if archived is None:
+        return None
+    data = archived.to_dict()
+    data['student'] = json.loads(archived.data)
+    data['records'] = {record_type: [] for record_type in ARCHIVED_TABLES}
+    for record in ArchivedRecord.query.filter_by(student_id=student_id).order_by(
+            ArchivedRecord.record_type, ArchivedRecord.record_id):
+        data['records'][record.record_type].append(json.loads(record.data))
+    return data
+
+
+def list_archived_students(q=None, after_id=None, limit=50):
+    """Return (students, next_after_id) for one page of the archive, newest first by id"""
+    query = ArchivedStudent.query
+    if q:
+        pattern = f'%{q.lower()}%'
+        query = query.filter(or_(
+            db.func.lower(ArchivedStudent.name).like(pattern),
+            db.func.lower(ArchivedStudent.email).like(pattern),
+            db.func.lower(ArchivedStudent.roll_number).like(pattern)
+        ))
+    if after_id:
+        query = query.filter(ArchivedStudent.id < after_id)
+    rows = query.order_by(ArchivedStudent.id.desc()).limit(limit).all()
+    next_after_id = rows[-1].id if len(rows) == limit else None
+    return [row.to_dict() for row in rows], next_after_id
+
+
+def _insert(table, values, taken):
+    """Insert a restored row, letting the database pick a new id if its old one was reused"""
+    if values['id'] in taken:
+        old_id = values.pop('id')
+        new_id = db.session.execute(insert(table).returning(table.c.id), [values]).scalar_one()
+        return old_id, new_id
+    db.session.execute(insert(table), [values])
+    return values['id'], values['id']
+
+
+def restore_student(student_id):
+    """Move an archived student and their records back into the live tables.
+
+    Returns (student, restored record count); the caller commits. The
+    student comes back with the status they were archived with, not seated.
+    """
+    archived = ArchivedStudent.query.filter_by(student_id=student_id).first()
+    if archived is None:
+        raise ArchiveError('Student is not archived')
+    if db.session.get(User, archived.user_id) is None:
+        raise ArchiveError("The student's user account no longer exists")
+    if Student.query.filter_by(user_id=archived.user_id).first():
+        raise ArchiveError('The user already has a new student record')
+
+    values = _load(Student.__table__, archived.data)
+    if Student.query.filter_by(roll_number=values['roll_number']).first():
+        raise ArchiveError(f"Roll number {values['roll_number']} has been given to another student")
+    values['updated_at'] = datetime.utcnow()
+    taken = set(db.session.execute(select(Student.id).where(Student.id == values['id'])).scalars())
+    _, new_student_id = _insert(Student.__table__, values, taken)
+
+    records = ArchivedRecord.query.filter_by(student_id=student_id).all()
+    by_type = {}
+    for record in records:
+        by_type.setdefault(record.record_type, []).append(record)
+
+    complaint_ids, reply_ids = {}, {}
+    for record_type, (model, column) in ARCHIVED_TABLES.items():
+        table = model.__table__
+        rows = [_load(table, record.data) for record in by_type.get(record_type, [])]
+        if not rows:
+            continue
+        taken = set(db.session.execute(
+            select(table.c.id).where(table.c.id.in_([row['id'] for row in rows]))
+        ).scalars())
+        for row in rows:
+            if 'student_id' in row:
+                row['student_id'] = new_student_id
+            if record_type in COMPLAINT_CHILDREN:
+                row['complaint_id'] = complaint_ids.get(row['complaint_id'], row['complaint_id'])
+            if record_type == 'complaint_notification':
+                row['reply_id'] = reply_ids.get(row['reply_id'], row['reply_id'])
+            old_id, new_id = _insert(table, row, taken)
+            if record_type == 'complaint':
+                complaint_ids[old_id] = new_id
+            elif record_type == 'complaint_reply':
+                reply_ids[old_id] = new_id
+
+    # Re-cluster the complaints, which also rebuilds their signatures
+    for complaint in Complaint.query.filter(Complaint.id.in_(list(complaint_ids.values()))).order_by(Complaint.id):
+        assign_cluster(complaint, now=complaint.created_at)
+
+    db.session.execute(delete(ArchivedRecord).where(ArchivedRecord.student_id == student_id))
+    db.session.delete(archived)
+    mark_students_changed([new_student_id])
+    return db.session.get(Student, new_student_id), len(records)
@@ -0,0 +1,118 @@
+"""Approve and reject many students in one transaction.
+
+All referenced students and rooms are loaded with one query each. Seats are
+then budgeted across the whole batch in memory: rejections run first and
+return their seats, and each approval takes a seat from its room's budget
+or fails on its own. Everything that passed is applied with one counter
+UPDATE per affected room for the seats freed and one for the seats taken
+(see app.occupancy), and committed once by the caller.
+"""
+from datetime import datetime
+
+from app.models import Room, Student
+from app.occupancy import occupies_seat, release_rooms, seat_students
+
+ACTIONS = ('approve', 'reject')
+MAX_DECISIONS = 1000
+
+
+def _result(index, item, success, message, **extra):
+    result = {
+        'index': index,
+        'student_id': item.get('student_id') if isinstance(item, dict) else None,
+        'action': item.get('action') if isinstance(item, dict) else None,
+        'success': success,
+        'message': message
+    }
+    result.update(extra)
+    return result
+
+
+def apply_decisions(decisions):
+    """Validate and apply a list of {student_id, action, room_id, course} decisions.
+
+    Returns (results, deltas): a result dict per decision in input order,
+    and room id -> net change in occupancy. Raises RoomFullError if a room
+    filled up concurrently; the caller rolls back in that case.
+    """
+    results = [None] * len(decisions)
+    valid = []
+    seen = set()
+    for i, item in enumerate(decisions):
+        if (not isinstance(item, dict) or item.get('action') not in ACTIONS
+                or not isinstance(item.get('student_id'), int)):
+            results[i] = _result(i, item, False, "Each decision needs a student_id and an action of 'approve' or 'reject'")
+        elif item['action'] == 'approve' and not isinstance(item.get('room_id'), int):
+            results[i] = _result(i, item, False, 'Room assignment is required for approval')
+        elif item['student_id'] in seen:
+            results[i] = _result(i, item, False, 'Student appears more than once in this batch')
+        else:
+            seen.add(item['student_id'])
+            valid.append((i, item))
+
+    students = {
+        student.id: student
+        for student in Student.query.filter(Student.id.in_([item['student_id'] for _, item in valid])).all()
+    }
+    rooms = {
+        room.id: room
+        for room in Room.query.filter(Room.id.in_({item['room_id'] for _, item in valid if item.get('room_id')})).all()
+    }
+
+    rejections = []
+    approvals = []
+    for i, item in valid:
+        student = students.get(item['student_id'])
+        if student is None:
+            results[i] = _result(i, item, False, 'Student not found')
+        elif item['action'] == 'reject':
+            rejections.append((i, item, student))
+        elif item['room_id'] not in rooms:
+            results[i] = _result(i, item, False, 'Selected room does not exist')
+        else:
+            approvals.append((i, item, student, rooms[item['room_id']]))
+
+    # Free seats per room, after the rejections in this batch
+    free = {room.id: room.get_capacity() - room.get_occupancy() for room in rooms.values()}
+    for _, _, student in rejections:
+        if occupies_seat(student) and student.room_id in free:
+            free[student.room_id] += 1
+
+    placements = []
+    for i, item, student, room in approvals:
+        already_seated = occupies_seat(student) and student.room_id == room.id
+        if not already_seated and free[room.id] <= 0:
+            results[i] = _result(i, item, False, f'Room {room.room_number} is full', room_full=True)
+            continue
+        if not already_seated:
+            free[room.id] -= 1
+            if occupies_seat(student) and student.room_id in free:
+                free[student.room_id] += 1
+        placements.append((student, room))
+        results[i] = _result(i, item, True, 'Student approved and room assigned',
+                             room_id=room.id, room_number=room.room_number)
+
+    now = datetime.utcnow()
+    rejected = [student for _, _, student in rejections]
+    freed = release_rooms(rejected)
+    for i, item, student in rejections:
+        student.status = 'rejected'
+        student.is_enrollment_requested = False
+        student.is_approved = False
+        student.approval_date = None
+        student.join_date = None
+        results[i] = _result(i, item, True, 'Student removed from the hostel')
+
+    approved_items = {item['student_id']: item for i, item, _, _ in approvals if results[i]['success']}
+    for student, _ in placements:
+        student.approval_date = now
+        if not student.join_date:
+            student.join_date = now.date()
+        if 'course' in approved_items[student.id]:
+            student.course = approved_items[student.id]['course']
+    seated = seat_students(placements)
+
+    deltas = dict(seated)
+    for room_id, count in freed.items():
+        deltas[room_id] = deltas.get(room_id, 0) - count
+    return results, {room_id: delta for room_id, delta in deltas.items() if delta}
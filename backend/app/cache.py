@@ -0,0 +1,138 @@
+"""In-process caches of data derived from room assignments.
+
+Caches declared here are stored per application (in app.extensions) and are
+invalidated after a commit that changed room membership. Changes are picked
+up automatically from ORM flushes of Student and Room rows; code that
+updates rooms with bulk SQL (see app.occupancy) calls mark_rooms_changed()
+itself. Invalidation happens after commit so a request running concurrently
+can never re-cache the data the transaction is about to replace.
+
+The caches live in process memory, so every worker keeps its own copy and
+rebuilds it on its own commits only.
+"""
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+ALL_ROOMS = None
+
+_caches = []
+
+# Student columns that change what room listings and occupant lists show
+_STUDENT_FIELDS = ('room_id', 'is_approved', 'status', 'profile_picture', 'course',
+                   'semesters_requested', 'date_of_birth', 'roll_number')
+
+
+def _store(name):
+    state = current_app.extensions.setdefault('hms_cache', {})
+    if name not in state:
+        state[name] = {'lock': threading.Lock(), 'generation': 0, 'values': {}}
+    return state[name]
+
+
+class Snapshot:
+    """A single value built on first use and dropped on any room change"""
+
+    def __init__(self, name, builder):
+        self.name = name
+        self.builder = builder
+        _caches.append(self)
+
+    def get(self):
+        store = _store(self.name)
+        with store['lock']:
+            if 'value' in store['values']:
+                return store['values']['value']
+            generation = store['generation']
+        value = self.builder()
+        with store['lock']:
+            # Only keep the value if nothing changed while it was being built
+            if store['generation'] == generation:
+                store['values']['value'] = value
+        return value
+
+    def invalidate(self, room_ids=ALL_ROOMS):
+        store = _store(self.name)
+        with store['lock']:
+            store['generation'] += 1
+            store['values'].clear()
+
+
+class RoomCache:
+    """Values cached per room, invalidated room by room"""
+
+    def __init__(self, name, builder):
+        self.name = name
+        self.builder = builder
+        _caches.append(self)
+
+    def get(self, room_id):
+        store = _store(self.name)
+        with store['lock']:
+            if room_id in store['values']:
+                return store['values'][room_id]
+            generation = store['generation']
+        value = self.builder(room_id)
+        with store['lock']:
+            if store['generation'] == generation:
+                store['values'][room_id] = value
+        return value
+
+    def invalidate(self, room_ids=ALL_ROOMS):
+        store = _store(self.name)
+        with store['lock']:
+            store['generation'] += 1
+            if room_ids is ALL_ROOMS:
+                store['values'].clear()
+            else:
+                for room_id in room_ids:
+                    store['values'].pop(room_id, None)
+
+
+def mark_rooms_changed(room_ids=ALL_ROOMS, session=None):
+    """Record that the current transaction changed these rooms (None means all)"""
+    from app import db
+    session = session or db.session()
+    pending = session.info.get('hms_changed_rooms', set())
+    if room_ids is ALL_ROOMS or pending is ALL_ROOMS:
+        session.info['hms_changed_rooms'] = ALL_ROOMS
+    else:
+        pending.update(room_id for room_id in room_ids if room_id)
+        session.info['hms_changed_rooms'] = pending
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_room_changes(session, flush_context, instances):
+    from app.models import Room, Student, User
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Room):
+            mark_rooms_changed([obj.id] if obj.id else ALL_ROOMS, session)
+        elif isinstance(obj, Student):
+            state = inspect(obj)
+            changed = obj in session.new or obj in session.deleted or any(
+                state.attrs[field].history.has_changes() for field in _STUDENT_FIELDS
+            )
+            if changed:
+                history = state.attrs.room_id.history
+                mark_rooms_changed(set(history.deleted or ()) | {obj.room_id}, session)
+        elif isinstance(obj, User) and obj in session.dirty:
+            if inspect(obj).attrs.name.history.has_changes():
+                # A renamed occupant - cheaper to rebuild than to look up their room here
+                mark_rooms_changed(ALL_ROOMS, session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if 'hms_changed_rooms' not in session.info:
+        return
+    room_ids = session.info.pop('hms_changed_rooms')
+    if not has_app_context():
+        return
+    for cache in _caches:
+        cache.invalidate(room_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('hms_changed_rooms', None)
@@ -0,0 +1,109 @@
+"""Delta sync for the admin student roster.
+
+Student.updated_at is bumped by the ORM on every change to the student row
+(room assignment included) and, by the flush hook below, whenever something
+the roster shows about the student lives in another table: the user's name
+or email, the room's number or type, or the fingerprint record. Deleted
+students leave a StudentTombstone. A client therefore only needs to ask for
+students updated, and tombstones written, after its cursor.
+
+Cursors are timestamps held back by SETTLE_SECONDS, so a transaction that
+stamped its rows a moment before committing is still picked up by the next
+poll. Rows near the cursor may be returned twice; clients apply them as
+upserts.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, exists, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Student, User, Room, FingerprintData, StudentTombstone
+from app.roster import roster_query, serialize_roster_row
+
+SETTLE_SECONDS = 5
+
+_USER_FIELDS = ('name', 'email')
+_ROOM_FIELDS = ('room_number', 'room_type')
+
+
+class ChangeCursorError(ValueError):
+    """Raised for a cursor that was not issued by this endpoint"""
+
+
+def encode_cursor(timestamp):
+    return timestamp.isoformat(timespec='microseconds')
+
+
+def decode_cursor(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ChangeCursorError('Invalid cursor')
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _touch_students(session, flush_context):
+    user_ids, room_ids, student_ids = set(), set(), set()
+    for obj in session.dirty:
+        if isinstance(obj, User) and _changed(obj, _USER_FIELDS):
+            user_ids.add(obj.id)
+        elif isinstance(obj, Room) and _changed(obj, _ROOM_FIELDS):
+            room_ids.add(obj.id)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, FingerprintData) and obj.student_id:
+            student_ids.add(obj.student_id)
+    if not (user_ids or room_ids or student_ids):
+        return
+
+    conditions = []
+    if user_ids:
+        conditions.append(Student.user_id.in_(user_ids))
+    if room_ids:
+        conditions.append(Student.room_id.in_(room_ids))
+    if student_ids:
+        conditions.append(Student.id.in_(student_ids))
+    # Core UPDATE: no version bump, so concurrent edits of the student are unaffected
+    session.connection().execute(
+        update(Student.__table__).where(or_(*conditions)).values(updated_at=datetime.utcnow())
+    )
+
+
+@event.listens_for(Student, 'after_delete')
+def _write_tombstone(mapper, connection, target):
+    connection.execute(insert(StudentTombstone.__table__).values(
+        student_id=target.id, deleted_at=datetime.utcnow()
+    ))
+
+
+def student_changes(since=None):
+    """Return (students, removed_ids, cursor) for changes after since.
+
+    Without since every student is returned. An idle poll costs a single
+    query that probes the updated_at and deleted_at indexes.
+    """
+    cursor = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    if since is None:
+        rows = roster_query(None).all()
+        return [serialize_roster_row(row) for row in rows], [], encode_cursor(cursor)
+
+    cursor = max(cursor, since)
+    changed = db.session.query(or_(
+        exists().where(Student.updated_at > since),
+        exists().where(StudentTombstone.deleted_at > since)
+    )).scalar()
+    if not changed:
+        return [], [], encode_cursor(cursor)
+
+    rows = roster_query(None).filter(Student.updated_at > since).all()
+    removed = db.session.execute(
+        select(StudentTombstone.student_id)
+        .where(StudentTombstone.deleted_at > since)
+        .order_by(StudentTombstone.id)
+    ).scalars().all()
+    return [serialize_roster_row(row) for row in rows], removed, encode_cursor(cursor)
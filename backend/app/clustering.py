@@ -0,0 +1,251 @@
+"""Near-duplicate complaint clustering and bulk replies.
+
+When something breaks for a whole block, dozens of students file nearly the
+same complaint. Each complaint is clustered as it arrives: its subject and
+details are cut into character shingles and reduced to a MinHash signature
+of NUM_HASHES minima, which is split into BANDS bands. Each band is hashed
+to an LSH bucket and stored in ComplaintBand, so the complaints it may be
+close to are found with one index lookup on its BANDS buckets instead of
+comparing it with every complaint. Of those candidates, the pending one
+whose signature agrees on the most positions (an estimate of the Jaccard
+similarity of the shingles) gives its cluster if the agreement reaches
+COMPLAINT_CLUSTER_THRESHOLD; otherwise the complaint starts a new cluster.
+
+With 32 bands of 3 rows, a pair at 0.5 similarity shares a bucket 98 times
+in 100 and one at 0.1 (unrelated complaints) about 3 times in 100. The cluster is decided once,
+on arrival; editing a complaint does not move it.
+
+reply_to_cluster() answers every complaint in a cluster with one INSERT of
+the replies and one of the student notifications, whatever its size.
+"""
+import re
+import zlib
+from datetime import datetime
+from hashlib import blake2b
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import and_, delete, false, func, insert, literal, or_, select, true, update
+
+from app import db
+from app.complaints import decode_cursor, summarize_complaints, DEFAULT_PAGE_SIZE
+from app.models import (
+    Complaint, ComplaintCluster, ComplaintSignature, ComplaintBand, ComplaintReply, ComplaintNotification
+)
+from app.sla import queue_deadlines
+
+SHINGLE_SIZE = 5
+NUM_HASHES = 96
+BANDS = 32
+ROWS = NUM_HASHES // BANDS
+DTYPE = np.dtype('<u4')
+CLUSTER_BATCH_SIZE = 500
+OPEN_STATUS = 'Pending'
+
+# Universal hashing (a * x + b) mod a Mersenne prime; fixed seed so stored
+# signatures stay comparable across restarts
+_PRIME = (1 << 31) - 1
+_random = np.random.RandomState(20240601)
+_A = _random.randint(1, _PRIME, size=NUM_HASHES).astype(np.uint64)
+_B = _random.randint(0, _PRIME, size=NUM_HASHES).astype(np.uint64)
+
+
+class ClusterReplyError(ValueError):
+    """Raised for a cluster reply that cannot be sent"""
+
+
+def _shingles(text):
+    words = ' '.join(re.findall(r'\w+', (text or '').lower()))
+    if len(words) <= SHINGLE_SIZE:
+        return {words} if words else set()
+    return {words[i:i + SHINGLE_SIZE] for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature of text, or None if it has no words"""
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    values = np.fromiter((zlib.crc32(shingle.encode()) % _PRIME for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    hashes = (_A[:, None] * values[None, :] + _B[:, None]) % _PRIME
+    return hashes.min(axis=1).astype(DTYPE)
+
+
+def buckets(signature):
+    """One LSH bucket per band, as signed 64-bit integers"""
+    return [
+        int.from_bytes(blake2b(bytes([band]) + signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                               digest_size=8).digest(), 'little', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(first == second)) / NUM_HASHES
+
+
+def _complaint_text(complaint):
+    return f'{complaint.subject} {complaint.details}'
+
+
+def forget_complaint(complaint_id):
+    """Delete a complaint's signature and bands"""
+    db.session.execute(delete(ComplaintBand).where(ComplaintBand.complaint_id == complaint_id))
+    db.session.execute(delete(ComplaintSignature).where(ComplaintSignature.complaint_id == complaint_id))
+
+
+def assign_cluster(complaint, now=None):
+    """Put a complaint in the cluster of its most similar pending complaint, or a new one.
+
+    The complaint must be in the session; it is flushed. Returns its cluster
+    id. The caller commits.
+    """
+    now = now or datetime.utcnow()
+    threshold = current_app.config.get('COMPLAINT_CLUSTER_THRESHOLD', 0.5)
+    db.session.flush()
+    # Rows of an earlier complaint that had this id (e.g. one since archived)
+    forget_complaint(complaint.id)
+
+    signature = minhash(_complaint_text(complaint))
+    best, best_similarity = None, threshold
+    if signature is not None:
+        complaint_buckets = buckets(signature)
+        candidates = db.session.execute(
+            select(ComplaintSignature.signature, Complaint.cluster_id)
+            .join(Complaint, Complaint.id == ComplaintSignature.complaint_id)
+            .where(ComplaintSignature.complaint_id.in_(
+                       select(ComplaintBand.complaint_id).where(ComplaintBand.bucket.in_(complaint_buckets))),
+                   Complaint.status == OPEN_STATUS, Complaint.cluster_id.isnot(None),
+                   Complaint.id != complaint.id)
+        ).all()
+        for row in candidates:
+            score = similarity(signature, np.frombuffer(row.signature, dtype=DTYPE))
+            if score >= best_similarity:
+                best, best_similarity = row.cluster_id, score
+        db.session.execute(insert(ComplaintSignature), [
+            {'complaint_id': complaint.id, 'signature': signature.tobytes()}
+        ])
+        db.session.execute(insert(ComplaintBand), [
+            {'bucket': bucket, 'complaint_id': complaint.id} for bucket in complaint_buckets
+        ])
+
+    if best is None:
+        cluster = ComplaintCluster(created_at=now, updated_at=now)
+        db.session.add(cluster)
+        db.session.flush()
+        best = cluster.id
+    else:
+        db.session.execute(update(ComplaintCluster).where(ComplaintCluster.id == best).values(updated_at=now))
+    complaint.cluster_id = best
+    return best
+
+
+def cluster_complaints(batch_size=CLUSTER_BATCH_SIZE):
+    """Cluster every complaint that has no cluster yet, oldest first, committing batch by batch.
+
+    For complaints written before clustering existed or with bulk SQL.
+    Returns the number clustered.
+    """
+    clustered = 0
+    while True:
+        complaints = Complaint.query.filter(Complaint.cluster_id.is_(None)).order_by(Complaint.id).limit(batch_size).all()
+        if not complaints:
+            return clustered
+        for complaint in complaints:
+            assign_cluster(complaint, now=complaint.created_at)
+        db.session.commit()
+        clustered += len(complaints)
+
+
+def cluster_page(status=None, min_size=1, before=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (clusters, next_before) for one page, most recently joined first.
+
+    Each cluster has its complaints (with reply_count and last_reply, newest
+    first), size and pending count. status limits the page to clusters with
+    a complaint of that status; before is a cursor from a previous page.
+    """
+    size = (select(func.count()).where(Complaint.cluster_id == ComplaintCluster.id)
+            .correlate(ComplaintCluster).scalar_subquery())
+    query = select(ComplaintCluster).where(size >= min_size)
+    if status:
+        query = query.where(select(Complaint.id).where(
+            Complaint.cluster_id == ComplaintCluster.id, Complaint.status == status
+        ).correlate(ComplaintCluster).exists())
+    if before:
+        updated_at, cluster_id = decode_cursor(before)
+        query = query.where(or_(
+            ComplaintCluster.updated_at < updated_at,
+            and_(ComplaintCluster.updated_at == updated_at, ComplaintCluster.id < cluster_id)
+        ))
+    clusters = db.session.execute(
+        query.order_by(ComplaintCluster.updated_at.desc(), ComplaintCluster.id.desc()).limit(limit)
+    ).scalars().all()
+
+    members = {cluster.id: [] for cluster in clusters}
+    complaints = Complaint.query.filter(Complaint.cluster_id.in_(list(members))).order_by(
+        Complaint.created_at.desc(), Complaint.id.desc()).all()
+    for complaint, data in zip(complaints, summarize_complaints(complaints)):
+        members[complaint.cluster_id].append(data)
+
+    items = []
+    for cluster in clusters:
+        complaints = members[cluster.id]
+        items.append({
+            'id': cluster.id,
+            'subject': complaints[-1]['subject'] if complaints else None,
+            'size': len(complaints),
+            'pending': sum(1 for complaint in complaints if complaint['status'] == OPEN_STATUS),
+            'created_at': cluster.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': cluster.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'complaints': complaints
+        })
+    next_before = None
+    if len(clusters) == limit:
+        next_before = f"{clusters[-1].updated_at.isoformat(timespec='microseconds')},{clusters[-1].id}"
+    return items, next_before
+
+
+def reply_to_cluster(cluster_id, admin, content, status=None):
+    """Add the same admin reply to every complaint in a cluster.
+
+    The replies are one INSERT ... SELECT and the students' notifications
+    another; status, if given, is set on every complaint too. Returns the
+    number of replies and of notifications; the caller commits.
+    """
+    content = (content or '').strip()
+    if not content:
+        raise ClusterReplyError('Reply content is required')
+
+    now = datetime.utcnow()
+    members = select(
+        literal(content), Complaint.id, literal(admin.id), true(), literal(now)
+    ).where(Complaint.cluster_id == cluster_id)
+    replies = db.session.execute(insert(ComplaintReply).from_select(
+        ['content', 'complaint_id', 'user_id', 'is_admin', 'created_at'], members
+    )).rowcount
+    if not replies:
+        raise ClusterReplyError('Cluster has no complaints')
+
+    # The replies just written are the ones by this admin at this instant
+    recipients = select(
+        Complaint.user_id, Complaint.id, ComplaintReply.id, false(), literal(now)
+    ).join(ComplaintReply, ComplaintReply.complaint_id == Complaint.id).where(
+        Complaint.cluster_id == cluster_id, Complaint.user_id != admin.id,
+        ComplaintReply.user_id == admin.id, ComplaintReply.created_at == now
+    )
+    notifications = db.session.execute(insert(ComplaintNotification).from_select(
+        ['student_user_id', 'complaint_id', 'reply_id', 'is_viewed', 'created_at'], recipients
+    )).rowcount
+    if status:
+        statement = update(Complaint).where(Complaint.cluster_id == cluster_id)
+        if status == OPEN_STATUS:
+            # Reopened complaints can be escalated again
+            rows = db.session.execute(
+                statement.values(status=status, escalated_at=None).returning(Complaint.deadline, Complaint.id)
+            ).all()
+            queue_deadlines(db.session, [tuple(row) for row in rows])
+        else:
+            db.session.execute(statement.values(status=status))
+    return replies, notifications
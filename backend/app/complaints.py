@@ -0,0 +1,213 @@
+"""Complaint and reply serialization.
+
+Complaints are listed with their replies and the names and profile details
+of everyone involved. Serializing them one by one costs a User and a
+Student lookup per complaint and per reply; here replies are loaded with
+selectinload and the authors and their student profiles with one IN query
+each, so a list costs the same handful of queries however long it is.
+Complaint.to_dict() and ComplaintReply.to_dict() go through the same path.
+
+Paged listings are keyset-paginated on (created_at, id), newest first, and
+carry a reply count and a preview of the last reply instead of every
+reply; the replies themselves are paged oldest first on the same key.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import User, Student, Complaint, ComplaintReply
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PREVIEW_LENGTH = 140
+
+
+class ComplaintListError(ValueError):
+    """Raised for an invalid listing filter or cursor"""
+
+
+def _authors(user_ids):
+    """Return {user_id: name} and {user_id: (profile_picture, roll_number)} for the given users"""
+    if not user_ids:
+        return {}, {}
+    names = dict(db.session.execute(
+        select(User.id, User.name).where(User.id.in_(user_ids))
+    ).all())
+    students = {
+        row.user_id: (row.profile_picture, row.roll_number)
+        for row in db.session.execute(
+            select(Student.user_id, Student.profile_picture, Student.roll_number)
+            .where(Student.user_id.in_(user_ids))
+        )
+    }
+    return names, students
+
+
+def _reply_dict(reply, names, students):
+    # Admin replies never show a student profile picture
+    student = students.get(reply.user_id) if not reply.is_admin else None
+    return {
+        'id': reply.id,
+        'complaint_id': reply.complaint_id,
+        'user_id': reply.user_id,
+        'user_name': names.get(reply.user_id, "Unknown"),
+        'user_profile_picture': student[0] if student else None,
+        'content': reply.content,
+        'is_admin': reply.is_admin,
+        'created_at': reply.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'updated_at': reply.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def _format(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+def _complaint_dict(complaint, names, students, replies):
+    student = students.get(complaint.user_id)
+    return {
+        'id': complaint.id,
+        'subject': complaint.subject,
+        'details': complaint.details,
+        'status': complaint.status,
+        'priority': complaint.priority,
+        'deadline': _format(complaint.deadline),
+        'escalated_at': _format(complaint.escalated_at),
+        'cluster_id': complaint.cluster_id,
+        'user_id': complaint.user_id,
+        'student_id': complaint.user_id,
+        'student_name': names.get(complaint.user_id, "Unknown"),
+        'student_profile_picture': student[0] if student else None,
+        'student_roll_number': student[1] if student else None,
+        'created_at': complaint.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'updated_at': complaint.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'replies': [_reply_dict(reply, names, students) for reply in replies]
+    }
+
+
+def serialize_replies(replies):
+    """Serialize complaint replies with their authors resolved in one query each"""
+    names, students = _authors({reply.user_id for reply in replies})
+    return [_reply_dict(reply, names, students) for reply in replies]
+
+
+def serialize_complaints(complaints):
+    """Serialize complaints with their replies, oldest reply first.
+
+    Load the complaints with complaint_query() (or selectinload replies) so
+    the replies do not cost a query per complaint.
+    """
+    user_ids = {complaint.user_id for complaint in complaints}
+    user_ids.update(reply.user_id for complaint in complaints for reply in complaint.replies)
+    names, students = _authors(user_ids)
+    return [_complaint_dict(complaint, names, students, complaint.replies) for complaint in complaints]
+
+
+def complaint_query():
+    """Complaint query with the replies eager-loaded"""
+    return Complaint.query.options(selectinload(Complaint.replies))
+
+
+def encode_cursor(complaint):
+    return f"{complaint.created_at.isoformat(timespec='microseconds')},{complaint.id}"
+
+
+def decode_cursor(value):
+    try:
+        created_at, complaint_id = value.split(',')
+        return datetime.fromisoformat(created_at), int(complaint_id)
+    except (AttributeError, ValueError):
+        raise ComplaintListError('Invalid cursor')
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ComplaintListError('limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ComplaintListError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return limit
+
+
+def _reply_summaries(complaint_ids):
+    """Return {complaint_id: (reply count, last reply)} with one windowed query"""
+    if not complaint_ids:
+        return {}
+    ranked = select(
+        ComplaintReply,
+        func.count().over(partition_by=ComplaintReply.complaint_id).label('reply_count'),
+        func.row_number().over(
+            partition_by=ComplaintReply.complaint_id,
+            order_by=(ComplaintReply.created_at.desc(), ComplaintReply.id.desc())
+        ).label('position')
+    ).where(ComplaintReply.complaint_id.in_(complaint_ids)).subquery()
+    last = db.aliased(ComplaintReply, ranked)
+    rows = db.session.execute(
+        select(last, ranked.c.reply_count).where(ranked.c.position == 1)
+    ).all()
+    return {reply.complaint_id: (count, reply) for reply, count in rows}
+
+
+def complaint_page(user_id=None, status=None, before=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (complaints, next_before) for one page, newest first.
+
+    user_id limits the page to one student's complaints; before is a cursor
+    from a previous page. Each complaint has reply_count and last_reply (a
+    preview) instead of the replies.
+    """
+    query = Complaint.query
+    if user_id is not None:
+        query = query.filter(Complaint.user_id == user_id)
+    if status:
+        query = query.filter(Complaint.status == status)
+    if before:
+        created_at, complaint_id = decode_cursor(before)
+        query = query.filter(or_(
+            Complaint.created_at < created_at,
+            and_(Complaint.created_at == created_at, Complaint.id < complaint_id)
+        ))
+    complaints = query.order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(limit).all()
+    next_before = encode_cursor(complaints[-1]) if len(complaints) == limit else None
+    return summarize_complaints(complaints), next_before
+
+
+def summarize_complaints(complaints):
+    """Serialize complaints with reply_count and a last_reply preview instead of the replies"""
+    summaries = _reply_summaries([complaint.id for complaint in complaints])
+    last_replies = [summary[1] for summary in summaries.values()]
+    names, students = _authors({complaint.user_id for complaint in complaints}
+                               | {reply.user_id for reply in last_replies})
+    items = []
+    for complaint in complaints:
+        count, last_reply = summaries.get(complaint.id, (0, None))
+        data = _complaint_dict(complaint, names, students, [])
+        del data['replies']
+        data['reply_count'] = count
+        data['last_reply'] = None
+        if last_reply is not None:
+            data['last_reply'] = _reply_dict(last_reply, names, students)
+            content = last_reply.content
+            data['last_reply']['content'] = content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH] + '…'
+        items.append(data)
+    return items
+
+
+def reply_page(complaint_id, after=None, limit=MAX_PAGE_SIZE):
+    """Return (replies, next_after) for a complaint's replies after reply id after, oldest first"""
+    query = ComplaintReply.query.filter(ComplaintReply.complaint_id == complaint_id)
+    if after:
+        anchor = db.session.get(ComplaintReply, after)
+        if anchor is None or anchor.complaint_id != complaint_id:
+            raise ComplaintListError('after must be a reply of this complaint')
+        query = query.filter(or_(
+            ComplaintReply.created_at > anchor.created_at,
+            and_(ComplaintReply.created_at == anchor.created_at, ComplaintReply.id > anchor.id)
+        ))
+    replies = query.order_by(ComplaintReply.created_at, ComplaintReply.id).limit(limit).all()
+    next_after = replies[-1].id if len(replies) == limit else None
+    return serialize_replies(replies), next_after
@@ -1,4 +1,5 @@
 from flask import render_template, current_app
+from markupsafe import escape
 from flask_mail import Message
 from app import mail
 from threading import Thread
@@ -64,4 +65,45 @@ def send_password_reset_otp_email(email, otp_code):
     </div>
     """
     
-    send_email("HMS Password Reset", email, html_content) 
\ No newline at end of file
+    send_email("HMS Password Reset", email, html_content)
+
+def send_room_allocation_email(email, name, room_number):
+    """Tell a waitlisted student that a room has been allocated to them"""
+    html_content = f"""
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #eee; border-radius: 10px; box-shadow: 0 0 10px rgba(0,0,0,0.1);">
+        <h2 style="color: #4a5568; text-align: center;">Hostel Management System</h2>
+        <div style="padding: 20px; background-color: #f8f9fa; border-radius: 8px; margin-top: 20px;">
+            <h3 style="color: #2d3748; margin-bottom: 15px;">Room Allocated</h3>
+            <p style="color: #4a5568; margin-bottom: 20px;">Hi {escape(name)}, a seat has opened up and you have been allocated room <strong>{escape(room_number)}</strong>.</p>
+            <p style="color: #4a5568;">Your enrollment request is now approved. Log in to the HMS portal to see your room details.</p>
+        </div>
+        <p style="color: #a0aec0; font-size: 12px; text-align: center; margin-top: 20px;">
+            &copy; {2023} Hostel Management System. All rights reserved.
+        </p>
+    </div>
+    """
+    
+    send_email("HMS Room Allocated", email, html_content)
+
+def send_complaint_escalation_email(email, name, complaints):
+    """Tell an admin which complaints have passed their SLA deadline unresolved"""
+    rows = ''.join(
+        f"<li style=\"margin-bottom: 8px;\"><strong>#{complaint_id} {escape(subject)}</strong> "
+        f"({priority} priority, due {deadline.strftime('%Y-%m-%d %H:%M')} UTC)</li>"
+        for complaint_id, subject, priority, deadline in complaints
+    )
+    html_content = f"""
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #eee; border-radius: 10px; box-shadow: 0 0 10px rgba(0,0,0,0.1);">
+        <h2 style="color: #4a5568; text-align: center;">Hostel Management System</h2>
+        <div style="padding: 20px; background-color: #f8f9fa; border-radius: 8px; margin-top: 20px;">
+            <h3 style="color: #2d3748; margin-bottom: 15px;">Overdue Complaints</h3>
+            <p style="color: #4a5568; margin-bottom: 20px;">Hi {escape(name)}, these complaints are still pending past their deadline:</p>
+            <ul style="color: #4a5568;">{rows}</ul>
+        </div>
+        <p style="color: #a0aec0; font-size: 12px; text-align: center; margin-top: 20px;">
+            &copy; {2023} Hostel Management System. All rights reserved.
+        </p>
+    </div>
+    """
+    
+    send_email("HMS Complaints Overdue", email, html_content)
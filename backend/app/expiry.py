@@ -0,0 +1,89 @@
+"""Expiry of students whose stay in the hostel has ended.
+
+Active students whose stay (see app.stay) ended are marked inactive and
+lose their room assignment. Each batch is one SELECT of ids and one UPDATE
+of the student table, whatever the batch size; the freed seats then go
+through app.occupancy with one counter UPDATE per room, and on to the room
+waitlists, before the batch commits.
+
+The UPDATE matches each student on (id, version) and bumps the version,
+so a student edited concurrently is skipped (and picked up on the next
+run) and the concurrent ORM edit still gets its StaleDataError.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, tuple_, update
+
+from app import db
+from app.cache import mark_rooms_changed
+from app.models import Student
+from app.occupancy import release_seats
+from app.stay import stay_ended
+from app.student_search import mark_students_changed
+from app.waitlist import fill_freed_seat
+
+EXPIRY_BATCH_SIZE = 500
+
+
+def _expire_loaded(student_ids):
+    """Expire Student objects loaded in the session so they re-read the new row"""
+    for student_id in student_ids:
+        student = db.session.identity_map.get(db.session.identity_key(Student, student_id))
+        if student is not None:
+            db.session.expire(student)
+
+
+def expire_students(today=None, batch_size=EXPIRY_BATCH_SIZE):
+    """Mark every active student whose stay ended by today inactive, committing batch by batch.
+
+    Returns {'expired', 'batches', 'freed_seats', 'promoted'}: the number of
+    students expired, room id -> seats freed, and the Students given a freed
+    seat from the waitlist (the caller may email them).
+    """
+    today = today or datetime.utcnow().date()
+    condition = stay_ended(today)
+    students = Student.__table__.c
+    summary = {'expired': 0, 'batches': 0, 'freed_seats': {}, 'promoted': []}
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(students.id, students.version, students.room_id, students.is_approved)
+            .where(students.status == 'active', students.id > last_id, condition)
+            .order_by(students.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        now = datetime.utcnow()
+        expired = set(db.session.execute(
+            update(Student.__table__)
+            .where(tuple_(students.id, students.version).in_([(row.id, row.version) for row in rows]),
+                   students.status == 'active')
+            .values(status='inactive', room_id=None, updated_at=now, version=students.version + 1)
+            .returning(students.id)
+        ).scalars())
+        _expire_loaded(expired)
+
+        released = [
+            (row.id, row.room_id if row.is_approved else None)
+            for row in rows if row.id in expired
+        ]
+        freed = release_seats(released)
+        mark_rooms_changed({row.room_id for row in rows if row.id in expired and row.room_id})
+        mark_students_changed(expired)
+
+        for room_id, count in freed.items():
+            for _ in range(count):
+                student = fill_freed_seat(room_id)
+                if student is None:
+                    break
+                summary['promoted'].append(student)
+            summary['freed_seats'][room_id] = summary['freed_seats'].get(room_id, 0) + count
+        db.session.commit()
+
+        summary['expired'] += len(expired)
+        summary['batches'] += 1
+    return summary
@@ -11,6 +11,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), default='student')  # student, admin
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     complaints = db.relationship('Complaint', backref='author', lazy='dynamic')
     feedbacks = db.relationship('Feedback', backref='author', lazy='dynamic')
     
@@ -39,30 +40,40 @@ class Room(db.Model):
     room_number = db.Column(db.String(20), unique=True, nullable=False)
     room_type = db.Column(db.String(20), nullable=False)  # Single, Double, Triple
     status = db.Column(db.String(20), default='Vacant')  # Vacant, Occupied
+    block = db.Column(db.String(50), nullable=True)  # Building / block name
+    floor = db.Column(db.Integer, nullable=True)
+    capacity = db.Column(db.Integer, nullable=False, default=4, server_default='4')
+    # Denormalized count of approved, active students in this room.
+    # Maintained by app.occupancy - never assign it directly.
+    occupied_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     students = db.relationship('Student', backref='room', lazy='dynamic')
     
+    __table_args__ = (
+        db.Index('idx_room_location', 'block', 'floor', 'room_number'),
+    )
+    
     def get_occupancy(self):
         """Get current number of students in this room"""
-        return self.students.filter_by(is_approved=True, status='active').count()
+        return self.occupied_count or 0
     
     def get_capacity(self):
         """Get maximum capacity of this room (default is 4)"""
-        return 4  # Standard capacity for all rooms
+        return self.capacity or 4
     
     def is_full(self):
         """Check if room is at full capacity"""
         return self.get_occupancy() >= self.get_capacity()
     
     def to_dict(self):
-        occupancy = self.get_occupancy()
-        capacity = self.get_capacity()
         return {
             'id': self.id,
             'room_number': self.room_number,
             'room_type': self.room_type,
+            'block': self.block,
+            'floor': self.floor,
             'status': self.status,
-            'occupied': occupancy,
-            'capacity': capacity,
+            'occupied': self.get_occupancy(),
+            'capacity': self.get_capacity(),
             'is_full': self.is_full()
         }
 
@@ -83,8 +94,14 @@ class Student(db.Model):
     contact_number = db.Column(db.String(20), nullable=True)
     date_of_birth = db.Column(db.Date, nullable=True)
     semesters_requested = db.Column(db.Integer, nullable=True, default=1)
+    preferred_room_type = db.Column(db.String(20), nullable=True)  # Single, Double, Triple or None for any
     status = db.Column(db.String(20), default='active', nullable=True)
     is_enrollment_requested = db.Column(db.Boolean, default=False)  # Track if student has requested enrollment
+    # Optimistic locking - concurrent updates to the same student fail with StaleDataError
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Bumped on any change to the student row, including room assignment, and
+    # by app.changes when the student's user, room or fingerprint changes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     attendance = db.relationship('Attendance', backref='student', lazy='dynamic')
     fees = db.relationship('Fee', backref='student', lazy='dynamic')
@@ -92,6 +109,8 @@ class Student(db.Model):
     fingerprint = db.relationship('FingerprintData', backref='student', uselist=False)
     leave_requests = db.relationship('LeaveRequest', backref='student', lazy='dynamic')
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -106,11 +125,149 @@ class Student(db.Model):
             'contact_number': self.contact_number,
             'date_of_birth': self.date_of_birth.strftime('%Y-%m-%d') if self.date_of_birth else None,
             'semesters_requested': self.semesters_requested,
+            'preferred_room_type': self.preferred_room_type,
             'status': self.status,
             'is_enrollment_requested': self.is_enrollment_requested,
-            'has_fingerprint': self.fingerprint is not None
+            'has_fingerprint': bool(self.has_fingerprint)
+        }
+
+class StudentTombstone(db.Model):
+    """Record of a deleted student, so delta-syncing clients can drop it"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class ArchivedStudent(db.Model):
+    """A student moved out of the live tables by app.archive, with the row needed to restore it"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=True)
+    email = db.Column(db.String(100), nullable=True)
+    roll_number = db.Column(db.String(20), nullable=True)
+    course = db.Column(db.String(100), nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    reason = db.Column(db.String(20), nullable=False)  # rejected, stay_ended
+    batch_id = db.Column(db.String(32), nullable=False, index=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON of the student row
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': self.student_id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'email': self.email,
+            'roll_number': self.roll_number,
+            'course': self.course,
+            'status': self.status,
+            'reason': self.reason,
+            'batch_id': self.batch_id,
+            'archived_at': self.archived_at.strftime('%Y-%m-%d %H:%M:%S')
         }
 
+class ArchivedRecord(db.Model):
+    """A row of an archived student's history (attendance, fees, complaints, ...)"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False)
+    record_type = db.Column(db.String(30), nullable=False)  # Name of the table the row came from
+    record_id = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON of the row
+    
+    __table_args__ = (
+        db.Index('idx_archived_record_student', 'student_id', 'record_type', 'record_id'),
+    )
+
+class RoomWaitlistEntry(db.Model):
+    """Pending student queued for a seat in a specific room or any room of a type"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False, unique=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=True)  # Waiting for this room
+    room_type = db.Column(db.String(20), nullable=True)  # Or for any room of this type
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    student = db.relationship('Student')
+    
+    # FIFO order per queue - the head of each queue is a single index seek
+    __table_args__ = (
+        db.Index('idx_waitlist_room', 'room_id', 'id'),
+        db.Index('idx_waitlist_room_type', 'room_type', 'room_id', 'id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': self.student_id,
+            'room_type': self.room_type,
+            'created_by': self.created_by,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+class RoomChangeRequest(db.Model):
+    """A student's move from one room to another, applied as part of a batch"""
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(32), nullable=False, index=True)  # Moves applied in the same transaction
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    from_room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=True)
+    to_room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
+    cycle = db.Column(db.Integer, nullable=True)  # Index of the swap cycle within the batch, if any
+    status = db.Column(db.String(20), default='Completed')  # Completed
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'batch_id': self.batch_id,
+            'student_id': self.student_id,
+            'from_room_id': self.from_room_id,
+            'to_room_id': self.to_room_id,
+            'cycle': self.cycle,
+            'status': self.status,
+            'requested_by': self.requested_by,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
+        }
+
+class OccupancyEvent(db.Model):
+    """Append-only log of students taking (+1) or leaving (-1) a room seat"""
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=True)
+    delta = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class RoomOccupancySeries(db.Model):
+    """End-of-day occupancy of a room for one year, built from OccupancyEvent.
+
+    counts is a packed little-endian int16 array with one entry per day of
+    the year (366 entries, index = day of year - 1). Maintained by
+    app.occupancy_history - never write it directly.
+    """
+    room_id = db.Column(db.Integer, db.ForeignKey('room.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    counts = db.Column(db.LargeBinary, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_occupancy_series_year', 'year', 'room_id'),
+    )
+
+class OccupancyHistoryCursor(db.Model):
+    """Id of the last OccupancyEvent folded into RoomOccupancySeries (single row)"""
+    id = db.Column(db.Integer, primary_key=True)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+
+class ComplaintCluster(db.Model):
+    """Near-identical complaints (e.g. many students reporting the same outage)"""
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last complaint joined
+    
+    __table_args__ = (
+        db.Index('idx_complaint_cluster_updated', 'updated_at', 'id'),
+    )
+
 class Complaint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     subject = db.Column(db.String(100), nullable=False)
@@ -118,27 +275,45 @@ class Complaint(db.Model):
     status = db.Column(db.String(20), default='Pending')  # Pending, Resolved
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    replies = db.relationship('ComplaintReply', backref='complaint', lazy='dynamic', cascade="all, delete-orphan")
+    priority = db.Column(db.String(10), default='normal')  # low, normal, high, urgent
+    # SLA deadline, set from the priority by app.sla; escalated_at once it has passed
+    deadline = db.Column(db.DateTime, nullable=True)
+    escalated_at = db.Column(db.DateTime, nullable=True)
+    # Group of near-identical complaints, set by app.clustering when the complaint arrives
+    cluster_id = db.Column(db.Integer, db.ForeignKey('complaint_cluster.id'), nullable=True, index=True)
+    # Oldest first; app.complaints eager-loads these for whole lists
+    replies = db.relationship('ComplaintReply', backref='complaint', cascade="all, delete-orphan",
+                              order_by='[ComplaintReply.created_at, ComplaintReply.id]')
+    
+    __table_args__ = (
+        db.Index('idx_complaint_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('idx_complaint_created', 'created_at', 'id'),
+        db.Index('idx_complaint_status_created', 'status', 'created_at', 'id'),
+        db.Index('idx_complaint_status_deadline', 'status', 'deadline'),
+    )
     
     def to_dict(self):
-        # Get student profile information
-        student = Student.query.filter_by(user_id=self.user_id).first()
-        user = User.query.get(self.user_id)
-        
-        return {
-            'id': self.id,
-            'subject': self.subject,
-            'details': self.details,
-            'status': self.status,
-            'user_id': self.user_id,
-            'student_id': self.user_id,
-            'student_name': user.name if user else "Unknown",
-            'student_profile_picture': student.profile_picture if student else None,
-            'student_roll_number': student.roll_number if student else None,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'replies': [reply.to_dict() for reply in self.replies.order_by(ComplaintReply.created_at.asc())]
-        }
+        from app.complaints import serialize_complaints
+        return serialize_complaints([self])[0]
+
+class ComplaintSignature(db.Model):
+    """MinHash signature of a complaint's text.
+
+    signature is a packed little-endian uint32 array, one minimum per hash
+    function. Maintained by app.clustering - never write it directly.
+    """
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+class ComplaintBand(db.Model):
+    """LSH bucket of one band of a complaint's signature, for finding similar complaints"""
+    id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.BigInteger, nullable=False)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False, index=True)
+    
+    __table_args__ = (
+        db.Index('idx_complaint_band_bucket', 'bucket', 'complaint_id'),
+    )
 
 class ComplaintReply(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -148,21 +323,13 @@ class ComplaintReply(db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_complaint_reply_complaint_created', 'complaint_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
-        user = User.query.get(self.user_id)
-        student = Student.query.filter_by(user_id=self.user_id).first() if not self.is_admin else None
-        
-        return {
-            'id': self.id,
-            'complaint_id': self.complaint_id,
-            'user_id': self.user_id,
-            'user_name': user.name if user else "Unknown",
-            'user_profile_picture': student.profile_picture if student else None,
-            'content': self.content,
-            'is_admin': self.is_admin,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
+        from app.complaints import serialize_replies
+        return serialize_replies([self])[0]
 
 class Feedback(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -189,6 +356,11 @@ class Fee(db.Model):
     status = db.Column(db.String(20), default='Pending')  # Pending, Paid
     due_date = db.Column(db.DateTime, nullable=True)
     payment_date = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_fee_student_created', 'student_id', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -198,7 +370,8 @@ class Fee(db.Model):
             'amount': self.amount,
             'status': self.status,
             'due_date': self.due_date.strftime('%Y-%m-%d') if self.due_date else None,
-            'payment_date': self.payment_date.strftime('%Y-%m-%d') if self.payment_date else None
+            'payment_date': self.payment_date.strftime('%Y-%m-%d') if self.payment_date else None,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
         }
 
 class Attendance(db.Model):
@@ -208,6 +381,10 @@ class Attendance(db.Model):
     status = db.Column(db.String(20), nullable=False)  # Present, Absent
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_attendance_student_timestamp', 'student_id', 'timestamp', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -240,6 +417,10 @@ class FeeNotification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_fee_notification_student_created', 'student_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -251,6 +432,29 @@ class FeeNotification(db.Model):
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
         }
 
+class RoomNotification(db.Model):
+    """In-app notice to a student about their room, e.g. a seat allocated from the waitlist"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_room_notification_student_created', 'student_id', 'created_at', 'id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': self.student_id,
+            'title': self.title,
+            'content': self.content,
+            'is_read': self.is_read,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
 class OTP(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(100), nullable=False)
@@ -310,7 +514,7 @@ class OTP(db.Model):
 
 class FingerprintData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False, index=True)
     right_thumb_template = db.Column(db.Text, nullable=True)  # Store right thumb fingerprint template
     left_thumb_template = db.Column(db.Text, nullable=True)   # Store left thumb fingerprint template
     device_id = db.Column(db.String(50), nullable=True)  # Track which device was used
@@ -329,6 +533,12 @@ class FingerprintData(db.Model):
             'last_updated': self.last_updated.strftime('%Y-%m-%d %H:%M:%S')
         }
 
+# Whether the student has enrolled a fingerprint, loaded with the student as an
+# EXISTS subquery so serializing students never reads the template columns
+Student.has_fingerprint = db.column_property(
+    db.exists().where(FingerprintData.student_id == Student.id)
+)
+
 class AttendanceWindow(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     is_open = db.Column(db.Boolean, default=False)
@@ -356,6 +566,10 @@ class LeaveRequest(db.Model):
     processed_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     admin_response = db.Column(db.Text, nullable=True)  # For denial reasons or additional notes
     
+    __table_args__ = (
+        db.Index('idx_leave_request_student_created', 'student_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -419,6 +633,29 @@ class ComplaintNotification(db.Model):
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
         }
 
+class ComplaintEscalation(db.Model):
+    """Alert an admin that a complaint passed its SLA deadline unresolved"""
+    id = db.Column(db.Integer, primary_key=True)
+    admin_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False)
+    is_viewed = db.Column(db.Boolean, default=False)
+    viewed_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_complaint_escalation_admin_viewed', 'admin_user_id', 'is_viewed'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'admin_user_id': self.admin_user_id,
+            'complaint_id': self.complaint_id,
+            'is_viewed': self.is_viewed,
+            'viewed_at': self.viewed_at.strftime('%Y-%m-%d %H:%M:%S') if self.viewed_at else None,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
 class NoticeNotification(db.Model):
     """Track when students view notices"""
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,239 @@
+"""Room occupancy bookkeeping.
+
+Room.occupied_count is a denormalized count of the approved, active students
+assigned to a room. Every code path that changes a student's room assignment
+goes through the helpers in this module so the counter stays exact and room
+listings never have to COUNT the student table.
+
+Seats are reserved with a conditional UPDATE (occupied_count + n <= capacity)
+instead of a read-check-write, so concurrent approvals can never overfill a
+room and no lock is held while the request validates its input. Student has
+a version column, so two admins deciding on the same student at once cannot
+both move their seat; the loser gets a StaleDataError on flush.
+
+Every seat taken or freed is also appended to the OccupancyEvent log, which
+app.occupancy_history folds into per-room daily occupancy series.
+"""
+from sqlalchemy import String, case, cast, func, insert, select, update
+from app import db
+from app.models import Room, Student, RoomWaitlistEntry, OccupancyEvent
+from app.cache import mark_rooms_changed
+
+
+class RoomFullError(Exception):
+    """Raised when a room has no free seat left for a reservation"""
+
+    def __init__(self, room_id):
+        super().__init__(f'Room {room_id} is full')
+        self.room_id = room_id
+
+
+def occupies_seat(student):
+    """Check if a student currently counts towards their room's occupancy"""
+    return bool(student.room_id) and bool(student.is_approved) and student.status == 'active'
+
+
+def _room_status(count, capacity):
+    """SQL expression for the human readable room status"""
+    return case(
+        (count >= capacity, 'Fully Occupied'),
+        (count > 0, cast(count, String) + '/' + cast(capacity, String)),
+        else_='Vacant'
+    )
+
+
+def _expire_room(room_id):
+    """Expire a loaded Room so the next access re-reads the counter"""
+    room = db.session.identity_map.get(db.session.identity_key(Room, room_id))
+    if room is not None:
+        db.session.expire(room, ['occupied_count', 'status'])
+
+
+def adjust_occupancy(room_id, delta):
+    """Atomically add delta to a room's occupied_count and refresh its status.
+
+    Positive deltas only succeed while the room has enough free seats;
+    otherwise nothing is written and RoomFullError is raised.
+    """
+    if not room_id or not delta:
+        return
+    new_count = Room.occupied_count + delta
+    statement = update(Room).where(Room.id == room_id)
+    if delta > 0:
+        statement = statement.where(new_count <= Room.capacity)
+    result = db.session.execute(
+        statement
+        .values(occupied_count=new_count, status=_room_status(new_count, Room.capacity))
+        .execution_options(synchronize_session=False)
+    )
+    _expire_room(room_id)
+    if result.rowcount == 0 and delta > 0:
+        raise RoomFullError(room_id)
+    mark_rooms_changed([room_id])
+
+
+def resize_room(room_id, capacity):
+    """Atomically set a room's capacity and refresh its status.
+
+    Raises RoomFullError, writing nothing, if more students than that
+    already live in the room.
+    """
+    result = db.session.execute(
+        update(Room)
+        .where(Room.id == room_id, Room.occupied_count <= capacity)
+        .values(capacity=capacity, status=_room_status(Room.occupied_count, capacity))
+        .execution_options(synchronize_session=False)
+    )
+    _expire_room(room_id)
+    if result.rowcount == 0:
+        raise RoomFullError(room_id)
+    mark_rooms_changed([room_id])
+
+
+def _log_seat_changes(changes):
+    """Append (room_id, student_id, delta) rows to the occupancy event log"""
+    rows = [
+        {'room_id': room_id, 'student_id': student_id, 'delta': delta}
+        for room_id, student_id, delta in changes if room_id
+    ]
+    if rows:
+        db.session.execute(insert(OccupancyEvent), rows)
+
+
+def _leave_waitlist(student_ids):
+    """Students who get a seat or are rejected no longer wait for one"""
+    student_ids = [student_id for student_id in student_ids if student_id]
+    if student_ids:
+        RoomWaitlistEntry.query.filter(
+            RoomWaitlistEntry.student_id.in_(student_ids)
+        ).delete(synchronize_session=False)
+
+
+def seat_student(student, room):
+    """Make a student an active occupant of room.
+
+    Moves the student's seat from any room they previously occupied, so
+    re-approving a student into their current room is a no-op for the
+    counters. Returns the id of the room whose seat was freed by the move,
+    or None.
+
+    The seat is reserved before the student is touched, so on RoomFullError
+    nothing has changed and the caller can carry on with its transaction.
+    """
+    previous_room_id = student.room_id if occupies_seat(student) else None
+    if previous_room_id != room.id:
+        adjust_occupancy(room.id, 1)
+        adjust_occupancy(previous_room_id, -1)
+    student.is_approved = True
+    student.status = 'active'
+    student.room_id = room.id
+    if previous_room_id != room.id:
+        _log_seat_changes([(room.id, student.id, 1), (previous_room_id, student.id, -1)])
+    _leave_waitlist([student.id])
+    return previous_room_id if previous_room_id != room.id else None
+
+
+def seat_students(placements):
+    """Seat many students at once.
+
+    placements is an iterable of (student, room) pairs. Student rows are
+    updated in the session and each affected room's counter is adjusted
+    with a single UPDATE, however many students move in or out of it.
+    """
+    deltas = {}
+    seated_ids = []
+    changes = []
+    for student, room in placements:
+        seated_ids.append(student.id)
+        previous_room_id = student.room_id if occupies_seat(student) else None
+        student.is_approved = True
+        student.status = 'active'
+        student.room_id = room.id
+        if previous_room_id != room.id:
+            if previous_room_id:
+                deltas[previous_room_id] = deltas.get(previous_room_id, 0) - 1
+            deltas[room.id] = deltas.get(room.id, 0) + 1
+            changes.append((previous_room_id, student.id, -1))
+            changes.append((room.id, student.id, 1))
+    # Free seats before taking new ones so exchanges between full rooms succeed
+    for room_id, delta in sorted(deltas.items(), key=lambda item: item[1]):
+        adjust_occupancy(room_id, delta)
+    _log_seat_changes(changes)
+    _leave_waitlist(seated_ids)
+    return deltas
+
+
+def release_room(student):
+    """Clear a student's room assignment and free their seat.
+
+    Returns the id of the room whose seat was freed, or None.
+    """
+    freed_room_id = student.room_id if occupies_seat(student) else None
+    adjust_occupancy(freed_room_id, -1)
+    _log_seat_changes([(freed_room_id, student.id, -1)])
+    student.room_id = None
+    _leave_waitlist([student.id])
+    return freed_room_id
+
+
+def release_rooms(students):
+    """Free the seats of many students at once.
+
+    Each affected room's counter is adjusted with a single UPDATE. Returns
+    a dict of room id -> number of seats freed.
+    """
+    freed = {}
+    changes = []
+    for student in students:
+        if occupies_seat(student):
+            freed[student.room_id] = freed.get(student.room_id, 0) + 1
+            changes.append((student.room_id, student.id, -1))
+        student.room_id = None
+    for room_id, count in freed.items():
+        adjust_occupancy(room_id, -count)
+    _log_seat_changes(changes)
+    _leave_waitlist([student.id for student in students])
+    return freed
+
+
+def release_seats(released):
+    """Free the seats of students whose rows were already updated with bulk SQL.
+
+    released is a list of (student_id, room_id) pairs, with room_id None
+    for students who held no seat. Each affected room's counter is adjusted
+    with a single UPDATE. Returns a dict of room id -> number of seats freed.
+    """
+    freed = {}
+    for _, room_id in released:
+        if room_id:
+            freed[room_id] = freed.get(room_id, 0) + 1
+    for room_id, count in freed.items():
+        adjust_occupancy(room_id, -count)
+    _log_seat_changes([(room_id, student_id, -1) for student_id, room_id in released])
+    _leave_waitlist([student_id for student_id, _ in released])
+    return freed
+
+
+def rebuild_occupancy():
+    """Recompute occupied_count for every room from the student table.
+
+    Runs as a single UPDATE with a correlated COUNT subquery. Returns the
+    number of rooms updated. The caller commits.
+    """
+    seats = (
+        select(func.count(Student.id))
+        .where(
+            Student.room_id == Room.id,
+            Student.is_approved == True,
+            Student.status == 'active'
+        )
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Room)
+        .values(occupied_count=seats, status=_room_status(seats, Room.capacity))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.expire_all()
+    mark_rooms_changed()
+    return result.rowcount
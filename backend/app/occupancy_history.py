@@ -0,0 +1,249 @@
+"""Daily occupancy history per room.
+
+app.occupancy appends every seat taken or freed to the OccupancyEvent log.
+update_history() folds the events added since its last run into one
+RoomOccupancySeries row per room and year: a packed int16 array holding the
+room's end-of-day occupancy for each day of that year. Series are extended
+to the current year as time passes, so every year from a room's first event
+onwards has a row, and reading any date range for all rooms is a single
+query returning at most a few hundred bytes per room and year.
+
+Utilization is reported against each room's current capacity; capacity
+changes are not part of the history.
+
+Runs folding events claim them through OccupancyHistoryCursor, so only one
+of them writes. A run that only extends stale series to the current year
+claims nothing; it inserts just the missing rows and leaves a row that a
+concurrent run created first in place.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import Room, OccupancyEvent, RoomOccupancySeries, OccupancyHistoryCursor
+
+DAYS_PER_YEAR = 366
+DTYPE = np.dtype('<i2')
+ROOM_BATCH_SIZE = 500
+
+
+def _day_index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def _unpack(blob):
+    return np.frombuffer(blob, dtype=DTYPE).copy()
+
+
+def _pack(counts):
+    return counts.astype(DTYPE).tobytes()
+
+
+def _extend(series, year):
+    """Make sure series (year -> counts) has a row for every year up to year"""
+    if not series:
+        series[year] = np.zeros(DAYS_PER_YEAR, dtype=DTYPE)
+        return
+    first, last = min(series), max(series)
+    for y in range(year, first):
+        # Before a room's first event it was empty
+        series[y] = np.zeros(DAYS_PER_YEAR, dtype=DTYPE)
+    for y in range(last + 1, year + 1):
+        closing = series[y - 1][_day_index(date(y - 1, 12, 31))]
+        series[y] = np.full(DAYS_PER_YEAR, closing, dtype=DTYPE)
+
+
+def _load_series(room_ids):
+    series = defaultdict(dict)
+    room_ids = list(room_ids)
+    for i in range(0, len(room_ids), ROOM_BATCH_SIZE):
+        rows = db.session.execute(
+            select(RoomOccupancySeries.room_id, RoomOccupancySeries.year, RoomOccupancySeries.counts)
+            .where(RoomOccupancySeries.room_id.in_(room_ids[i:i + ROOM_BATCH_SIZE]))
+        )
+        for room_id, year, counts in rows:
+            series[room_id][year] = _unpack(counts)
+    return series
+
+
+def _insert_series(rows, replace):
+    """Insert series rows; on conflict keep the existing row, or overwrite it if replace"""
+    dialects = {'sqlite': sqlite, 'postgresql': postgresql}
+    dialect = dialects.get(db.engine.dialect.name)
+    if dialect is None:
+        db.session.execute(insert(RoomOccupancySeries), rows)
+        return
+    statement = dialect.insert(RoomOccupancySeries)
+    if replace:
+        statement = statement.on_conflict_do_update(
+            index_elements=['room_id', 'year'], set_={'counts': statement.excluded.counts}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['room_id', 'year'])
+    db.session.execute(statement, rows)
+
+
+def update_history(today=None):
+    """Fold new occupancy events into the daily series.
+
+    Returns the number of events folded. If another transaction is folding
+    the same events, this one does nothing. The caller commits.
+    """
+    today = today or datetime.utcnow().date()
+
+    cursor = db.session.get(OccupancyHistoryCursor, 1)
+    if cursor is None:
+        cursor = OccupancyHistoryCursor(id=1, last_event_id=0)
+        db.session.add(cursor)
+        db.session.flush()
+    start_id = cursor.last_event_id
+
+    events = db.session.execute(
+        select(OccupancyEvent.id, OccupancyEvent.room_id, OccupancyEvent.delta, OccupancyEvent.created_at)
+        .where(OccupancyEvent.id > start_id)
+        .order_by(OccupancyEvent.id)
+    ).all()
+
+    # Rooms whose series stop before the current year
+    stale = db.session.execute(
+        select(RoomOccupancySeries.room_id)
+        .group_by(RoomOccupancySeries.room_id)
+        .having(func.max(RoomOccupancySeries.year) < today.year)
+    ).scalars().all()
+
+    if not events and not stale:
+        return 0
+
+    if events:
+        # Claim the events; a concurrent run that got here first wins
+        claimed = db.session.execute(
+            update(OccupancyHistoryCursor)
+            .where(OccupancyHistoryCursor.id == 1, OccupancyHistoryCursor.last_event_id == start_id)
+            .values(last_event_id=events[-1].id)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount == 0:
+            return 0
+        db.session.expire(cursor)
+
+    # Net change per room and day
+    changes = defaultdict(lambda: defaultdict(int))
+    for _, room_id, delta, created_at in events:
+        changes[room_id][created_at.date()] += delta
+
+    series = _load_series(set(changes) | set(stale))
+    existing = {(room_id, year) for room_id, years in series.items() for year in years}
+
+    for room_id in set(changes) | set(stale):
+        room_series = series[room_id]
+        for day, delta in sorted(changes[room_id].items()):
+            if not delta:
+                continue
+            _extend(room_series, day.year)
+            room_series[day.year][_day_index(day):] += delta
+            for year in room_series:
+                if year > day.year:
+                    room_series[year] += delta
+        _extend(room_series, today.year)
+
+    new_rows, changed_rows = [], []
+    for room_id in set(changes) | set(stale):
+        for year, counts in series[room_id].items():
+            row = {'room_id': room_id, 'year': year, 'counts': _pack(counts)}
+            if (room_id, year) not in existing:
+                new_rows.append(row)
+            elif room_id in changes:
+                # Only rooms with claimed events change existing rows
+                changed_rows.append(row)
+    if new_rows:
+        # A claimed run holds the latest counts; an unclaimed one only fills gaps
+        _insert_series(new_rows, replace=bool(events))
+    if changed_rows:
+        db.session.execute(update(RoomOccupancySeries), changed_rows)
+    return len(events)
+
+
+def utilization(start, end, block=None, include_daily=False):
+    """Daily occupancy of every room between start and end (inclusive).
+
+    Returns a dict with per-room averages and peaks, per-block and overall
+    summaries and the hostel-wide occupancy for each day. With include_daily
+    each room also carries its own daily series.
+    """
+    years = (start.year, end.year)
+    query = db.session.query(
+        Room.id, Room.room_number, Room.block, Room.floor, Room.capacity,
+        RoomOccupancySeries.year, RoomOccupancySeries.counts
+    ).outerjoin(
+        RoomOccupancySeries, db.and_(
+            RoomOccupancySeries.room_id == Room.id,
+            RoomOccupancySeries.year.between(*years)
+        )
+    )
+    if block:
+        query = query.filter(Room.block == block)
+    rows = query.order_by(Room.block, Room.floor, Room.room_number, RoomOccupancySeries.year).all()
+
+    days = (end - start).days + 1
+    rooms = []
+    positions = {}
+    for room_id, room_number, room_block, floor, capacity, _, _ in rows:
+        if room_id not in positions:
+            positions[room_id] = len(rooms)
+            rooms.append({
+                'room_id': room_id,
+                'room_number': room_number,
+                'block': room_block,
+                'floor': floor,
+                'capacity': capacity or 4
+            })
+
+    matrix = np.zeros((len(rooms), days), dtype=np.int32)
+    for room_id, _, _, _, _, year, counts in rows:
+        if year is None:
+            continue
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        offset = (first - start).days
+        matrix[positions[room_id], offset:offset + (last - first).days + 1] = \
+            _unpack(counts)[_day_index(first):_day_index(last) + 1]
+
+    capacities = np.array([room['capacity'] for room in rooms], dtype=np.float64)
+    averages = matrix.mean(axis=1) if days else np.zeros(len(rooms))
+    peaks = matrix.max(axis=1) if len(rooms) else np.zeros(0)
+    for i, room in enumerate(rooms):
+        room['average'] = round(float(averages[i]), 2)
+        room['peak'] = int(peaks[i])
+        room['utilization'] = round(float(averages[i] / capacities[i]), 4)
+        if include_daily:
+            room['daily'] = matrix[i].tolist()
+
+    blocks = defaultdict(lambda: {'rooms': 0, 'capacity': 0, 'average': 0.0})
+    for room in rooms:
+        summary = blocks[room['block']]
+        summary['rooms'] += 1
+        summary['capacity'] += room['capacity']
+        summary['average'] += room['average']
+    for summary in blocks.values():
+        summary['average'] = round(summary['average'], 2)
+        summary['utilization'] = round(summary['average'] / summary['capacity'], 4) if summary['capacity'] else 0
+
+    totals = matrix.sum(axis=0)
+    total_capacity = int(capacities.sum())
+    return {
+        'from': start.strftime('%Y-%m-%d'),
+        'to': end.strftime('%Y-%m-%d'),
+        'capacity': total_capacity,
+        'average': round(float(totals.mean()), 2) if days else 0,
+        'utilization': round(float(totals.mean()) / total_capacity, 4) if total_capacity else 0,
+        'daily': [{
+            'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+            'occupied': int(total)
+        } for i, total in enumerate(totals)],
+        'blocks': [dict(block=name, **summary) for name, summary in blocks.items()],
+        'rooms': rooms
+    }
@@ -0,0 +1,86 @@
+"""Building -> floor -> room -> occupants map for the admin room view.
+
+The whole map is built from one joined query, serialized once and kept as a
+snapshot until a commit changes room membership (see app.cache), so every
+admin poll in between is served straight from the cached bytes.
+"""
+import hashlib
+import json
+from datetime import datetime
+from app import db
+from app.cache import Snapshot
+from app.models import Room, Student, User
+
+UNASSIGNED_BLOCK = 'Unassigned'
+
+
+def _build():
+    rows = db.session.query(
+        Room.id, Room.room_number, Room.room_type, Room.block, Room.floor,
+        Room.capacity, Room.occupied_count, Room.status,
+        Student.id, Student.roll_number, Student.course, Student.profile_picture, User.name
+    ).outerjoin(
+        Student, db.and_(
+            Student.room_id == Room.id,
+            Student.is_approved == True,
+            Student.status == 'active'
+        )
+    ).outerjoin(
+        User, Student.user_id == User.id
+    ).order_by(
+        Room.block, Room.floor, Room.room_number, Student.id
+    ).all()
+
+    buildings = []
+    rooms_by_id = {}
+    totals = {'rooms': 0, 'capacity': 0, 'occupied': 0}
+    for (room_id, room_number, room_type, block, floor, capacity, occupied, status,
+         student_id, roll_number, course, profile_picture, name) in rows:
+        room = rooms_by_id.get(room_id)
+        if room is None:
+            block = block or UNASSIGNED_BLOCK
+            if not buildings or buildings[-1]['block'] != block:
+                buildings.append({'block': block, 'floors': [], 'capacity': 0, 'occupied': 0})
+            building = buildings[-1]
+            if not building['floors'] or building['floors'][-1]['floor'] != floor:
+                building['floors'].append({'floor': floor, 'rooms': []})
+            room = {
+                'id': room_id,
+                'room_number': room_number,
+                'room_type': room_type,
+                'status': status,
+                'capacity': capacity,
+                'occupied': occupied,
+                'is_full': occupied >= capacity,
+                'occupants': []
+            }
+            rooms_by_id[room_id] = room
+            building['floors'][-1]['rooms'].append(room)
+            building['capacity'] += capacity
+            building['occupied'] += occupied
+            totals['rooms'] += 1
+            totals['capacity'] += capacity
+            totals['occupied'] += occupied
+        if student_id is not None:
+            room['occupants'].append({
+                'id': student_id,
+                'name': name,
+                'roll_number': roll_number,
+                'course': course,
+                'profile_picture': profile_picture
+            })
+
+    payload = json.dumps({
+        'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+        'totals': totals,
+        'buildings': buildings
+    }, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest(), payload
+
+
+occupancy_map = Snapshot('occupancy_map', _build)
+
+
+def get_occupancy_map():
+    """Return (etag, serialized JSON payload) of the current occupancy map"""
+    return occupancy_map.get()
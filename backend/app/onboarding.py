@@ -0,0 +1,213 @@
+"""Bulk student onboarding from an admissions CSV.
+
+Creates User and Student rows in batches instead of running every student
+through /register and /verify-otp. Password hashing (pbkdf2, deliberately
+slow) dominates the cost, so each batch's hashes are computed in a process
+pool across all cores while rows are validated and inserted with
+executemany. Every imported student gets either a temporary password or a
+password reset link. Progress is reported as NDJSON lines so the admin sees
+each batch land; batches commit as they go, so an interrupted import keeps
+the students already reported as created.
+"""
+import csv
+import io
+import json
+import os
+import secrets
+import string
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import User, Student
+from app.student_search import mark_students_changed
+from app.tokens import password_reset_token
+
+REQUIRED_COLUMNS = ['name', 'email']
+OPTIONAL_COLUMNS = ['roll_number', 'course', 'contact_number', 'date_of_birth',
+                    'semesters_requested', 'preferred_room_type']
+CREDENTIAL_MODES = ('temporary_password', 'reset_link')
+BATCH_SIZE = 250
+MAX_ROWS = 20000
+
+_SPECIAL = '@$!%*?&'
+
+
+class OnboardingError(ValueError):
+    """Raised for an upload that cannot be imported at all"""
+
+
+def _temporary_password():
+    """12 random characters covering the classes the password form requires"""
+    rng = secrets.SystemRandom()
+    chars = [rng.choice(string.ascii_uppercase), rng.choice(string.ascii_lowercase),
+             rng.choice(string.digits), rng.choice(_SPECIAL)]
+    chars += [rng.choice(string.ascii_letters + string.digits) for _ in range(8)]
+    rng.shuffle(chars)
+    return ''.join(chars)
+
+
+def _reset_link(user_id, email, password_hash):
+    token = password_reset_token(
+        user_id, email, password_hash,
+        timedelta(days=current_app.config.get('ONBOARDING_RESET_LINK_DAYS', 7))
+    )
+    return f"{current_app.config.get('FRONTEND_URL', '')}/change-password?token={token}"
+
+
+def read_rows(data):
+    """Parse the uploaded CSV bytes into (line, row) pairs"""
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig'), newline=''))
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise OnboardingError(f"Missing required column(s): {', '.join(missing)}")
+    rows = []
+    for row in reader:
+        rows.append((reader.line_num, row))
+        if len(rows) > MAX_ROWS:
+            raise OnboardingError(f'At most {MAX_ROWS} students can be imported at once')
+    if not rows:
+        raise OnboardingError('The file has no students')
+    return rows
+
+
+def _parse_row(row, emails, roll_numbers):
+    name = (row.get('name') or '').strip()
+    email = (row.get('email') or '').strip().lower()
+    if not name:
+        raise OnboardingError('name is required')
+    if '@' not in email or len(email) > 100:
+        raise OnboardingError('a valid email is required')
+    if email in emails:
+        raise OnboardingError(f'{email} is already registered')
+
+    roll_number = (row.get('roll_number') or '').strip() or None
+    if roll_number and roll_number in roll_numbers:
+        raise OnboardingError(f'Roll number {roll_number} is already taken')
+
+    date_of_birth = (row.get('date_of_birth') or '').strip()
+    if date_of_birth:
+        try:
+            date_of_birth = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+        except ValueError:
+            raise OnboardingError('date_of_birth must be YYYY-MM-DD')
+    semesters = (row.get('semesters_requested') or '').strip()
+    if semesters:
+        try:
+            semesters = int(semesters)
+        except ValueError:
+            raise OnboardingError('semesters_requested must be a whole number')
+
+    return {
+        'name': name[:100],
+        'email': email,
+        'roll_number': roll_number,
+        'course': (row.get('course') or '').strip() or None,
+        'contact_number': (row.get('contact_number') or '').strip() or None,
+        'date_of_birth': date_of_birth or None,
+        'semesters_requested': semesters or 1,
+        'preferred_room_type': (row.get('preferred_room_type') or '').strip() or None
+    }
+
+
+def _line(**fields):
+    return json.dumps(fields) + '\n'
+
+
+def import_students(rows, credentials='temporary_password'):
+    """Import parsed rows, yielding NDJSON progress lines.
+
+    Yields an 'error' line per rejected row, a 'student' line per created
+    student (with its temporary password or reset link), a 'progress' line
+    after each committed batch and a final 'summary' line.
+    """
+    # Emails are compared case-insensitively; older accounts may be stored mixed-case
+    emails = set(db.session.execute(select(func.lower(User.email))).scalars())
+    roll_numbers = set(db.session.execute(select(Student.roll_number)).scalars())
+    summary = {'total': len(rows), 'created': 0, 'failed': 0}
+
+    valid = []
+    for line, row in rows:
+        try:
+            values = _parse_row(row, emails, roll_numbers)
+        except OnboardingError as e:
+            summary['failed'] += 1
+            yield _line(type='error', line=line, email=row.get('email'), message=str(e))
+            continue
+        emails.add(values['email'])
+        if values['roll_number']:
+            roll_numbers.add(values['roll_number'])
+        valid.append((line, values, _temporary_password()))
+    batches = [valid[i:i + BATCH_SIZE] for i in range(0, len(valid), BATCH_SIZE)]
+
+    workers = current_app.config.get('ONBOARDING_HASH_WORKERS') or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def hash_batch(batch):
+            passwords = [password for _, _, password in batch]
+            return pool.map(generate_password_hash, passwords, chunksize=max(1, len(batch) // (workers * 4)))
+
+        pending = hash_batch(batches[0]) if batches else None
+        for n, batch in enumerate(batches):
+            hashes = list(pending)
+            # Keep the workers busy with the next batch while this one is written
+            if n + 1 < len(batches):
+                pending = hash_batch(batches[n + 1])
+
+            user_ids = db.session.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [{'name': values['name'], 'email': values['email'], 'password_hash': password_hash,
+                  'role': 'student'}
+                 for (_, values, _), password_hash in zip(batch, hashes)]
+            ).scalars().all()
+
+            student_rows = []
+            for user_id, (_, values, _) in zip(user_ids, batch):
+                if not values['roll_number']:
+                    # Same scheme as self-registration, unless the file already used it
+                    roll_number = f'HMS{user_id:04d}'
+                    suffix = 1
+                    while roll_number in roll_numbers:
+                        roll_number = f'HMS{user_id:04d}-{suffix}'
+                        suffix += 1
+                    values['roll_number'] = roll_number
+                    roll_numbers.add(roll_number)
+                student_rows.append({
+                    'user_id': user_id,
+                    'roll_number': values['roll_number'],
+                    'course': values['course'],
+                    'contact_number': values['contact_number'],
+                    'date_of_birth': values['date_of_birth'],
+                    'semesters_requested': values['semesters_requested'],
+                    'preferred_room_type': values['preferred_room_type'],
+                    'is_approved': False,
+                    'is_enrollment_requested': False
+                })
+            student_ids = db.session.execute(
+                insert(Student).returning(Student.id, sort_by_parameter_order=True), student_rows
+            ).scalars().all()
+            mark_students_changed(student_ids)
+            db.session.commit()
+
+            for (line, values, password), user_id, student_id, password_hash in zip(batch, user_ids, student_ids, hashes):
+                created = {
+                    'type': 'student',
+                    'line': line,
+                    'email': values['email'],
+                    'user_id': user_id,
+                    'student_id': student_id,
+                    'roll_number': values['roll_number']
+                }
+                if credentials == 'reset_link':
+                    created['reset_link'] = _reset_link(user_id, values['email'], password_hash)
+                else:
+                    created['temporary_password'] = password
+                yield _line(**created)
+
+            summary['created'] += len(batch)
+            yield _line(type='progress', processed=summary['created'] + summary['failed'], **summary)
+
+    yield _line(type='summary', **summary)
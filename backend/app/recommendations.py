@@ -0,0 +1,157 @@
+"""Roommate-compatibility scoring for room recommendations.
+
+Every room with a free seat is described by a row of a compact feature
+matrix: per-course occupant counts, mean stay length, mean age, room type
+and free seats. The matrix is built from one joined query, cached as a
+snapshot (see app.cache) and only rebuilt when room membership changes, so
+scoring a candidate is a handful of vectorized NumPy operations over all
+rooms followed by an argpartition for the top k.
+"""
+from datetime import date
+from collections import namedtuple
+
+import numpy as np
+
+from app import db
+from app.cache import Snapshot
+from app.models import Room, Student
+
+# Relative weight of each compatibility signal; they add up to 1
+WEIGHTS = {'course': 0.4, 'semesters': 0.2, 'age': 0.2, 'room_type': 0.2}
+
+# Score used for a signal that cannot be compared, e.g. an empty room
+NEUTRAL = 0.5
+
+RoomFeatures = namedtuple('RoomFeatures', [
+    'room_ids', 'rooms', 'type_codes', 'type_index', 'course_counts', 'course_index',
+    'occupied', 'semesters_mean', 'age_mean', 'reference_date'
+])
+
+
+def _age(date_of_birth, today):
+    return (today - date_of_birth).days / 365.25
+
+
+def _normalize(value):
+    return (value or '').strip().lower() or None
+
+
+def _build():
+    today = date.today()
+    rooms = Room.query.filter(Room.occupied_count < Room.capacity).order_by(Room.id).all()
+    room_position = {room.id: i for i, room in enumerate(rooms)}
+
+    occupants = db.session.query(
+        Student.room_id, Student.course, Student.semesters_requested, Student.date_of_birth
+    ).join(
+        Room, Student.room_id == Room.id
+    ).filter(
+        Room.occupied_count < Room.capacity,
+        Student.is_approved == True,
+        Student.status == 'active'
+    ).all()
+
+    type_index = {}
+    type_codes = np.empty(len(rooms), dtype=np.int32)
+    for i, room in enumerate(rooms):
+        type_codes[i] = type_index.setdefault(_normalize(room.room_type), len(type_index))
+
+    course_index = {}
+    for _, course, _, _ in occupants:
+        if _normalize(course):
+            course_index.setdefault(_normalize(course), len(course_index))
+
+    course_counts = np.zeros((len(rooms), max(len(course_index), 1)), dtype=np.float32)
+    occupied = np.zeros(len(rooms), dtype=np.float32)
+    semesters_sum = np.zeros(len(rooms), dtype=np.float32)
+    semesters_n = np.zeros(len(rooms), dtype=np.float32)
+    age_sum = np.zeros(len(rooms), dtype=np.float32)
+    age_n = np.zeros(len(rooms), dtype=np.float32)
+
+    for room_id, course, semesters, date_of_birth in occupants:
+        i = room_position[room_id]
+        occupied[i] += 1
+        if _normalize(course):
+            course_counts[i, course_index[_normalize(course)]] += 1
+        if semesters:
+            semesters_sum[i] += semesters
+            semesters_n[i] += 1
+        if date_of_birth:
+            age_sum[i] += _age(date_of_birth, today)
+            age_n[i] += 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        semesters_mean = np.where(semesters_n > 0, semesters_sum / semesters_n, np.nan)
+        age_mean = np.where(age_n > 0, age_sum / age_n, np.nan)
+
+    return RoomFeatures(
+        room_ids=np.array([room.id for room in rooms], dtype=np.int64),
+        rooms=[room.to_dict() for room in rooms],
+        type_codes=type_codes,
+        type_index=type_index,
+        course_counts=course_counts,
+        course_index=course_index,
+        occupied=occupied,
+        semesters_mean=semesters_mean,
+        age_mean=age_mean,
+        reference_date=today
+    )
+
+
+room_features = Snapshot('room_features', _build)
+
+
+def recommend_rooms(student, k=5):
+    """Score every non-full room for a student and return the best k.
+
+    Returns a list of room dicts with a 'score' and per-signal 'components'.
+    """
+    features = room_features.get()
+    n = len(features.room_ids)
+    if n == 0:
+        return []
+
+    course_code = features.course_index.get(_normalize(student.course))
+    if course_code is None:
+        course = np.zeros(n, dtype=np.float32)
+    else:
+        course = features.course_counts[:, course_code] / np.maximum(features.occupied, 1)
+    course = np.where(features.occupied > 0, course, NEUTRAL)
+
+    if student.semesters_requested:
+        semesters = np.exp(-np.abs(features.semesters_mean - student.semesters_requested) / 2)
+        semesters = np.where(np.isnan(semesters), NEUTRAL, semesters)
+    else:
+        semesters = np.full(n, NEUTRAL, dtype=np.float32)
+
+    if student.date_of_birth:
+        age = np.exp(-np.abs(features.age_mean - _age(student.date_of_birth, features.reference_date)) / 3)
+        age = np.where(np.isnan(age), NEUTRAL, age)
+    else:
+        age = np.full(n, NEUTRAL, dtype=np.float32)
+
+    preferred = _normalize(student.preferred_room_type)
+    if preferred is None:
+        room_type = np.full(n, NEUTRAL, dtype=np.float32)
+    else:
+        room_type = (features.type_codes == features.type_index.get(preferred, -1)).astype(np.float32)
+
+    scores = (WEIGHTS['course'] * course + WEIGHTS['semesters'] * semesters
+              + WEIGHTS['age'] * age + WEIGHTS['room_type'] * room_type)
+
+    k = min(k, n)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.lexsort((features.room_ids[top], -scores[top]))]
+
+    result = []
+    for i in top:
+        room = dict(features.rooms[i])
+        room['score'] = round(float(scores[i]), 4)
+        room['components'] = {
+            'course': round(float(course[i]), 4),
+            'semesters': round(float(semesters[i]), 4),
+            'age': round(float(age[i]), 4),
+            'room_type': round(float(room_type[i]), 4)
+        }
+        result.append(room)
+    return result
@@ -0,0 +1,128 @@
+"""Bulk room import and export as CSV.
+
+Imports are parsed row by row straight from the upload stream and inserted
+with executemany in fixed-size batches, so memory stays flat however large
+the file is. Room number uniqueness is checked against a set of existing
+numbers loaded with a single query. Status is derived from occupancy, so a
+status column (as written by the export) is ignored. Exports stream rows
+from a server-side cursor through a generator.
+"""
+import csv
+import io
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.cache import mark_rooms_changed
+from app.models import Room
+
+COLUMNS = ['room_number', 'room_type', 'capacity', 'block', 'floor']
+EXPORT_COLUMNS = COLUMNS + ['status', 'occupied']
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class RoomImportError(ValueError):
+    """Raised for a CSV row that cannot be imported"""
+
+
+def _optional_int(value, field):
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RoomImportError(f'{field} must be a whole number')
+
+
+def _parse_row(row):
+    room_number = (row.get('room_number') or '').strip()
+    room_type = (row.get('room_type') or '').strip()
+    if not room_number:
+        raise RoomImportError('room_number is required')
+    if len(room_number) > 20:
+        raise RoomImportError('room_number is longer than 20 characters')
+    if not room_type:
+        raise RoomImportError('room_type is required')
+
+    capacity = _optional_int(row.get('capacity'), 'capacity')
+    if capacity is not None and capacity < 1:
+        raise RoomImportError('capacity must be at least 1')
+
+    return {
+        'room_number': room_number,
+        'room_type': room_type,
+        'capacity': capacity or 4,
+        'occupied_count': 0,
+        'block': (row.get('block') or '').strip() or None,
+        'floor': _optional_int(row.get('floor'), 'floor'),
+        # A new room has no occupants
+        'status': 'Vacant'
+    }
+
+
+def import_rooms(stream, dry_run=False):
+    """Import rooms from a binary CSV stream.
+
+    Valid rows are inserted, invalid ones are reported with their line
+    number. Nothing is written when dry_run is set. The caller commits.
+    Returns a summary dict.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    missing = [column for column in ('room_number', 'room_type') if column not in (reader.fieldnames or [])]
+    if missing:
+        raise RoomImportError(f"Missing required column(s): {', '.join(missing)}")
+
+    existing = set(db.session.execute(select(Room.room_number)).scalars())
+    summary = {'imported': 0, 'skipped': 0, 'errors': [], 'dry_run': dry_run}
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            db.session.execute(insert(Room), batch)
+        summary['imported'] += len(batch)
+        batch.clear()
+
+    for row in reader:
+        try:
+            values = _parse_row(row)
+            if values['room_number'] in existing:
+                raise RoomImportError(f"Room {values['room_number']} already exists")
+        except RoomImportError as e:
+            summary['skipped'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': reader.line_num, 'message': str(e)})
+            continue
+
+        existing.add(values['room_number'])
+        batch.append(values)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    flush()
+
+    if summary['imported'] and not dry_run:
+        mark_rooms_changed()
+    return summary
+
+
+def export_rooms():
+    """Yield the room table as CSV text, a batch of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    rows = db.session.execute(
+        select(Room.room_number, Room.room_type, Room.capacity, Room.block,
+               Room.floor, Room.status, Room.occupied_count)
+        .order_by(Room.id)
+        .execution_options(stream_results=True, yield_per=BATCH_SIZE)
+    )
+    for partition in rows.partitions():
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,157 @@
+"""Batched room moves and swaps.
+
+A batch of moves is validated up front with one query for the students and
+one for the rooms, then applied in a single transaction. Moves are grouped
+into swap cycles (A -> B -> A, A -> B -> C -> A, ...) whose seats cancel
+out, so full rooms can still exchange occupants; only the net change of
+each room has to fit its capacity. Counters are adjusted through
+seat_students(), i.e. with one conditional UPDATE per affected room.
+"""
+import uuid
+from collections import defaultdict
+
+from app import db
+from app.models import Room, Student, RoomChangeRequest
+from app.occupancy import occupies_seat, seat_students
+
+
+class RoomMoveError(ValueError):
+    """Raised when a batch of moves cannot be applied; carries per-item errors"""
+
+    def __init__(self, errors):
+        super().__init__('Room moves could not be applied')
+        self.errors = errors
+
+
+def find_cycles(edges):
+    """Decompose (from, to) edges into cycles.
+
+    Returns a list of cycles, each a list of edge indexes in walking order.
+    Edges that are not part of any cycle are left out. Every edge is
+    visited at most twice, so this is linear in the number of edges.
+    """
+    outgoing = defaultdict(list)
+    for i, (source, _) in enumerate(edges):
+        outgoing[source].append(i)
+
+    cycles = []
+    for start in list(outgoing):
+        path = []
+        # Node -> position in path of the edge leaving it
+        on_path = {start: 0}
+        node = start
+        while True:
+            if outgoing[node]:
+                i = outgoing[node].pop()
+                path.append(i)
+                node = edges[i][1]
+                if node in on_path:
+                    position = on_path[node]
+                    cycle = path[position:]
+                    del path[position:]
+                    for j in cycle:
+                        on_path.pop(edges[j][0], None)
+                    on_path[node] = position
+                    cycles.append(cycle)
+                else:
+                    on_path[node] = len(path)
+            elif path:
+                # Dead end - the last edge cannot be part of a cycle
+                on_path.pop(node)
+                node = edges[path.pop()][0]
+            else:
+                break
+    return cycles
+
+
+def plan_moves(moves):
+    """Validate a batch of {'student_id', 'room_id'} moves.
+
+    Returns (students, rooms, cycles, deltas) where students and rooms are
+    lists aligned with moves, cycles lists the swap cycles as move indexes
+    and deltas maps room id -> net change in occupancy. Raises
+    RoomMoveError listing every invalid move.
+    """
+    errors = []
+    student_ids = []
+    for i, move in enumerate(moves):
+        if not isinstance(move, dict) or not move.get('student_id') or not move.get('room_id'):
+            errors.append({'index': i, 'message': 'student_id and room_id are required'})
+            continue
+        student_ids.append(move['student_id'])
+    if errors:
+        raise RoomMoveError(errors)
+
+    students_by_id = {
+        student.id: student
+        for student in Student.query.filter(Student.id.in_(student_ids)).all()
+    }
+    rooms_by_id = {
+        room.id: room
+        for room in Room.query.filter(Room.id.in_({move['room_id'] for move in moves})).all()
+    }
+
+    seen = set()
+    for i, move in enumerate(moves):
+        student = students_by_id.get(move['student_id'])
+        if student is None:
+            errors.append({'index': i, 'message': f"Student {move['student_id']} not found"})
+        elif move['student_id'] in seen:
+            errors.append({'index': i, 'message': f"Student {move['student_id']} is moved more than once"})
+        elif not occupies_seat(student):
+            errors.append({'index': i, 'message': f"Student {move['student_id']} does not currently occupy a room"})
+        elif student.room_id == move['room_id']:
+            errors.append({'index': i, 'message': f"Student {move['student_id']} is already in this room"})
+        if move['room_id'] not in rooms_by_id:
+            errors.append({'index': i, 'message': f"Room {move['room_id']} not found"})
+        seen.add(move['student_id'])
+    if errors:
+        raise RoomMoveError(errors)
+
+    students = [students_by_id[move['student_id']] for move in moves]
+    rooms = [rooms_by_id[move['room_id']] for move in moves]
+
+    deltas = defaultdict(int)
+    for student, room in zip(students, rooms):
+        deltas[student.room_id] -= 1
+        deltas[room.id] += 1
+    deltas = {room_id: delta for room_id, delta in deltas.items() if delta}
+
+    for room_id, delta in deltas.items():
+        room = rooms_by_id.get(room_id)
+        if room is not None and delta > 0 and room.occupied_count + delta > room.get_capacity():
+            errors.append({
+                'room_id': room_id,
+                'message': f'Room {room.room_number} has {room.get_capacity() - room.occupied_count} '
+                           f'free seat(s) but {delta} more student(s) would move in'
+            })
+    if errors:
+        raise RoomMoveError(errors)
+
+    cycles = find_cycles([(student.room_id, room.id) for student, room in zip(students, rooms)])
+    return students, rooms, cycles, deltas
+
+
+def apply_moves(moves, requested_by=None):
+    """Apply a batch of moves in the current transaction.
+
+    Records a RoomChangeRequest per move and returns (batch_id, requests,
+    cycles, deltas). Raises RoomMoveError for invalid input, RoomFullError
+    if a room filled up concurrently. The caller commits.
+    """
+    students, rooms, cycles, deltas = plan_moves(moves)
+    cycle_of = {i: n for n, cycle in enumerate(cycles) for i in cycle}
+
+    batch_id = uuid.uuid4().hex
+    requests = [RoomChangeRequest(
+        batch_id=batch_id,
+        student_id=student.id,
+        from_room_id=student.room_id,
+        to_room_id=room.id,
+        cycle=cycle_of.get(i),
+        requested_by=requested_by
+    ) for i, (student, room) in enumerate(zip(students, rooms))]
+    db.session.add_all(requests)
+
+    seat_students(zip(students, rooms))
+    return batch_id, requests, cycles, deltas
@@ -0,0 +1,40 @@
+"""Occupant lists for the student roommates view.
+
+Each room's list is built with one joined query, serialized once and cached
+per room (see app.cache) until a commit changes that room's membership or
+an occupant's name, roll number or picture. The ETag lets dashboards that
+poll the list get a 304 without a body.
+"""
+import hashlib
+import json
+from app import db
+from app.cache import RoomCache
+from app.models import Student, User
+
+
+def _build(room_id):
+    rows = db.session.query(
+        Student.id, User.name, Student.roll_number, Student.profile_picture
+    ).join(
+        User, Student.user_id == User.id
+    ).filter(
+        Student.room_id == room_id,
+        Student.is_approved == True,
+        Student.status == 'active'
+    ).order_by(Student.id).all()
+
+    payload = json.dumps([{
+        'id': student_id,
+        'name': name,
+        'roll_number': roll_number,
+        'profile_picture': profile_picture
+    } for student_id, name, roll_number, profile_picture in rows], separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest(), payload
+
+
+roommates = RoomCache('roommates', _build)
+
+
+def get_room_occupants(room_id):
+    """Return (etag, serialized JSON list) of the active occupants of a room"""
+    return roommates.get(room_id)
@@ -0,0 +1,198 @@
+"""Admin student listings (approved students and pending enrollment requests).
+
+Every page is served by one query joining Student, User and Room, with the
+fingerprint flag coming from Student.has_fingerprint, an EXISTS subquery,
+instead of the templates. Pages are keyset-paginated on Student.id, so a page costs the
+same however deep into the list it is.
+
+The full roster export streams the same join as plain rows from a
+server-side cursor, so memory use does not grow with the number of
+students: CSV goes out a partition at a time, NDJSON a line per row as it
+is read.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Student, User, Room
+
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+
+class RosterFilterError(ValueError):
+    """Raised for an invalid listing filter or cursor"""
+
+
+def _int_arg(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RosterFilterError(f'{name} must be an integer')
+
+
+def _bool_arg(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise RosterFilterError(f'{name} must be true or false')
+
+
+def parse_roster_args(args):
+    """Read after_id, limit and the filters from request arguments"""
+    limit = _int_arg(args, 'limit')
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise RosterFilterError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return {
+        'after_id': _int_arg(args, 'after_id'),
+        'limit': limit,
+        'course': (args.get('course') or '').strip() or None,
+        'room_id': _int_arg(args, 'room_id'),
+        'status': (args.get('status') or '').strip() or None,
+        'has_fingerprint': _bool_arg(args, 'has_fingerprint')
+    }
+
+
+def parse_export_args(args):
+    """Read the format, the approved flag and the filters for an export"""
+    fmt = (args.get('format') or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise RosterFilterError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    filters = parse_roster_args(args)
+    del filters['after_id'], filters['limit']
+    return fmt, _bool_arg(args, 'approved'), filters
+
+
+def _filter(query, approved, course=None, room_id=None, status=None, has_fingerprint=None):
+    """Apply the listing filters to a query or select"""
+    if approved is True:
+        query = query.filter(Student.is_approved == True)
+    elif approved is False:
+        query = query.filter(Student.is_approved == False, Student.is_enrollment_requested == True)
+
+    if course:
+        query = query.filter(db.func.lower(Student.course) == course.lower())
+    if room_id:
+        query = query.filter(Student.room_id == room_id)
+    if status:
+        query = query.filter(Student.status == status)
+    if has_fingerprint is not None:
+        query = query.filter(Student.has_fingerprint if has_fingerprint else ~Student.has_fingerprint)
+    return query
+
+
+def roster_query(approved, after_id=None, limit=None, **filters):
+    """Query (Student, name, email, room_number, room_type) rows in id order.
+
+    approved=True lists approved students, False pending enrollment
+    requests and None every student. filters are course, room_id, status
+    and has_fingerprint.
+    """
+    query = db.session.query(
+        Student, User.name, User.email, Room.room_number, Room.room_type
+    ).join(
+        User, Student.user_id == User.id
+    ).outerjoin(
+        Room, Student.room_id == Room.id
+    )
+    query = _filter(query, approved, **filters)
+    if after_id:
+        query = query.filter(Student.id > after_id)
+
+    query = query.order_by(Student.id)
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def serialize_roster_row(row, include_room=True):
+    """Build the listing JSON for one roster_query row"""
+    student, name, email, room_number, room_type = row
+    data = student.to_dict()
+    data['name'] = name
+    data['email'] = email
+    if include_room and room_number is not None:
+        data['room_number'] = room_number
+        data['room_type'] = room_type
+    return data
+
+
+def list_students(approved, **filters):
+    """Return (students, next_after_id) for one page of the listing.
+
+    next_after_id is None when the page is the last one.
+    """
+    rows = roster_query(approved, **filters).all()
+    students = [serialize_roster_row(row, include_room=approved) for row in rows]
+    limit = filters.get('limit')
+    next_after_id = students[-1]['id'] if limit and len(students) == limit else None
+    return students, next_after_id
+
+
+EXPORT_COLUMNS = [
+    ('id', Student.id),
+    ('roll_number', Student.roll_number),
+    ('name', User.name),
+    ('email', User.email),
+    ('course', Student.course),
+    ('contact_number', Student.contact_number),
+    ('date_of_birth', Student.date_of_birth),
+    ('semesters_requested', Student.semesters_requested),
+    ('join_date', Student.join_date),
+    ('is_enrollment_requested', Student.is_enrollment_requested),
+    ('is_approved', Student.is_approved),
+    ('status', Student.status),
+    ('room_number', Room.room_number),
+    ('room_type', Room.room_type),
+    ('block', Room.block),
+    ('has_fingerprint', Student.has_fingerprint)
+]
+
+
+def _export_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_roster(fmt='csv', approved=None, **filters):
+    """Yield the student roster as CSV text a partition at a time, or as NDJSON a line per student"""
+    names = [name for name, _ in EXPORT_COLUMNS]
+    statement = select(*[column for _, column in EXPORT_COLUMNS]).join(
+        User, Student.user_id == User.id
+    ).outerjoin(
+        Room, Student.room_id == Room.id
+    )
+    statement = _filter(statement, approved, **filters).order_by(Student.id).execution_options(
+        stream_results=True, yield_per=EXPORT_BATCH_SIZE
+    )
+
+    if fmt == 'ndjson':
+        # Each line goes out as soon as its row is read
+        for row in db.session.execute(statement):
+            yield json.dumps(dict(zip(names, map(_export_value, row)))) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    # Send the header straight away, before the query has produced a row
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for partition in db.session.execute(statement).partitions():
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
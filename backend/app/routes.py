@@ -1,14 +1,38 @@
-from flask import Blueprint, jsonify, request, current_app, send_from_directory
+from flask import Blueprint, jsonify, request, current_app, send_from_directory, Response, stream_with_context
 from app import db
-from app.models import User, Room, Student, Complaint, Feedback, Fee, Attendance, Notice, OTP, FeeNotification, ComplaintReply, AttendanceWindow, FingerprintData, NotificationState, ComplaintNotification, NoticeNotification, LeaveRequest
-from app.email import send_otp_email, send_password_reset_otp_email
+from app.models import User, Room, Student, Complaint, Feedback, Fee, Attendance, Notice, OTP, FeeNotification, RoomNotification, ComplaintReply, AttendanceWindow, FingerprintData, NotificationState, ComplaintNotification, ComplaintEscalation, ComplaintCluster, NoticeNotification, LeaveRequest, RoomWaitlistEntry, RoomChangeRequest, ArchivedStudent
+from app.tokens import password_reset_token, is_valid_reset_token
+from app.email import send_otp_email, send_password_reset_otp_email, send_room_allocation_email
 from app.fingerprint_service import fingerprint_service
+from app.occupancy import seat_student, seat_students, release_room, occupies_seat, resize_room, RoomFullError
+from app.allocation import plan_allocation, group_key
+from app.waitlist import fill_freed_seat, is_waiting
+from app.occupancy_map import get_occupancy_map
+from app.roommates import get_room_occupants
+from app.timeline import student_timeline, TimelineCursorError, DEFAULT_LIMIT as DEFAULT_TIMELINE_LIMIT, MAX_LIMIT as MAX_TIMELINE_LIMIT
+from app.roster import parse_roster_args, parse_export_args, list_students, export_roster, RosterFilterError, MAX_PAGE_SIZE
+from app.changes import student_changes, decode_cursor, ChangeCursorError
+from app.student_search import search_students, MAX_RESULTS as MAX_SEARCH_RESULTS
+from app.bulk_decisions import apply_decisions, MAX_DECISIONS
+from app.expiry import expire_students
+from app.search import search_documents, parse_types, SearchQueryError, MAX_RESULTS as MAX_DOCUMENT_RESULTS
+from app.complaints import complaint_page, reply_page, parse_limit, ComplaintListError, MAX_PAGE_SIZE as MAX_COMPLAINT_PAGE_SIZE
+from app.sla import parse_priority, overdue_complaints, ComplaintPriorityError
+from app.clustering import assign_cluster, forget_complaint, cluster_page, reply_to_cluster, ClusterReplyError
+from app.archive import list_archived_students, archived_student, restore_student, ArchiveError
+from app.onboarding import read_rows, import_students, OnboardingError, CREDENTIAL_MODES
+from app.recommendations import recommend_rooms
+from app.room_csv import import_rooms, export_rooms, RoomImportError
+from app.room_moves import apply_moves, RoomMoveError
+from app.occupancy_history import update_history, utilization
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 from datetime import datetime, timedelta
 import traceback
+import json
 import os
 import uuid
 from werkzeug.utils import secure_filename
+from sqlalchemy.orm.exc import StaleDataError
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
@@ -289,11 +313,7 @@ def verify_password_reset_otp():
     current_app.logger.info(f"Password reset OTP verified successfully for {email}")
     
     # Generate a temporary token for password reset (valid for 15 minutes)
-    reset_token = create_access_token(
-        identity=str(user.id), 
-        additional_claims={'purpose': 'password_reset', 'email': email},
-        expires_delta=timedelta(minutes=15)
-    )
+    reset_token = password_reset_token(user.id, email, user.password_hash, timedelta(minutes=15))
     
     return jsonify({
         'message': 'OTP verified successfully. You can now reset your password.',
@@ -324,6 +344,11 @@ def reset_password():
         current_app.logger.warning(f"Password reset failed: User not found - {user_id}")
         return jsonify({'message': 'User not found'}), 400
     
+    # Tokens are tied to the password they were issued for, so each works once
+    if not is_valid_reset_token(claims, user):
+        current_app.logger.warning(f"Password reset failed: Token already used for user {user_id}")
+        return jsonify({'message': 'This password reset link has already been used'}), 400
+    
     try:
         # Update password
         user.set_password(data['password'])
@@ -387,6 +412,12 @@ def login():
     student = Student.query.filter_by(user_id=user.id).first()
     
     if not student:
+        if ArchivedStudent.query.filter_by(user_id=user.id).first():
+            current_app.logger.info(f"Archived student attempted login: {user.email}")
+            return jsonify({
+                'message': 'Your hostel record has been archived. Please contact administration.',
+                'status': 'archived'
+            }), 403
         current_app.logger.error(f"Student record not found for user {user.id}")
         return jsonify({'message': 'Student record not found. Please contact administration.'}), 500
         
@@ -532,7 +563,10 @@ def create_room():
     room = Room(
         room_number=data['room_number'],
         room_type=data['room_type'],
-        status=data.get('status', 'Vacant')
+        status='Vacant',
+        capacity=data.get('capacity', 4),
+        block=data.get('block'),
+        floor=data.get('floor')
     )
     
     db.session.add(room)
@@ -551,9 +585,36 @@ def update_room(room_id):
     room = Room.query.get_or_404(room_id)
     data = request.get_json()
     
+    capacity = None
+    if 'capacity' in data:
+        capacity = data['capacity']
+        # bool is an int subclass and floats would be truncated silently
+        if isinstance(capacity, bool) or not isinstance(capacity, (int, str)):
+            return jsonify({'message': 'Capacity must be a whole number'}), 400
+        try:
+            capacity = int(capacity)
+        except ValueError:
+            return jsonify({'message': 'Capacity must be a whole number'}), 400
+        if capacity < 1:
+            return jsonify({'message': 'Capacity must be at least 1'}), 400
+        # Never shrink a room below the students already living in it
+        if capacity < room.get_occupancy():
+            return jsonify({'message': f'Room {room.room_number} already has {room.get_occupancy()} occupants'}), 409
+    
     room.room_number = data.get('room_number', room.room_number)
     room.room_type = data.get('room_type', room.room_type)
-    room.status = data.get('status', room.status)
+    room.block = data.get('block', room.block)
+    room.floor = data.get('floor', room.floor)
+    
+    # status follows occupied_count and capacity; a client-sent status is ignored
+    if capacity is not None:
+        try:
+            # Re-checked in the UPDATE in case a student was seated meanwhile
+            resize_room(room.id, capacity)
+        except RoomFullError:
+            db.session.rollback()
+            room = Room.query.get_or_404(room_id)
+            return jsonify({'message': f'Room {room.room_number} already has {room.get_occupancy()} occupants'}), 409
     
     db.session.commit()
     
@@ -632,15 +693,9 @@ def get_available_rooms():
             response = _add_cors_headers_to_response(response)
             return response, 403
         
-        # Get all rooms with their current occupancy
-        rooms = Room.query.all()
-        available_rooms = []
-        
-        for room in rooms:
-            room_dict = room.to_dict()
-            # Include rooms that are not at full capacity
-            if room_dict['occupied'] < room_dict['capacity']:
-                available_rooms.append(room_dict)
+        # Rooms that are not at full capacity, filtered on the stored counter
+        rooms = Room.query.filter(Room.occupied_count < Room.capacity).all()
+        available_rooms = [room.to_dict() for room in rooms]
         
         response = jsonify(available_rooms)
         response = _add_cors_headers_to_response(response)
@@ -653,18 +708,555 @@ def get_available_rooms():
         response = _add_cors_headers_to_response(response)
         return response, 500
 
+@api.route('/admin/rooms/auto-allocate', methods=['POST'])
+@jwt_required()
+def auto_allocate_rooms():
+    """Allocate rooms to every pending enrollment request in one transaction"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        data = request.get_json(silent=True) or {}
+        dry_run = bool(data.get('dry_run', False))
+        
+        pending = db.session.query(Student, User.name).join(
+            User, Student.user_id == User.id
+        ).filter(
+            Student.is_enrollment_requested == True,
+            Student.is_approved == False
+        ).order_by(Student.id).all()
+        names = {student.id: name for student, name in pending}
+        
+        rooms = Room.query.filter(Room.occupied_count < Room.capacity).all()
+        
+        # Groups already living in partially occupied rooms, so newcomers
+        # can join students from the same course and stay length
+        occupant_groups = {}
+        partial_room_ids = [room.id for room in rooms if room.occupied_count]
+        if partial_room_ids:
+            occupants = db.session.query(
+                Student.room_id, Student.course, Student.semesters_requested
+            ).filter(
+                Student.room_id.in_(partial_room_ids),
+                Student.is_approved == True,
+                Student.status == 'active'
+            ).all()
+            for room_id, course, semesters in occupants:
+                occupant_groups.setdefault(room_id, set()).add(group_key(course, semesters))
+        
+        placements, unplaced = plan_allocation([student for student, _ in pending], rooms, occupant_groups)
+        
+        # Capture the plan before the rooms are expired by the counter updates
+        assignments = [{
+            'student_id': student.id,
+            'name': names.get(student.id),
+            'roll_number': student.roll_number,
+            'course': student.course,
+            'semesters_requested': student.semesters_requested,
+            'room_id': room.id,
+            'room_number': room.room_number,
+            'room_type': room.room_type
+        } for student, room in placements]
+        
+        if not dry_run and placements:
+            now = datetime.utcnow()
+            for student, _ in placements:
+                student.approval_date = now
+                if not student.join_date:
+                    student.join_date = now.date()
+            try:
+                seat_students(placements)
+                db.session.commit()
+            except (RoomFullError, StaleDataError):
+                # Someone approved students while the plan was being computed
+                db.session.rollback()
+                response = jsonify({'message': 'Room occupancy changed during allocation. Please try again.'})
+                response = _add_cors_headers_to_response(response)
+                return response, 409
+            current_app.logger.info(f"Admin {current_user.email} auto-allocated {len(placements)} students")
+        
+        response = jsonify({
+            'dry_run': dry_run,
+            'allocated': len(placements),
+            'unallocated': len(unplaced),
+            'assignments': assignments,
+            'unplaced': [{
+                'student_id': item.student.id,
+                'name': names.get(item.student.id),
+                'reason': item.reason
+            } for item in unplaced]
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error auto-allocating rooms: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/import', methods=['POST'])
+@jwt_required()
+def import_rooms_csv():
+    """Create rooms in bulk from an uploaded CSV file"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        file = request.files.get('file')
+        if not file or file.filename == '':
+            response = jsonify({'message': 'No file uploaded'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+        
+        try:
+            summary = import_rooms(file.stream, dry_run=dry_run)
+        except RoomImportError as e:
+            db.session.rollback()
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        db.session.commit()
+        current_app.logger.info(f"Admin {current_user.email} imported {summary['imported']} rooms (dry run: {dry_run})")
+        
+        response = jsonify(summary)
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error importing rooms: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/export', methods=['GET'])
+@jwt_required()
+def export_rooms_csv():
+    """Download all rooms as a CSV file"""
+    current_user = get_current_user()
+    
+    if not current_user or current_user.role != 'admin':
+        response = jsonify({'message': 'Unauthorized'})
+        response = _add_cors_headers_to_response(response)
+        return response, 403
+    
+    response = Response(stream_with_context(export_rooms()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = 'attachment; filename=rooms.csv'
+    response = _add_cors_headers_to_response(response)
+    return response
+
+@api.route('/admin/students/<int:student_id>/room-recommendations', methods=['GET'])
+@jwt_required()
+def get_room_recommendations(student_id):
+    """Get the k rooms whose occupants best match a student"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        student = Student.query.get(student_id)
+        if not student:
+            response = jsonify({'message': 'Student not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        k = max(1, min(request.args.get('k', 5, type=int), 50))
+        
+        response = jsonify({
+            'student_id': student.id,
+            'recommendations': recommend_rooms(student, k)
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting room recommendations: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/occupancy-map', methods=['GET'])
+@jwt_required()
+def get_admin_occupancy_map():
+    """Get every building, floor and room with its occupants in one payload"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        # Served from a snapshot that is only rebuilt when room assignments change
+        etag, payload = get_occupancy_map()
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(payload, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting occupancy map: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+def _notify_waitlist_promotion(student):
+    """Email a student who was just given a seat from the waitlist"""
+    try:
+        user = User.query.get(student.user_id)
+        room = Room.query.get(student.room_id)
+        current_app.logger.info(f"Promoted waitlisted student {user.email} into room {room.room_number}")
+        send_room_allocation_email(user.email, user.name, room.room_number)
+    except Exception as e:
+        current_app.logger.error(f"Failed to send room allocation email: {str(e)}")
+        # The allocation itself is already committed
+
+@api.route('/admin/rooms/moves', methods=['POST'])
+@jwt_required()
+def move_students():
+    """Move or swap students between rooms in one transaction"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        data = request.get_json(silent=True) or {}
+        moves = data.get('moves')
+        if not isinstance(moves, list) or not moves:
+            response = jsonify({'message': 'A non-empty list of moves is required'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        try:
+            batch_id, change_requests, cycles, deltas = apply_moves(moves, requested_by=current_user.id)
+            # Seats left over in rooms that lost occupants go to the waitlist
+            promoted = []
+            for room_id, delta in deltas.items():
+                for _ in range(-delta):
+                    student = fill_freed_seat(room_id)
+                    if student is None:
+                        break
+                    promoted.append(student)
+            db.session.commit()
+        except RoomMoveError as e:
+            db.session.rollback()
+            response = jsonify({'message': str(e), 'errors': e.errors})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        except (RoomFullError, StaleDataError):
+            db.session.rollback()
+            response = jsonify({'message': 'Room occupancy changed while applying the moves. Please try again.'})
+            response = _add_cors_headers_to_response(response)
+            return response, 409
+        
+        current_app.logger.info(f"Admin {current_user.email} applied {len(change_requests)} room moves in batch {batch_id}")
+        for student in promoted:
+            _notify_waitlist_promotion(student)
+        
+        response = jsonify({
+            'message': f'{len(change_requests)} student(s) moved successfully',
+            'batch_id': batch_id,
+            'moves': [change_request.to_dict() for change_request in change_requests],
+            'cycles': [[change_requests[i].student_id for i in cycle] for cycle in cycles],
+            'occupancy_changes': {str(room_id): delta for room_id, delta in deltas.items()},
+            'promoted_from_waitlist': [student.id for student in promoted]
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error moving students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/moves', methods=['GET'])
+@jwt_required()
+def get_room_moves():
+    """Get the room move history, newest first, optionally for one student"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        query = RoomChangeRequest.query
+        student_id = request.args.get('student_id', type=int)
+        if student_id:
+            query = query.filter_by(student_id=student_id)
+        batch_id = request.args.get('batch_id')
+        if batch_id:
+            query = query.filter_by(batch_id=batch_id)
+        change_requests = query.order_by(RoomChangeRequest.id.desc()).limit(200).all()
+        
+        response = jsonify([change_request.to_dict() for change_request in change_requests])
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting room moves: {str(e)}")
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/utilization', methods=['GET'])
+@jwt_required()
+def get_room_utilization():
+    """Get daily room occupancy and utilization for a date range"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        today = datetime.utcnow().date()
+        try:
+            end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else today
+            start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            response = jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        end = min(end, today)
+        if start > end:
+            response = jsonify({'message': "'from' must not be after 'to' or in the future"})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        if (end - start).days >= 5 * 366:
+            response = jsonify({'message': 'Date range is limited to 5 years'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        # Fold in the seat changes made since the last read
+        update_history(today)
+        db.session.commit()
+        
+        include_daily = request.args.get('daily', 'false').lower() in ('1', 'true', 'yes')
+        result = utilization(start, end, block=request.args.get('block'), include_daily=include_daily)
+        
+        response = jsonify(result)
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error getting room utilization: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/waitlist', methods=['GET'])
+@jwt_required()
+def get_room_waitlist():
+    """Get waitlisted students in queue order, optionally for one room or room type"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        query = db.session.query(RoomWaitlistEntry, User.name, Student.roll_number).join(
+            Student, RoomWaitlistEntry.student_id == Student.id
+        ).join(
+            User, Student.user_id == User.id
+        )
+        if request.args.get('room_id', type=int):
+            query = query.filter(RoomWaitlistEntry.room_id == request.args.get('room_id', type=int))
+        if request.args.get('room_type'):
+            query = query.filter(RoomWaitlistEntry.room_type == request.args['room_type'])
+        
+        result = []
+        for entry, name, roll_number in query.order_by(RoomWaitlistEntry.id).all():
+            entry_data = entry.to_dict()
+            entry_data['name'] = name
+            entry_data['roll_number'] = roll_number
+            result.append(entry_data)
+        
+        response = jsonify(result)
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting room waitlist: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/waitlist', methods=['POST'])
+@jwt_required()
+def add_to_room_waitlist():
+    """Queue a pending student for a specific room or any room of a type"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        data = request.get_json() or {}
+        student = Student.query.get(data.get('student_id'))
+        if not student:
+            response = jsonify({'message': 'Student not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        if not is_waiting(student):
+            response = jsonify({'message': 'Only students with a pending enrollment request can be waitlisted'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        room = None
+        room_type = data.get('room_type')
+        if data.get('room_id'):
+            room = Room.query.get(data['room_id'])
+            if not room:
+                response = jsonify({'message': 'Selected room does not exist'})
+                response = _add_cors_headers_to_response(response)
+                return response, 400
+            if not room.is_full():
+                response = jsonify({'message': f'Room {room.room_number} has free seats - approve the student directly'})
+                response = _add_cors_headers_to_response(response)
+                return response, 400
+            room_type = None
+        elif not room_type:
+            response = jsonify({'message': 'Either room_id or room_type is required'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        if RoomWaitlistEntry.query.filter_by(student_id=student.id).first():
+            response = jsonify({'message': 'Student is already on the waitlist'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        entry = RoomWaitlistEntry(
+            student_id=student.id,
+            room_id=room.id if room else None,
+            room_type=room_type,
+            created_by=current_user.id
+        )
+        db.session.add(entry)
+        db.session.commit()
+        
+        response = jsonify({'message': 'Student added to the waitlist', 'entry': entry.to_dict()})
+        response = _add_cors_headers_to_response(response)
+        return response, 201
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error adding student to waitlist: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/rooms/waitlist/<int:entry_id>', methods=['DELETE'])
+@jwt_required()
+def remove_from_room_waitlist(entry_id):
+    """Remove a student from the waitlist"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        entry = RoomWaitlistEntry.query.get(entry_id)
+        if not entry:
+            response = jsonify({'message': 'Waitlist entry not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        db.session.delete(entry)
+        db.session.commit()
+        
+        response = jsonify({'message': 'Student removed from the waitlist'})
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error removing waitlist entry: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
 # Complaint related routes
 @api.route('/complaints', methods=['GET'])
 @jwt_required()
 def get_complaints():
     current_user = User.query.get(get_jwt_identity())
     
-    if current_user.role == 'admin':
-        complaints = Complaint.query.order_by(Complaint.created_at.desc()).all()
-    else:
-        complaints = Complaint.query.filter_by(user_id=current_user.id).order_by(Complaint.created_at.desc()).all()
+    # One page at a time (?status=&before=&limit=), with a reply count and last
+    # reply preview per complaint; GET /complaints/<id>/replies has the replies
+    try:
+        complaints, next_before = complaint_page(
+            user_id=None if current_user.role == 'admin' else current_user.id,
+            status=request.args.get('status') or None,
+            before=request.args.get('before') or None,
+            limit=parse_limit(request.args.get('limit'))
+        )
+    except ComplaintListError as e:
+        return jsonify({'message': str(e)}), 400
+    response = jsonify(complaints)
+    if next_before is not None:
+        response.headers['X-Next-Before'] = next_before
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-Before'
+    return response, 200
+
+@api.route('/complaints/count', methods=['GET'])
+@jwt_required()
+def get_complaint_count():
+    """Number of complaints the user can see (every complaint for an admin), optionally ?status="""
+    current_user = User.query.get(get_jwt_identity())
     
-    return jsonify([complaint.to_dict() for complaint in complaints]), 200
+    query = Complaint.query
+    if current_user.role != 'admin':
+        query = query.filter(Complaint.user_id == current_user.id)
+    if request.args.get('status'):
+        query = query.filter(Complaint.status == request.args['status'])
+    
+    return jsonify({'count': query.count()}), 200
 
 @api.route('/complaints', methods=['POST'])
 @jwt_required()
@@ -672,13 +1264,22 @@ def create_complaint():
     current_user = User.query.get(get_jwt_identity())
     data = request.get_json()
     
+    # Students cannot shorten their own SLA; only admins pick a priority
+    try:
+        priority = parse_priority(data.get('priority') if current_user.role == 'admin' else None)
+    except ComplaintPriorityError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # The SLA deadline is set from the priority on flush (app.sla)
     complaint = Complaint(
         subject=data['subject'],
         details=data['details'],
+        priority=priority,
         user_id=current_user.id
     )
     
     db.session.add(complaint)
+    assign_cluster(complaint)
     db.session.commit()
     
     return jsonify(complaint.to_dict()), 201
@@ -703,6 +1304,13 @@ def update_complaint(complaint_id):
     if current_user.role == 'admin' and 'status' in data:
         complaint.status = data['status']
     
+    # Changing the priority moves the SLA deadline
+    if current_user.role == 'admin' and 'priority' in data:
+        try:
+            complaint.priority = parse_priority(data['priority'])
+        except ComplaintPriorityError as e:
+            return jsonify({'message': str(e)}), 400
+    
     db.session.commit()
     
     return jsonify(complaint.to_dict()), 200
@@ -716,12 +1324,161 @@ def delete_complaint(complaint_id):
     if current_user.role != 'admin' and current_user.id != complaint.user_id:
         return jsonify({'message': 'Unauthorized'}), 403
     
+    ComplaintNotification.query.filter_by(complaint_id=complaint.id).delete()
+    ComplaintEscalation.query.filter_by(complaint_id=complaint.id).delete()
+    forget_complaint(complaint.id)
     db.session.delete(complaint)
     db.session.commit()
     
     return jsonify({'message': 'Complaint deleted successfully'}), 200
 
+@api.route('/admin/complaints/overdue', methods=['GET'])
+@jwt_required()
+def get_overdue_complaints():
+    """Pending complaints past their SLA deadline, most overdue first"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        try:
+            complaints, next_after = overdue_complaints(
+                priority=request.args.get('priority') or None,
+                after=request.args.get('after') or None,
+                limit=parse_limit(request.args.get('limit'))
+            )
+        except (ComplaintListError, ComplaintPriorityError) as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        response = jsonify(complaints)
+        if next_after is not None:
+            response.headers['X-Next-After'] = next_after
+            response.headers['Access-Control-Expose-Headers'] = 'X-Next-After'
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error listing overdue complaints: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/complaints/clusters', methods=['GET'])
+@jwt_required()
+def get_complaint_clusters():
+    """Complaints grouped by near-identical text, most recently joined cluster first"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        try:
+            clusters, next_before = cluster_page(
+                status=request.args.get('status') or None,
+                min_size=max(1, request.args.get('min_size', 1, type=int)),
+                before=request.args.get('before') or None,
+                limit=parse_limit(request.args.get('limit'))
+            )
+        except ComplaintListError as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        response = jsonify(clusters)
+        if next_before is not None:
+            response.headers['X-Next-Before'] = next_before
+            response.headers['Access-Control-Expose-Headers'] = 'X-Next-Before'
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error listing complaint clusters: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/complaints/clusters/<int:cluster_id>/reply', methods=['POST'])
+@jwt_required()
+def reply_to_complaint_cluster(cluster_id):
+    """Send the same reply to every complaint in a cluster, optionally setting their status"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        if db.session.get(ComplaintCluster, cluster_id) is None:
+            response = jsonify({'message': 'Cluster not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        data = request.get_json() or {}
+        try:
+            replies, notifications = reply_to_cluster(
+                cluster_id, current_user, data.get('content'), status=data.get('status') or None
+            )
+        except ClusterReplyError as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        db.session.commit()
+        current_app.logger.info(f"Replied to {replies} complaint(s) in cluster {cluster_id}")
+        
+        response = jsonify({
+            'message': f'Reply added to {replies} complaint(s)',
+            'cluster_id': cluster_id,
+            'replies': replies,
+            'notifications': notifications
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 201
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error replying to complaint cluster: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
 # Complaint Reply related routes
+@api.route('/complaints/<int:complaint_id>/replies', methods=['GET'])
+@jwt_required()
+def get_complaint_replies(complaint_id):
+    """Get a complaint's replies oldest first, after the reply id in ?after= for incremental fetches"""
+    current_user = User.query.get(get_jwt_identity())
+    complaint = Complaint.query.get_or_404(complaint_id)
+    
+    if current_user.role != 'admin' and current_user.id != complaint.user_id:
+        return jsonify({'message': 'Unauthorized'}), 403
+    
+    try:
+        replies, next_after = reply_page(
+            complaint_id,
+            after=request.args.get('after', type=int),
+            limit=parse_limit(request.args.get('limit'), default=MAX_COMPLAINT_PAGE_SIZE)
+        )
+    except ComplaintListError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    response = jsonify(replies)
+    if next_after is not None:
+        response.headers['X-Next-After'] = str(next_after)
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-After'
+    return response, 200
+
 @api.route('/complaints/<int:complaint_id>/replies', methods=['POST'])
 @jwt_required()
 def create_complaint_reply(complaint_id):
@@ -883,22 +1640,24 @@ def create_notice():
     db.session.add(notice)
     db.session.commit()
     
-    # Create notice notifications for all students
+    # Create notice notifications for all current students (not those whose stay has
+    # ended, nor archived ones, who have no Student row any more)
     try:
-        # Get all student users
-        student_users = User.query.filter_by(role='student').all()
-        
-        for student_user in student_users:
-            # Create a notice notification for each student
-            notice_notification = NoticeNotification(
-                student_user_id=student_user.id,
-                notice_id=notice.id,
-                is_viewed=False
-            )
-            db.session.add(notice_notification)
+        recipients = db.select(
+            User.id, db.literal(notice.id), db.false()
+        ).outerjoin(
+            Student, Student.user_id == User.id
+        ).where(
+            User.role == 'student',
+            db.or_(Student.status.is_(None), Student.status != 'inactive'),
+            User.id.not_in(db.select(ArchivedStudent.user_id))
+        )
+        result = db.session.execute(
+            db.insert(NoticeNotification).from_select(['student_user_id', 'notice_id', 'is_viewed'], recipients)
+        )
         
         db.session.commit()
-        current_app.logger.info(f"Created notice notifications for {len(student_users)} students")
+        current_app.logger.info(f"Created notice notifications for {result.rowcount} students")
     except Exception as e:
         current_app.logger.error(f"Failed to create notice notifications: {str(e)}")
         # Don't fail notice creation if notifications fail
@@ -1188,8 +1947,7 @@ def mark_attendance():
             return jsonify({'message': 'Student record not found'}), 404
         
         # Check if student has fingerprint data
-        fingerprint = FingerprintData.query.filter_by(student_id=student.id).first()
-        if not fingerprint:
+        if not student.has_fingerprint:
             return jsonify({'message': 'Fingerprint data not found'}), 403
         
         # Create attendance record for today
@@ -1557,11 +2315,11 @@ def check_student_fingerprint():
     if not student:
         return jsonify({'message': 'Student record not found'}), 404
     
-    fingerprint = FingerprintData.query.filter_by(student_id=student.id).first()
+    fingerprint_id = db.session.query(FingerprintData.id).filter_by(student_id=student.id).limit(1).scalar()
     
     return jsonify({
-        'has_fingerprint': fingerprint is not None,
-        'fingerprint_id': fingerprint.id if fingerprint else None
+        'has_fingerprint': fingerprint_id is not None,
+        'fingerprint_id': fingerprint_id
     }), 200
 
 @api.route('/test-admin', methods=['GET'])
@@ -1617,58 +2375,291 @@ def get_pending_students():
         
         current_app.logger.info(f"User from token: {current_user.email}, role: {current_user.role}")
         
-        if current_user.role != 'admin':
-            current_app.logger.warning(f"Unauthorized access attempt to pending students by: {current_user.email}")
+        if current_user.role != 'admin':
+            current_app.logger.warning(f"Unauthorized access attempt to pending students by: {current_user.email}")
+            response = jsonify({'message': 'Unauthorized'})
+            # Ensure CORS headers even on error
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        # Get students that aren't approved yet AND have submitted enrollment requests
+        try:
+            current_app.logger.info("Querying database for pending students with enrollment requests")
+            
+            try:
+                filters = parse_roster_args(request.args)
+            except RosterFilterError as e:
+                response = jsonify({'message': str(e)})
+                response = _add_cors_headers_to_response(response)
+                return response, 400
+            
+            # One joined query per page, keyset-paginated on student id
+            result, next_after_id = list_students(approved=False, **filters)
+            current_app.logger.info(f"Built result with {len(result)} students with enrollment requests")
+            
+            return _roster_response(result, next_after_id)
+            
+        except Exception as db_error:
+            current_app.logger.error(f"Database error: {str(db_error)}")
+            current_app.logger.error(traceback.format_exc())
+            response = jsonify({'message': 'Database error', 'error': str(db_error)})
+            # Ensure CORS headers even on error
+            response = _add_cors_headers_to_response(response)
+            return response, 500
+            
+    except Exception as e:
+        current_app.logger.error(f"Error getting pending students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        # Ensure CORS headers even on error
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/students/search', methods=['GET'])
+@jwt_required()
+def search_students_route():
+    """Typeahead search over student name, email, roll number, course and contact number"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        q = request.args.get('q', '').strip()
+        limit = min(max(request.args.get('limit', MAX_SEARCH_RESULTS, type=int), 1), MAX_SEARCH_RESULTS)
+        
+        response = jsonify(search_students(q, limit) if q else [])
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error searching students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/students/changes', methods=['GET'])
+@jwt_required()
+def get_student_changes():
+    """Get students changed or removed since a cursor, for polling clients"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        since = request.args.get('since')
+        try:
+            since = decode_cursor(since) if since else None
+        except ChangeCursorError as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        students, removed, cursor = student_changes(since)
+        
+        response = jsonify({
+            'students': students,
+            'removed': removed,
+            'cursor': cursor,
+            'full': since is None
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting student changes: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/students/expire', methods=['POST'])
+@jwt_required()
+def expire_ended_stays():
+    """Mark students whose stay has ended inactive and free their rooms"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        summary = expire_students()
+        
+        current_app.logger.info(f"Admin {current_user.email} expired {summary['expired']} students")
+        for student in summary['promoted']:
+            _notify_waitlist_promotion(student)
+        
+        response = jsonify({
+            'message': f"{summary['expired']} student(s) marked inactive",
+            'expired': summary['expired'],
+            'batches': summary['batches'],
+            'freed_seats': summary['freed_seats'],
+            'promoted_from_waitlist': [student.id for student in summary['promoted']]
+        })
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error expiring students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/search', methods=['GET'])
+@jwt_required()
+def search_all_documents():
+    """Full-text search over complaints, replies, notices and feedback"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        limit = max(1, min(request.args.get('limit', MAX_DOCUMENT_RESULTS, type=int), MAX_DOCUMENT_RESULTS))
+        try:
+            types = parse_types(request.args.get('types'))
+            results = search_documents(request.args.get('q'), types, limit)
+        except SearchQueryError as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        response = jsonify(results)
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error searching: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/archive/students', methods=['GET'])
+@jwt_required()
+def get_archived_students():
+    """Get archived students, newest first (read-only)"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        limit = request.args.get('limit', 50, type=int)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            response = jsonify({'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        students, next_after_id = list_archived_students(
+            q=(request.args.get('q') or '').strip() or None,
+            after_id=request.args.get('after_id', type=int),
+            limit=limit
+        )
+        return _roster_response(students, next_after_id)
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting archived students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/archive/students/<int:student_id>', methods=['GET'])
+@jwt_required()
+def get_archived_student(student_id):
+    """Get an archived student with their archived attendance, fees, complaints and other records"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        data = archived_student(student_id)
+        if data is None:
+            response = jsonify({'message': 'Archived student not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        response = jsonify(data)
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting archived student: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/archive/students/<int:student_id>/restore', methods=['POST'])
+@jwt_required()
+def restore_archived_student(student_id):
+    """Move an archived student and their records back into the live tables"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
             response = jsonify({'message': 'Unauthorized'})
-            # Ensure CORS headers even on error
             response = _add_cors_headers_to_response(response)
             return response, 403
         
-        # Get all students that aren't approved yet AND have submitted enrollment requests
-        try:
-            current_app.logger.info("Querying database for pending students with enrollment requests")
-            
-            # Get all students that are not approved yet but have submitted enrollment requests
-            pending_students = Student.query.filter_by(
-                is_approved=False, 
-                is_enrollment_requested=True
-            ).all()
-            current_app.logger.info(f"Found {len(pending_students)} pending student records with enrollment requests")
-            
-            # Build the result with user data
-            result = []
-            for student in pending_students:
-                # Get the user associated with this student
-                user = User.query.get(student.user_id)
-                if user:
-                    student_data = student.to_dict()
-                    student_data['name'] = user.name
-                    student_data['email'] = user.email
-                    result.append(student_data)
-            
-            current_app.logger.info(f"Built result with {len(result)} students with enrollment requests")
-            
-            response = jsonify(result)
-            # Set CORS headers
+        if not ArchivedStudent.query.filter_by(student_id=student_id).first():
+            response = jsonify({'message': 'Archived student not found'})
             response = _add_cors_headers_to_response(response)
-            return response, 200
-            
-        except Exception as db_error:
-            current_app.logger.error(f"Database error: {str(db_error)}")
-            current_app.logger.error(traceback.format_exc())
-            response = jsonify({'message': 'Database error', 'error': str(db_error)})
-            # Ensure CORS headers even on error
+            return response, 404
+        
+        try:
+            student, restored = restore_student(student_id)
+        except ArchiveError as e:
+            db.session.rollback()
+            response = jsonify({'message': str(e)})
             response = _add_cors_headers_to_response(response)
-            return response, 500
-            
+            return response, 409
+        db.session.commit()
+        
+        current_app.logger.info(f"Admin {current_user.email} restored archived student {student_id} with {restored} records")
+        response = jsonify({
+            'message': 'Student restored',
+            'student': student.to_dict(),
+            'restored_records': restored
+        })
+        response = _add_cors_headers_to_response(response)
+        return response
+        
     except Exception as e:
-        current_app.logger.error(f"Error getting pending students: {str(e)}")
+        db.session.rollback()
+        current_app.logger.error(f"Error restoring archived student: {str(e)}")
         current_app.logger.error(traceback.format_exc())
         response = jsonify({'message': 'Server error', 'error': str(e)})
-        # Ensure CORS headers even on error
         response = _add_cors_headers_to_response(response)
         return response, 500
 
+def _roster_response(students, next_after_id):
+    """Student list response; the cursor for the next page goes in a header"""
+    response = jsonify(students)
+    if next_after_id is not None:
+        response.headers['X-Next-After-Id'] = str(next_after_id)
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-After-Id'
+    response = _add_cors_headers_to_response(response)
+    return response, 200
+
 # Helper function to add CORS headers to responses
 def _add_cors_headers_to_response(response):
     """Add CORS headers to the given response"""
@@ -1714,31 +2705,21 @@ def approve_student(student_id):
             response = _add_cors_headers_to_response(response)
             return response, 400
         
-        # Check room capacity (max 4 students per room)
+        # Check room capacity, unless the student already occupies a seat in this room.
+        # This is only a fast path - the seat itself is reserved atomically below.
         current_occupancy = room.get_occupancy()
-        if current_occupancy >= 4:
+        capacity = room.get_capacity()
+        already_seated = occupies_seat(student) and student.room_id == room.id
+        if not already_seated and current_occupancy >= capacity:
             response = jsonify({
-                'message': f'Room {room.room_number} is full (capacity: 4, current: {current_occupancy})',
+                'message': f'Room {room.room_number} is full (capacity: {capacity}, current: {current_occupancy})',
                 'room_full': True
             })
             response = _add_cors_headers_to_response(response)
             return response, 400
         
-        # If student is already in this room, allow the update
-        if student.room_id != room.id:
-            # Check if moving from another room would exceed capacity
-            if current_occupancy >= 4:
-                response = jsonify({
-                    'message': f'Cannot assign to room {room.room_number} - capacity exceeded',
-                    'room_full': True
-                })
-                response = _add_cors_headers_to_response(response)
-                return response, 400
-        
         # Update student profile with approval
-        student.is_approved = True
         student.approval_date = datetime.utcnow()
-        student.status = 'active'  # Ensure student is marked as active
         
         # Set join_date if not already set
         if not student.join_date:
@@ -1750,24 +2731,32 @@ def approve_student(student_id):
         if 'profile_picture' in data:
             student.profile_picture = data['profile_picture']
         
-        # Assign the room
-        student.room_id = room.id
-        
-        # Update room status based on occupancy
-        new_occupancy = room.get_occupancy() + (1 if student.room_id != room.id else 0)
-        if new_occupancy >= 4:
-            room.status = 'Fully Occupied'
-        elif new_occupancy > 0:
-            room.status = f'{new_occupancy}/4'
-        else:
-            room.status = 'Vacant'
-        
-        # Commit all changes
-        db.session.commit()
+        # Assign the room - marks the student approved/active and updates
+        # the occupancy counters of the old and new rooms
+        try:
+            freed_room_id = seat_student(student, room)
+            promoted = fill_freed_seat(freed_room_id)
+            db.session.commit()
+        except RoomFullError:
+            # Another approval took the last seat after our capacity check
+            db.session.rollback()
+            response = jsonify({
+                'message': f'Room {room.room_number} is full (capacity: {capacity})',
+                'room_full': True
+            })
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        except StaleDataError:
+            db.session.rollback()
+            response = jsonify({'message': 'This student was updated by another admin. Please refresh and try again.'})
+            response = _add_cors_headers_to_response(response)
+            return response, 409
         
         # Get the user associated with this student for notification purposes
         user = User.query.get(student.user_id)
         current_app.logger.info(f"Admin {current_user.email} approved student {user.email} and assigned room {room.room_number}")
+        if promoted:
+            _notify_waitlist_promotion(promoted)
         
         # Return comprehensive student data including room information
         student_data = student.to_dict()
@@ -1816,17 +2805,22 @@ def reject_student(student_id):
         user = User.query.get(student.user_id)
         user_email = user.email if user else "Unknown"
         
-        # Set student status to rejected and reset enrollment request
+        # Free the student's seat, then mark them rejected and reset the enrollment request
+        freed_room_id = release_room(student)
         student.status = 'rejected'
         student.is_enrollment_requested = False
         student.is_approved = False
         student.approval_date = None
         student.join_date = None
-        student.room_id = None
+        
+        # Hand the freed seat to the next student on the waitlist
+        promoted = fill_freed_seat(freed_room_id)
         
         db.session.commit()
         
         current_app.logger.info(f"Admin {current_user.email} rejected/removed student {user_email}")
+        if promoted:
+            _notify_waitlist_promotion(promoted)
         
         response = jsonify({'message': 'Student successfully removed from the hostel'})
         response = _add_cors_headers_to_response(response)
@@ -1841,6 +2835,202 @@ def reject_student(student_id):
         response = _add_cors_headers_to_response(response)
         return response, 500
 
+@api.route('/admin/students/bulk-decision', methods=['POST'])
+@jwt_required()
+def bulk_student_decision():
+    """Approve and reject many students in one transaction, with a result per decision"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        data = request.get_json(silent=True) or {}
+        decisions = data.get('decisions')
+        if not isinstance(decisions, list) or not decisions:
+            response = jsonify({'message': 'A non-empty list of decisions is required'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        if len(decisions) > MAX_DECISIONS:
+            response = jsonify({'message': f'At most {MAX_DECISIONS} decisions can be processed at once'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        try:
+            results, deltas = apply_decisions(decisions)
+            # Seats left over in rooms that lost occupants go to the waitlist
+            promoted = []
+            for room_id, delta in deltas.items():
+                for _ in range(-delta):
+                    student = fill_freed_seat(room_id)
+                    if student is None:
+                        break
+                    promoted.append(student)
+            db.session.commit()
+        except (RoomFullError, StaleDataError):
+            db.session.rollback()
+            response = jsonify({'message': 'Room occupancy changed while applying the decisions. Please try again.'})
+            response = _add_cors_headers_to_response(response)
+            return response, 409
+        
+        succeeded = sum(1 for result in results if result['success'])
+        current_app.logger.info(f"Admin {current_user.email} applied {succeeded} of {len(results)} bulk student decisions")
+        for student in promoted:
+            _notify_waitlist_promotion(student)
+        
+        response = jsonify({
+            'processed': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results,
+            'promoted_from_waitlist': [student.id for student in promoted]
+        })
+        response = _add_cors_headers_to_response(response)
+        return response, 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error applying bulk student decisions: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/students/import', methods=['POST'])
+@jwt_required()
+def import_students_csv():
+    """Create student accounts in bulk from an admissions CSV, streaming progress as NDJSON"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        file = request.files.get('file')
+        if not file or file.filename == '':
+            response = jsonify({'message': 'No file uploaded'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        credentials = request.form.get('credentials') or request.args.get('credentials') or 'temporary_password'
+        if credentials not in CREDENTIAL_MODES:
+            response = jsonify({'message': f"credentials must be one of: {', '.join(CREDENTIAL_MODES)}"})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        try:
+            rows = read_rows(file.read())
+        except (OnboardingError, UnicodeDecodeError) as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        current_app.logger.info(f"Admin {current_user.email} started importing {len(rows)} students")
+        
+        def generate():
+            try:
+                yield from import_students(rows, credentials)
+            except Exception as e:
+                # Batches already reported as created stay committed
+                db.session.rollback()
+                current_app.logger.error(f"Error importing students: {str(e)}")
+                current_app.logger.error(traceback.format_exc())
+                yield json.dumps({'type': 'failed', 'message': str(e)}) + '\n'
+        
+        response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error importing students: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
+@api.route('/admin/students/export', methods=['GET'])
+@jwt_required()
+def export_students():
+    """Download the student roster as CSV or NDJSON, streamed as it is read"""
+    current_user = get_current_user()
+    
+    if not current_user or current_user.role != 'admin':
+        response = jsonify({'message': 'Unauthorized'})
+        response = _add_cors_headers_to_response(response)
+        return response, 403
+    
+    try:
+        fmt, approved, filters = parse_export_args(request.args)
+    except RosterFilterError as e:
+        response = jsonify({'message': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 400
+    
+    def generate():
+        try:
+            yield from export_roster(fmt, approved, **filters)
+        except Exception as e:
+            # Headers are already sent; the truncated file is the only signal left
+            current_app.logger.error(f"Error exporting students: {str(e)}")
+            current_app.logger.error(traceback.format_exc())
+            raise
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=students.{fmt}'
+    response = _add_cors_headers_to_response(response)
+    return response
+
+@api.route('/admin/students/<int:student_id>/timeline', methods=['GET'])
+@jwt_required()
+def get_student_timeline(student_id):
+    """Get one page of a student's attendance, fees, complaints, leave requests and fee notifications, newest first"""
+    try:
+        current_user = get_current_user()
+        
+        if not current_user or current_user.role != 'admin':
+            response = jsonify({'message': 'Unauthorized'})
+            response = _add_cors_headers_to_response(response)
+            return response, 403
+        
+        student = Student.query.get(student_id)
+        if not student:
+            response = jsonify({'message': 'Student not found'})
+            response = _add_cors_headers_to_response(response)
+            return response, 404
+        
+        limit = request.args.get('limit', DEFAULT_TIMELINE_LIMIT, type=int)
+        if not 1 <= limit <= MAX_TIMELINE_LIMIT:
+            response = jsonify({'message': f'limit must be between 1 and {MAX_TIMELINE_LIMIT}'})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        try:
+            events, next_before = student_timeline(student, request.args.get('before') or None, limit)
+        except TimelineCursorError as e:
+            response = jsonify({'message': str(e)})
+            response = _add_cors_headers_to_response(response)
+            return response, 400
+        
+        response = jsonify({
+            'student_id': student.id,
+            'events': events,
+            'next_before': next_before
+        })
+        response = _add_cors_headers_to_response(response)
+        return response
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting student timeline: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        response = jsonify({'message': 'Server error', 'error': str(e)})
+        response = _add_cors_headers_to_response(response)
+        return response, 500
+
 @api.route('/admin/students/approved', methods=['GET'])
 @jwt_required()
 def get_approved_students():
@@ -1865,35 +3055,20 @@ def get_approved_students():
             response = _add_cors_headers_to_response(response)
             return response, 403
         
-        # Get all approved students with simplified query
+        # Get approved students with their user and room details
         try:
-            # Get all approved students
-            approved_students = Student.query.filter_by(is_approved=True).all()
-            current_app.logger.info(f"Found {len(approved_students)} approved student records")
+            try:
+                filters = parse_roster_args(request.args)
+            except RosterFilterError as e:
+                response = jsonify({'message': str(e)})
+                response = _add_cors_headers_to_response(response)
+                return response, 400
             
-            # Build the result with user data
-            result = []
-            for student in approved_students:
-                # Get the user associated with this student
-                user = User.query.get(student.user_id)
-                if user:
-                    student_data = student.to_dict()
-                    student_data['name'] = user.name
-                    student_data['email'] = user.email
-                    
-                    # Add room details if available
-                    if student.room_id:
-                        room = Room.query.get(student.room_id)
-                        if room:
-                            student_data['room_number'] = room.room_number
-                            student_data['room_type'] = room.room_type
-                    
-                    result.append(student_data)
+            # One joined query per page, keyset-paginated on student id
+            result, next_after_id = list_students(approved=True, **filters)
             
             current_app.logger.info(f"Admin {current_user.email} retrieved {len(result)} approved students")
-            response = jsonify(result)
-            response = _add_cors_headers_to_response(response)
-            return response, 200
+            return _roster_response(result, next_after_id)
             
         except Exception as db_error:
             current_app.logger.error(f"Database error: {str(db_error)}")
@@ -2169,6 +3344,9 @@ def update_student_profile():
                     response = jsonify({'message': 'Invalid value for semesters_requested'})
                     response = _add_cors_headers_to_response(response)
                     return response, 400
+                    
+            if 'preferred_room_type' in data:
+                student.preferred_room_type = data['preferred_room_type'] or None
         
         # Handle enrollment request submission
         if is_enrollment_request and not student.is_enrollment_requested:
@@ -2217,44 +3395,50 @@ def update_student_profile():
 def get_roommates():
     """Get students who share the same room as the current student"""
     try:
-        # Get the room_id from query parameter
-        room_id = request.args.get('room_id')
+        current_user = get_current_user()
         
-        if not room_id:
-            response = jsonify({'message': 'Room ID is required'})
+        if not current_user:
+            response = jsonify({'message': 'User not found'})
             response = _add_cors_headers_to_response(response)
-            return response, 400
+            return response, 404
         
-        # Convert to integer
-        try:
-            room_id = int(room_id)
-        except ValueError:
-            response = jsonify({'message': 'Invalid room ID'})
+        room_id = request.args.get('room_id')
+        if room_id:
+            try:
+                room_id = int(room_id)
+            except ValueError:
+                response = jsonify({'message': 'Invalid room ID'})
+                response = _add_cors_headers_to_response(response)
+                return response, 400
+        
+        if current_user.role != 'admin':
+            # Students only ever see their own room
+            student = Student.query.filter_by(user_id=current_user.id).first()
+            own_room_id = student.room_id if student and occupies_seat(student) else None
+            if room_id and room_id != own_room_id:
+                response = jsonify({'message': 'Unauthorized'})
+                response = _add_cors_headers_to_response(response)
+                return response, 403
+            room_id = own_room_id
+            if not room_id:
+                response = jsonify([])
+                response = _add_cors_headers_to_response(response)
+                return response, 200
+        elif not room_id:
+            response = jsonify({'message': 'Room ID is required'})
             response = _add_cors_headers_to_response(response)
             return response, 400
         
-        # Get all students in the specified room
-        students_in_room = db.session.query(
-            Student, User
-        ).join(
-            User, Student.user_id == User.id
-        ).filter(
-            Student.room_id == room_id
-        ).all()
-        
-        # Format the response
-        result = []
-        for student, user in students_in_room:
-            result.append({
-                'id': student.id,
-                'name': user.name,
-                'roll_number': student.roll_number,
-                'profile_picture': student.profile_picture
-            })
-        
-        response = jsonify(result)
+        # Served from a per-room cache that is dropped when the room's occupants change
+        etag, payload = get_room_occupants(room_id)
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(payload, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
         response = _add_cors_headers_to_response(response)
-        return response, 200
+        return response
         
     except Exception as e:
         current_app.logger.error(f"Error getting roommates: {str(e)}")
@@ -2444,6 +3628,46 @@ def mark_fee_notifications_viewed_in_dashboard():
         current_app.logger.error(traceback.format_exc())
         return jsonify({'message': 'Server error', 'error': str(e)}), 500
 
+@api.route('/student/room-notifications', methods=['GET'])
+@jwt_required()
+def get_student_room_notifications():
+    """Room notifications of the current student, newest first"""
+    try:
+        current_user = get_current_user()
+        student = Student.query.filter_by(user_id=current_user.id).first() if current_user else None
+        if not student:
+            return jsonify({'error': 'Student record not found'}), 404
+        
+        notifications = RoomNotification.query.filter_by(student_id=student.id)\
+                                        .order_by(RoomNotification.created_at.desc(), RoomNotification.id.desc())\
+                                        .all()
+        return jsonify([notification.to_dict() for notification in notifications]), 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching room notifications: {str(e)}")
+        return jsonify({'error': 'Failed to fetch notifications'}), 500
+
+@api.route('/student/room-notifications/<int:notification_id>/read', methods=['POST'])
+@jwt_required()
+def mark_room_notification_read(notification_id):
+    try:
+        current_user = get_current_user()
+        student = Student.query.filter_by(user_id=current_user.id).first() if current_user else None
+        if not student:
+            return jsonify({'error': 'Student record not found'}), 404
+        
+        notification = db.session.get(RoomNotification, notification_id)
+        if not notification or notification.student_id != student.id:
+            return jsonify({'error': 'Notification not found'}), 404
+        
+        notification.is_read = True
+        db.session.commit()
+        
+        return jsonify({'message': 'Notification marked as read'}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error marking room notification as read: {str(e)}")
+        return jsonify({'error': 'Failed to update notification'}), 500
+
 @api.route('/admin/fee-notifications', methods=['GET'])
 @jwt_required()
 def get_all_fee_notifications():
@@ -2741,6 +3965,26 @@ def get_new_complaints_count():
         current_app.logger.error(f"Error getting new complaints count: {str(e)}")
         return jsonify({'count': 0}), 200
 
+@api.route('/notifications/complaint-escalations/count', methods=['GET'])
+@jwt_required()
+def get_unread_complaint_escalations_count():
+    """Get count of unread overdue complaint alerts for an admin"""
+    current_user = User.query.get(get_jwt_identity())
+    
+    if current_user.role != 'admin':
+        return jsonify({'count': 0}), 200
+    
+    try:
+        unread_count = ComplaintEscalation.query.filter_by(
+            admin_user_id=current_user.id,
+            is_viewed=False
+        ).count()
+        
+        return jsonify({'count': unread_count}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error getting complaint escalation count: {str(e)}")
+        return jsonify({'count': 0}), 200
+
 @api.route('/notifications/new-notices/count', methods=['GET'])
 @jwt_required()
 def get_new_notices_count():
@@ -2787,6 +4031,31 @@ def mark_complaint_replies_viewed():
         current_app.logger.error(f"Error marking complaint replies as viewed: {str(e)}")
         return jsonify({'message': 'Failed to mark notifications as viewed'}), 500
 
+@api.route('/notifications/complaint-escalations/mark-viewed', methods=['POST'])
+@jwt_required()
+def mark_complaint_escalations_viewed():
+    """Mark all overdue complaint alerts as viewed for an admin"""
+    current_user = User.query.get(get_jwt_identity())
+    
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+    
+    try:
+        ComplaintEscalation.query.filter_by(
+            admin_user_id=current_user.id,
+            is_viewed=False
+        ).update({
+            'is_viewed': True,
+            'viewed_at': datetime.utcnow()
+        })
+        
+        db.session.commit()
+        
+        return jsonify({'message': 'Complaint escalation notifications marked as viewed'}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error marking complaint escalations as viewed: {str(e)}")
+        return jsonify({'message': 'Failed to mark notifications as viewed'}), 500
+
 @api.route('/notifications/new-complaints/mark-viewed', methods=['POST'])
 @jwt_required()
 def mark_new_complaints_viewed():
@@ -0,0 +1,127 @@
+"""Admin full-text search over complaints, replies, notices and feedback.
+
+All four are indexed in one SQLite FTS5 table, search_index, with a title
+column (complaint subject, notice title) and a body column. Each document's
+rowid is its id * 8 + a type code, so a source row maps to exactly one
+index row and is replaced or removed by rowid. Triggers on the source
+tables keep the index current for every write, ORM or bulk SQL alike.
+
+The table and triggers are created when the app starts; an index that did
+not exist yet is filled from the source tables. rebuild_search_index.py
+rebuilds it from scratch.
+"""
+import re
+
+from sqlalchemy import event, text
+
+from app import db
+
+MAX_RESULTS = 50
+MAX_QUERY_TERMS = 8
+
+# type name -> (code, table, title column, body column, parent id column)
+SOURCES = {
+    'complaint': (1, 'complaint', 'subject', 'details', 'NULL'),
+    'complaint_reply': (2, 'complaint_reply', 'NULL', 'content', 'complaint_id'),
+    'notice': (3, 'notice', 'title', 'content', 'NULL'),
+    'feedback': (4, 'feedback', 'NULL', 'content', 'NULL')
+}
+_TYPES = {code: name for name, (code, *_) in SOURCES.items()}
+
+
+class SearchQueryError(ValueError):
+    """Raised for a search that cannot be run"""
+
+
+def _row(source, alias):
+    code, _, title, body, parent = SOURCES[source]
+    column = lambda name: name if name == 'NULL' else f'{alias}.{name}'
+    return f'{alias}.id * 8 + {code}, {column(title)}, {column(body)}, {column(parent)}'
+
+
+def _statements():
+    yield ("CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+           "title, body, parent_id UNINDEXED, tokenize = 'porter unicode61', prefix = '2 3')")
+    for source, (code, table, *_) in SOURCES.items():
+        insert = f'INSERT INTO search_index (rowid, title, body, parent_id) VALUES ({_row(source, "new")});'
+        remove = f'DELETE FROM search_index WHERE rowid = old.id * 8 + {code};'
+        yield f'CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} BEGIN {insert} END'
+        yield f'CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE ON {table} BEGIN {remove} {insert} END'
+        yield f'CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} BEGIN {remove} END'
+
+
+def install_search_index():
+    """Create the index and its triggers if missing, filling a new index. The caller commits."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    ).first()
+    for statement in _statements():
+        db.session.execute(text(statement))
+    if not exists:
+        rebuild_search_index()
+    return True
+
+
+def rebuild_search_index():
+    """Re-index every document from the source tables. Returns the number indexed; the caller commits."""
+    db.session.execute(text('DELETE FROM search_index'))
+    for source, (_, table, *_) in SOURCES.items():
+        db.session.execute(text(
+            f'INSERT INTO search_index (rowid, title, body, parent_id) SELECT {_row(source, table)} FROM {table}'
+        ))
+    db.session.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+    return db.session.execute(text('SELECT COUNT(*) FROM search_index')).scalar()
+
+
+@event.listens_for(db.metadata, 'after_drop')
+def _drop_search_index(target, connection, **kw):
+    # Not part of the metadata, but only meaningful with the tables it indexes
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text('DROP TABLE IF EXISTS search_index'))
+
+
+def _match_query(q):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    terms = re.findall(r'\w+', q or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        raise SearchQueryError('Enter at least one word to search for')
+    return ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+
+def parse_types(value):
+    """Read a comma separated list of document types; None or '' means all"""
+    types = [name.strip() for name in (value or '').split(',') if name.strip()]
+    unknown = [name for name in types if name not in SOURCES]
+    if unknown:
+        raise SearchQueryError(f"Unknown type(s): {', '.join(unknown)}. Use {', '.join(SOURCES)}")
+    return types or None
+
+
+def search_documents(q, types=None, limit=MAX_RESULTS):
+    """Return up to limit documents matching q, best first, each with a highlighted snippet.
+
+    types restricts the search to some of SOURCES.
+    """
+    codes = [SOURCES[name][0] for name in (types or SOURCES)]
+    rows = db.session.execute(text(
+        f"SELECT rowid, title, parent_id, "
+        f"snippet(search_index, 1, '**', '**', '…', 16) AS snippet, "
+        f"bm25(search_index, 4.0, 1.0) AS score "
+        f"FROM search_index WHERE search_index MATCH :q AND rowid % 8 IN ({', '.join(map(str, codes))}) "
+        f"ORDER BY score LIMIT :limit"
+    ), {'q': _match_query(q), 'limit': limit}).all()
+    results = []
+    for row in rows:
+        result = {
+            'type': _TYPES[row.rowid % 8],
+            'id': row.rowid // 8,
+            'title': row.title,
+            'snippet': row.snippet,
+            'score': round(-row.score, 4)
+        }
+        if row.parent_id is not None:
+            result['complaint_id'] = row.parent_id
+        results.append(result)
+    return results
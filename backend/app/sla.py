@@ -0,0 +1,283 @@
+"""Complaint priorities, SLA deadlines and escalation of overdue complaints.
+
+Every complaint gets a deadline COMPLAINT_SLA_HOURS[priority] after it was
+raised; it is set when the complaint is first flushed and recomputed when
+its priority changes. A complaint still pending past its deadline is
+escalated once: it is flagged with escalated_at, and every admin gets a
+ComplaintEscalation alert and an email. The flag is cleared when the
+complaint goes back to pending or its deadline moves later, so it can be
+escalated again.
+
+SLAScheduler keeps a min-heap of (deadline, complaint id) for pending
+complaints not yet escalated. The heap is loaded once at startup with a seek
+on the (status, deadline) index; complaints committed in this process are
+pushed as they commit, and ones written elsewhere (other workers, bulk SQL)
+are picked up by id every COMPLAINT_SLA_POLL_SECONDS. The worker thread
+sleeps until the earliest deadline, so the table is never rescanned.
+
+Heap entries are not removed when a complaint is resolved or its priority
+changes: the escalating UPDATE re-checks status and deadline, so a stale or
+duplicate entry, or a second worker process escalating the same complaint,
+does nothing.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, event, func, inspect, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.complaints import decode_cursor, summarize_complaints, DEFAULT_PAGE_SIZE
+from app.email import send_complaint_escalation_email
+from app.models import User, Complaint, ComplaintEscalation
+
+PRIORITIES = ('low', 'normal', 'high', 'urgent')
+DEFAULT_PRIORITY = 'normal'
+OPEN_STATUS = 'Pending'
+
+
+class ComplaintPriorityError(ValueError):
+    """Raised for an unknown complaint priority"""
+
+
+def parse_priority(value, default=DEFAULT_PRIORITY):
+    if value in (None, ''):
+        return default
+    priority = str(value).strip().lower()
+    if priority not in PRIORITIES:
+        raise ComplaintPriorityError(f"priority must be one of {', '.join(PRIORITIES)}")
+    return priority
+
+
+def sla_deadline(priority, created_at):
+    return created_at + timedelta(hours=current_app.config['COMPLAINT_SLA_HOURS'][priority or DEFAULT_PRIORITY])
+
+
+@event.listens_for(Session, 'before_flush')
+def _set_deadlines(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Complaint):
+            continue
+        if obj in session.new:
+            obj.priority = obj.priority or DEFAULT_PRIORITY
+            obj.created_at = obj.created_at or datetime.utcnow()
+            if obj.deadline is None:
+                obj.deadline = sla_deadline(obj.priority, obj.created_at)
+        else:
+            if inspect(obj).attrs.priority.history.has_changes():
+                obj.deadline = sla_deadline(obj.priority, obj.created_at)
+            if obj.escalated_at and _reopened(obj):
+                # Escalated again (and queued by _track_deadlines) if it goes overdue again
+                obj.escalated_at = None
+
+
+def _reopened(complaint):
+    """Whether an escalated complaint went back to pending or had its deadline moved later"""
+    attrs = inspect(complaint).attrs
+    if attrs.status.history.has_changes() and complaint.status == OPEN_STATUS:
+        return True
+    deadline = attrs.deadline.history
+    if not deadline.has_changes() or complaint.deadline is None:
+        return False
+    return not deadline.deleted or deadline.deleted[0] is None or complaint.deadline > deadline.deleted[0]
+
+
+def queue_deadlines(session, entries):
+    """Push (deadline, complaint id) entries to the scheduler once session commits"""
+    entries = [entry for entry in entries if entry[0] is not None]
+    if entries:
+        session.info.setdefault('hms_sla_pending', set()).update(entries)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_deadlines(session, flush_context):
+    queue_deadlines(session, [
+        (obj.deadline, obj.id) for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Complaint) and obj.status == OPEN_STATUS and not obj.escalated_at
+    ])
+
+
+@event.listens_for(Session, 'after_commit')
+def _schedule_after_commit(session):
+    entries = session.info.pop('hms_sla_pending', None)
+    if not entries or not has_app_context():
+        return
+    scheduler = current_app.extensions.get('hms_sla_scheduler')
+    if scheduler is not None:
+        scheduler.push(entries)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('hms_sla_pending', None)
+
+
+def escalate_complaints(complaint_ids, now=None):
+    """Escalate those of complaint_ids still pending past their deadline, and commit.
+
+    Each escalated complaint is flagged and every admin gets an alert, then
+    one email listing them. Returns the ids escalated.
+    """
+    now = now or datetime.utcnow()
+    complaints = Complaint.__table__.c
+    escalated = db.session.execute(
+        update(Complaint.__table__)
+        .where(complaints.id.in_(complaint_ids), complaints.status == OPEN_STATUS,
+               complaints.escalated_at.is_(None), complaints.deadline <= now)
+        .values(escalated_at=now)
+        .returning(complaints.id, complaints.subject, complaints.priority, complaints.deadline)
+    ).all()
+    if not escalated:
+        db.session.commit()
+        return []
+    admins = db.session.execute(select(User.id, User.name, User.email).where(User.role == 'admin')).all()
+    if admins:
+        db.session.execute(insert(ComplaintEscalation), [
+            {'admin_user_id': admin.id, 'complaint_id': row.id, 'created_at': now}
+            for row in escalated for admin in admins
+        ])
+    db.session.commit()
+
+    escalated = sorted(escalated, key=lambda row: (row.deadline, row.id))
+    current_app.logger.info(f"Escalated {len(escalated)} overdue complaint(s)")
+    for admin in admins:
+        try:
+            send_complaint_escalation_email(admin.email, admin.name, [tuple(row) for row in escalated])
+        except Exception as e:
+            current_app.logger.error(f"Failed to send complaint escalation email: {str(e)}")
+    return [row.id for row in escalated]
+
+
+def overdue_complaints(now=None, priority=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (complaints, next_after) for pending complaints past their deadline, most overdue first.
+
+    after is the cursor of a previous page. Each complaint has reply_count
+    and last_reply instead of the replies, and overdue_seconds.
+    """
+    now = now or datetime.utcnow()
+    query = Complaint.query.filter(Complaint.status == OPEN_STATUS, Complaint.deadline <= now)
+    if priority:
+        query = query.filter(Complaint.priority == parse_priority(priority))
+    if after:
+        deadline, complaint_id = decode_cursor(after)
+        query = query.filter(or_(
+            Complaint.deadline > deadline,
+            and_(Complaint.deadline == deadline, Complaint.id > complaint_id)
+        ))
+    complaints = query.order_by(Complaint.deadline, Complaint.id).limit(limit).all()
+    items = summarize_complaints(complaints)
+    for item, complaint in zip(items, complaints):
+        item['overdue_seconds'] = int((now - complaint.deadline).total_seconds())
+    next_after = None
+    if len(complaints) == limit:
+        last = complaints[-1]
+        next_after = f"{last.deadline.isoformat(timespec='microseconds')},{last.id}"
+    return items, next_after
+
+
+class SLAScheduler:
+    """Min-heap of pending complaint deadlines, escalated by a daemon thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self.heap = []
+        self.last_id = 0
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = None
+
+    def push(self, entries):
+        with self.condition:
+            for deadline, complaint_id in entries:
+                heapq.heappush(self.heap, (deadline, complaint_id))
+            self.condition.notify()
+
+    def load(self):
+        """Fill the heap with every pending complaint not yet escalated. Needs an app context."""
+        self.last_id = db.session.execute(select(func.max(Complaint.id))).scalar() or 0
+        rows = db.session.execute(
+            select(Complaint.deadline, Complaint.id)
+            .where(Complaint.status == OPEN_STATUS, Complaint.deadline.isnot(None),
+                   Complaint.escalated_at.is_(None))
+        ).all()
+        self.push([tuple(row) for row in rows])
+
+    def poll(self):
+        """Push complaints raised since the last load or poll, in any process. Needs an app context."""
+        rows = db.session.execute(
+            select(Complaint.id, Complaint.deadline, Complaint.status, Complaint.escalated_at)
+            .where(Complaint.id > self.last_id)
+            .order_by(Complaint.id)
+        ).all()
+        if rows:
+            self.last_id = rows[-1].id
+        self.push([
+            (row.deadline, row.id) for row in rows
+            if row.deadline and row.status == OPEN_STATUS and not row.escalated_at
+        ])
+
+    def run_due(self, now=None):
+        """Escalate every complaint on the heap whose deadline has passed. Needs an app context."""
+        now = now or datetime.utcnow()
+        due = []
+        with self.condition:
+            while self.heap and self.heap[0][0] <= now:
+                due.append(heapq.heappop(self.heap)[1])
+        if not due:
+            return []
+        try:
+            return escalate_complaints(due, now)
+        except Exception:
+            db.session.rollback()
+            # Try again on the next poll rather than lose them
+            retry_at = now + timedelta(seconds=self.app.config.get('COMPLAINT_SLA_POLL_SECONDS', 60))
+            self.push([(retry_at, complaint_id) for complaint_id in due])
+            raise
+
+    def _run(self):
+        interval = timedelta(seconds=self.app.config.get('COMPLAINT_SLA_POLL_SECONDS', 60))
+        next_poll = datetime.utcnow() + interval
+        while True:
+            with self.condition:
+                wake = min(next_poll, self.heap[0][0]) if self.heap else next_poll
+                timeout = (wake - datetime.utcnow()).total_seconds()
+                if timeout > 0 and not self.stopped:
+                    self.condition.wait(timeout)
+                if self.stopped:
+                    return
+            with self.app.app_context():
+                try:
+                    if datetime.utcnow() >= next_poll:
+                        self.poll()
+                        next_poll = datetime.utcnow() + interval
+                    self.run_due()
+                except Exception as e:
+                    self.app.logger.error(f"Complaint SLA scheduler error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def start(self):
+        with self.app.app_context():
+            self.load()
+            db.session.remove()
+        self.thread = threading.Thread(target=self._run, name='complaint-sla', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+
+
+def start_sla_scheduler(app):
+    """Start escalating overdue complaints in the background, unless disabled or testing"""
+    if not app.config.get('COMPLAINT_SLA_SCHEDULER') or app.testing:
+        return None
+    scheduler = SLAScheduler(app)
+    app.extensions['hms_sla_scheduler'] = scheduler
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,31 @@
+"""When a student's stay in the hostel ends.
+
+A stay runs semesters_requested semesters (of SEMESTER_DAYS days each) from
+Student.join_date. Students without a join date have no end.
+"""
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import and_, false, func, or_, select
+
+from app import db
+from app.models import Student
+
+
+def stay_ended(today):
+    """SQL condition matching students whose stay ended on or before today.
+
+    There are only a few distinct stay lengths, so the condition is one
+    join_date range per length rather than date arithmetic on every row.
+    """
+    days = current_app.config.get('SEMESTER_DAYS', 182)
+    semesters = func.coalesce(Student.semesters_requested, 1)
+    lengths = db.session.execute(
+        select(semesters).where(Student.join_date.isnot(None)).distinct()
+    ).scalars().all()
+    if not lengths:
+        return false()
+    return or_(*[
+        and_(semesters == n, Student.join_date <= today - timedelta(days=n * days))
+        for n in lengths
+    ])
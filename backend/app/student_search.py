@@ -0,0 +1,251 @@
+"""In-process prefix index for admin student lookup.
+
+Every student is indexed under the words of their name and course, their
+email, roll number and the digits of their contact number (with and
+without a country code). The index is a sorted list of (token, student_id)
+pairs, so all students with a token starting with a prefix form one
+contiguous slice found with two bisects, and a search only touches the
+database to pick up changes.
+
+The index is built when the app starts and kept current incrementally:
+students whose rows (or whose user's name or email) change are queued when
+the change commits and re-read with one query before the next search. ORM
+flushes are tracked automatically; code that writes students with bulk SQL
+calls mark_students_changed() itself.
+
+Every worker process keeps its own index, so before a search it also
+catches up on changes committed by other processes: students whose
+updated_at (bumped by app.changes for user renames too) or tombstone is
+newer than the last catch-up, less OVERLAP_SECONDS for transactions that
+stamped their rows shortly before committing. Both are index range scans,
+run at most once every CATCH_UP_SECONDS so a burst of typeahead requests
+costs one catch-up.
+"""
+import bisect
+import re
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Student, User, StudentTombstone
+
+MAX_RESULTS = 20
+MAX_QUERY_WORDS = 5
+OVERLAP_SECONDS = 5
+CATCH_UP_SECONDS = 1
+
+# Sorts after any character that can appear in a token
+_HIGH = '\U0010ffff'
+
+
+def _words(value):
+    return (value or '').lower().split()
+
+
+def _tokens(name, email, roll_number, course, contact_number):
+    tokens = set(_words(name)) | set(_words(course))
+    if email:
+        tokens.add(email.lower())
+    if roll_number:
+        tokens.add(roll_number.lower())
+    digits = re.sub(r'\D', '', contact_number or '')
+    if digits:
+        tokens.add(digits)
+        # Also without a country code
+        tokens.add(digits[-10:])
+    return tokens
+
+
+def _query(student_ids=None, user_ids=None):
+    query = db.session.query(
+        Student.id, User.name, User.email, Student.roll_number, Student.course,
+        Student.contact_number, Student.is_approved, Student.is_enrollment_requested,
+        Student.status, Student.room_id
+    ).join(User, Student.user_id == User.id)
+    conditions = []
+    if student_ids:
+        conditions.append(Student.id.in_(student_ids))
+    if user_ids:
+        conditions.append(Student.user_id.in_(user_ids))
+    if conditions:
+        query = query.filter(or_(*conditions))
+    return query
+
+
+class StudentIndex:
+    """Sorted (token, student_id) pairs plus the record shown for each student"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = []
+        self.tokens = {}
+        self.records = {}
+        self.built = False
+        self.synced_at = None
+        self.pending_students = set()
+        self.pending_users = set()
+
+    def _record(self, row):
+        (student_id, name, email, roll_number, course, contact_number,
+         is_approved, is_enrollment_requested, status, room_id) = row
+        return {
+            'id': student_id,
+            'name': name,
+            'email': email,
+            'roll_number': roll_number,
+            'course': course,
+            'contact_number': contact_number,
+            'is_approved': is_approved,
+            'is_enrollment_requested': is_enrollment_requested,
+            'status': status,
+            'room_id': room_id
+        }
+
+    def build(self):
+        started = datetime.utcnow()
+        keys, tokens, records = [], {}, {}
+        for row in _query():
+            student_tokens = _tokens(row.name, row.email, row.roll_number, row.course, row.contact_number)
+            tokens[row.id] = student_tokens
+            records[row.id] = self._record(row)
+            keys.extend((token, row.id) for token in student_tokens)
+        keys.sort()
+        with self.lock:
+            self.keys, self.tokens, self.records = keys, tokens, records
+            self.synced_at = started
+            self.built = True
+
+    def _remove(self, student_id):
+        for token in self.tokens.pop(student_id, ()):
+            i = bisect.bisect_left(self.keys, (token, student_id))
+            if i < len(self.keys) and self.keys[i] == (token, student_id):
+                del self.keys[i]
+        self.records.pop(student_id, None)
+
+    def _add(self, row):
+        student_tokens = _tokens(row.name, row.email, row.roll_number, row.course, row.contact_number)
+        for token in student_tokens:
+            bisect.insort(self.keys, (token, row.id))
+        self.tokens[row.id] = student_tokens
+        self.records[row.id] = self._record(row)
+
+    def catch_up(self):
+        """Queue the students changed or deleted by any process since the last catch-up"""
+        started = datetime.utcnow()
+        if started - self.synced_at < timedelta(seconds=CATCH_UP_SECONDS):
+            return
+        since = self.synced_at - timedelta(seconds=OVERLAP_SECONDS)
+        changed = set(db.session.execute(select(Student.id).where(Student.updated_at >= since)).scalars())
+        changed.update(db.session.execute(
+            select(StudentTombstone.student_id).where(StudentTombstone.deleted_at >= since)
+        ).scalars())
+        with self.lock:
+            self.pending_students |= changed
+            self.synced_at = max(self.synced_at, started)
+
+    def refresh(self):
+        """Re-index the students changed since the last search"""
+        with self.lock:
+            student_ids, user_ids = self.pending_students, self.pending_users
+            self.pending_students, self.pending_users = set(), set()
+        if not (student_ids or user_ids):
+            return
+        rows = _query(student_ids, user_ids).all()
+        with self.lock:
+            for student_id in student_ids:
+                self._remove(student_id)
+            for row in rows:
+                self._remove(row.id)
+                self._add(row)
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self.keys, (prefix,))
+        hi = bisect.bisect_left(self.keys, (prefix + _HIGH,), lo)
+        return lo, hi
+
+    def search(self, q, limit=MAX_RESULTS):
+        words = _words(q)[:MAX_QUERY_WORDS]
+        if not words:
+            return []
+        with self.lock:
+            # Walk the smallest slice; every other word must prefix one of the student's tokens
+            (lo, hi), first = min(
+                ((self._range(word), word) for word in words),
+                key=lambda item: item[0][1] - item[0][0]
+            )
+            others = [word for word in words if word != first]
+            results, seen = [], set()
+            for i in range(lo, hi):
+                student_id = self.keys[i][1]
+                if student_id in seen:
+                    continue
+                seen.add(student_id)
+                student_tokens = self.tokens[student_id]
+                if all(any(token.startswith(word) for token in student_tokens) for word in others):
+                    results.append(dict(self.records[student_id]))
+                    if len(results) >= limit:
+                        break
+            return results
+
+
+def _index():
+    index = current_app.extensions.get('hms_student_search')
+    if index is None:
+        index = current_app.extensions.setdefault('hms_student_search', StudentIndex())
+    return index
+
+
+def build_student_index():
+    """Build the index for the current app; called once at startup"""
+    _index().build()
+
+
+def search_students(q, limit=MAX_RESULTS):
+    """Return up to limit students with a token starting with every word of q"""
+    index = _index()
+    if not index.built:
+        index.build()
+    else:
+        index.catch_up()
+    index.refresh()
+    return index.search(q, limit)
+
+
+def mark_students_changed(student_ids, session=None):
+    """Queue students written with bulk SQL for re-indexing when the transaction commits"""
+    session = session or db.session()
+    session.info.setdefault('hms_search_pending', (set(), set()))[0].update(student_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_student_changes(session, flush_context):
+    pending = session.info.setdefault('hms_search_pending', (set(), set()))
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Student):
+            pending[0].add(obj.id)
+        elif isinstance(obj, User) and obj in session.dirty:
+            state = inspect(obj)
+            if state.attrs.name.history.has_changes() or state.attrs.email.history.has_changes():
+                pending[1].add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_after_commit(session):
+    student_ids, user_ids = session.info.pop('hms_search_pending', (set(), set()))
+    if not (student_ids or user_ids) or not has_app_context():
+        return
+    index = current_app.extensions.get('hms_student_search')
+    if index is None:
+        return
+    with index.lock:
+        index.pending_students |= student_ids
+        index.pending_users |= user_ids
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('hms_search_pending', None)
@@ -0,0 +1,118 @@
+"""Admin timeline of everything recorded about one student.
+
+Attendance, fees, complaints, leave requests and fee notifications are
+merged newest first. Each source is read through its (student, time, id)
+index in small keyset chunks, and heapq.merge pulls from the sources only
+as the page fills, so a page of n events reads about n rows in total
+rather than every row of every source.
+
+Events are ordered by (time, source, id), which is also the cursor: the
+next page starts strictly below the last event of the previous one.
+"""
+import heapq
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import and_, or_
+
+from app.models import Attendance, Fee, Complaint, LeaveRequest, FeeNotification
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MIN_CHUNK = 4
+
+
+class TimelineCursorError(ValueError):
+    """Raised for a cursor that was not issued by this endpoint"""
+
+
+def _complaint_dict(complaint):
+    # Complaint.to_dict() loads the replies and the author; the timeline only needs a summary
+    return {
+        'id': complaint.id,
+        'subject': complaint.subject,
+        'details': complaint.details,
+        'status': complaint.status,
+        'created_at': complaint.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+# name -> (model, owner column, time column, serializer); the order breaks timestamp ties
+SOURCES = {
+    'attendance': (Attendance, Attendance.student_id, Attendance.timestamp, Attendance.to_dict),
+    'complaint': (Complaint, Complaint.user_id, Complaint.created_at, _complaint_dict),
+    'fee': (Fee, Fee.student_id, Fee.created_at, Fee.to_dict),
+    'fee_notification': (FeeNotification, FeeNotification.student_id, FeeNotification.created_at,
+                         FeeNotification.to_dict),
+    'leave_request': (LeaveRequest, LeaveRequest.student_id, LeaveRequest.created_at, LeaveRequest.to_dict)
+}
+_RANK = {name: rank for rank, name in enumerate(SOURCES)}
+
+
+def encode_cursor(key):
+    timestamp, rank, event_id = key
+    return f"{timestamp.isoformat(timespec='microseconds')},{list(SOURCES)[rank]},{event_id}"
+
+
+def decode_cursor(value):
+    try:
+        timestamp, source, event_id = value.split(',')
+        return datetime.fromisoformat(timestamp), _RANK[source], int(event_id)
+    except (AttributeError, KeyError, ValueError):
+        raise TimelineCursorError('Invalid cursor')
+
+
+def _events(name, owner_id, before, chunk):
+    """Yield (key, event) for one source, newest first, below the before key"""
+    model, owner, time, serialize = SOURCES[name]
+    rank = _RANK[name]
+    query = model.query.filter(owner == owner_id, time.isnot(None))
+    if before is not None:
+        timestamp, before_rank, before_id = before
+        if rank < before_rank:
+            query = query.filter(time <= timestamp)
+        elif rank > before_rank:
+            query = query.filter(time < timestamp)
+        else:
+            query = query.filter(or_(time < timestamp, and_(time == timestamp, model.id < before_id)))
+    query = query.order_by(time.desc(), model.id.desc())
+
+    last = None
+    while True:
+        page = query
+        if last is not None:
+            page = page.filter(or_(time < last[0], and_(time == last[0], model.id < last[1])))
+        rows = page.limit(chunk).all()
+        for row in rows:
+            timestamp = getattr(row, time.key)
+            yield (timestamp, rank, row.id), {
+                'type': name,
+                'id': row.id,
+                'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'data': serialize(row)
+            }
+        if len(rows) < chunk:
+            return
+        last = (getattr(rows[-1], time.key), rows[-1].id)
+        # Each further chunk is only read if this source keeps winning the merge
+        chunk *= 2
+
+
+def student_timeline(student, before=None, limit=DEFAULT_LIMIT):
+    """Return (events, next_cursor) for one page of a student's timeline.
+
+    before is a cursor from a previous page; next_cursor is None when there
+    is nothing older.
+    """
+    if before is not None:
+        before = decode_cursor(before)
+    # A first chunk small enough that the sources together read about one page
+    chunk = max(MIN_CHUNK, (limit + 1) // len(SOURCES) + 1)
+    sources = [
+        _events(name, student.user_id if name == 'complaint' else student.id, before, chunk)
+        for name in SOURCES
+    ]
+    merged = list(islice(heapq.merge(*sources, key=lambda item: item[0], reverse=True), limit + 1))
+    events = [event for _, event in merged[:limit]]
+    next_cursor = encode_cursor(merged[limit - 1][0]) if len(merged) > limit else None
+    return events, next_cursor
@@ -0,0 +1,36 @@
+"""Password reset tokens.
+
+A reset token is a JWT with purpose=password_reset and a digest of the
+user's password hash at the time it was issued. reset_password() only
+accepts it while that digest still matches, so the first reset spends it
+(and any other link issued before), and every other route refuses it: it
+is not a login.
+"""
+import hashlib
+
+from flask import request
+from flask_jwt_extended import create_access_token
+
+PURPOSE = 'password_reset'
+RESET_ENDPOINT = 'api.reset_password'
+
+
+def password_fingerprint(password_hash):
+    return hashlib.sha256((password_hash or '').encode()).hexdigest()[:16]
+
+
+def password_reset_token(user_id, email, password_hash, expires_delta):
+    return create_access_token(
+        identity=str(user_id),
+        additional_claims={'purpose': PURPOSE, 'email': email, 'pwd': password_fingerprint(password_hash)},
+        expires_delta=expires_delta
+    )
+
+
+def is_valid_reset_token(claims, user):
+    return claims.get('purpose') == PURPOSE and claims.get('pwd') == password_fingerprint(user.password_hash)
+
+
+def reject_reset_tokens(jwt_header, jwt_payload):
+    """token_in_blocklist_loader: reset tokens only work on the reset endpoint"""
+    return jwt_payload.get('purpose') == PURPOSE and request.endpoint != RESET_ENDPOINT
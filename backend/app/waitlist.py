@@ -0,0 +1,72 @@
+"""Room waitlist.
+
+Pending students can queue for a specific room or for any room of a type.
+When a seat is freed, fill_freed_seat() promotes the head of the room's
+queue (falling back to the room type's queue) in the same transaction. The
+head of each queue is found with a single index seek on (room_id, id) or
+(room_type, room_id, id), so promotion costs the same however long the
+queues are.
+"""
+from datetime import datetime
+from app import db
+from app.models import Room, RoomWaitlistEntry, RoomNotification
+from app.occupancy import seat_student, RoomFullError
+
+
+def _head(room):
+    entry = RoomWaitlistEntry.query.filter_by(room_id=room.id).order_by(RoomWaitlistEntry.id).first()
+    if entry is None:
+        entry = RoomWaitlistEntry.query.filter_by(
+            room_type=room.room_type, room_id=None
+        ).order_by(RoomWaitlistEntry.id).first()
+    return entry
+
+
+def is_waiting(student):
+    """Only pending enrollment requests can be promoted from the waitlist"""
+    return bool(student.is_enrollment_requested) and not student.is_approved and student.status != 'rejected'
+
+
+def fill_freed_seat(room_id):
+    """Give a freed seat in room_id to the next waiting student.
+
+    Must be called in the transaction that freed the seat. Returns the
+    promoted Student, or None if nobody was waiting. The caller commits and
+    may email the student afterwards; the in-app notification is created
+    here.
+    """
+    if not room_id:
+        return None
+    room = db.session.get(Room, room_id)
+    if room is None:
+        return None
+
+    entry = _head(room)
+    # Entries are removed whenever a student is seated or rejected, so a
+    # stale head is rare; each one is discarded at most once
+    while entry is not None and not is_waiting(entry.student):
+        db.session.delete(entry)
+        db.session.flush()
+        entry = _head(room)
+    if entry is None:
+        return None
+
+    student = entry.student
+    try:
+        seat_student(student, room)
+    except RoomFullError:
+        # The seat went to a concurrent approval - the student keeps their place
+        return None
+
+    now = datetime.utcnow()
+    student.approval_date = now
+    if not student.join_date:
+        student.join_date = now.date()
+
+    db.session.add(RoomNotification(
+        student_id=student.id,
+        title='Room allocated',
+        content=f'A seat has opened up in room {room.room_number} and has been allocated to you. '
+                'Your enrollment request is now approved.'
+    ))
+    return student
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Semester rollover: move rejected students and students whose stay has
+ended, with their history, into the archive tables.
+
+Run this at the end of each semester (or from cron). Students still
+holding a seat are left alone; archived students can be restored from the
+admin API.
+"""
+
+import sys
+
+from app import create_app, db
+from app.archive import archive_students
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            summary = archive_students()
+            print(f"Archived {summary['students']} students and {summary['records']} records "
+                  f"in {summary['batches']} batches (batch id {summary['batch_id']})")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error archiving students: {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Cluster complaints that have no cluster yet.
+
+New complaints are clustered as they are raised; run this once after the
+clustering migration, and after loading complaints with bulk SQL.
+"""
+
+import sys
+
+from app import create_app, db
+from app.clustering import cluster_complaints
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            clustered = cluster_complaints()
+            print(f"Clustered {clustered} complaints")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error clustering complaints: {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -30,4 +30,32 @@ class Config:
     # For testing, you can set these directly (but using environment variables is more secure)
     # MAIL_USERNAME = 'your-email@gmail.com'
     # MAIL_PASSWORD = 'your-app-password'
-    # MAIL_DEFAULT_SENDER = 'HMS <your-email@gmail.com>' 
\ No newline at end of file
+    # MAIL_DEFAULT_SENDER = 'HMS <your-email@gmail.com>'
+    
+    # Frontend base URL, used in links sent to users
+    FRONTEND_URL = os.environ.get('FRONTEND_URL') or 'http://localhost:8080'
+    
+    # Bulk student onboarding: password hashing worker processes (None = one per CPU)
+    # and how long the password reset links issued to imported students stay valid
+    ONBOARDING_HASH_WORKERS = None
+    ONBOARDING_RESET_LINK_DAYS = 7
+    
+    # Length of one semester, used with Student.join_date and semesters_requested
+    # to work out when a student's stay ends
+    SEMESTER_DAYS = 182
+    
+    # Semester rollover archival: rejected students untouched for this many days
+    # are moved to the archive tables
+    ARCHIVE_REJECTED_AFTER_DAYS = 30
+    
+    # Complaint SLA: hours from when a complaint is raised to its deadline, by
+    # priority. Pending complaints past their deadline are escalated to the admins
+    # by a background scheduler, started by app.py when this flag is on
+    COMPLAINT_SLA_HOURS = {'urgent': 4, 'high': 24, 'normal': 72, 'low': 168}
+    COMPLAINT_SLA_SCHEDULER = os.environ.get('COMPLAINT_SLA_SCHEDULER', 'true').lower() == 'true'
+    # How often the scheduler picks up complaints raised by other processes
+    COMPLAINT_SLA_POLL_SECONDS = 60
+    
+    # Complaint clustering: estimated similarity (0-1) of a new complaint's text to a
+    # pending complaint's at which it joins that complaint's cluster
+    COMPLAINT_CLUSTER_THRESHOLD = 0.5
@@ -0,0 +1,61 @@
+"""
+Shared pytest fixtures: an app on a throwaway SQLite database, the default
+admin and their auth headers, and a recorder for the SQL a test runs
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.models import User
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+
+@pytest.fixture
+def app_config():
+    """Config class for the app fixture; override in a test module to change settings"""
+    return TestConfig
+
+
+@pytest.fixture
+def app(app_config):
+    app = create_app(app_config)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def admin(app):
+    return User.query.filter_by(role='admin').first()
+
+
+@pytest.fixture
+def headers(admin):
+    return {'Authorization': f"Bearer {create_access_token(identity=str(admin.id))}"}
+
+
+@pytest.fixture
+def count_queries(app):
+    """Record the statements run in a block: with count_queries() as statements: ..."""
+    @contextmanager
+    def recording():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    return recording
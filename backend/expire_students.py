@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Mark students whose stay has ended inactive and free their rooms.
+
+A stay ends semesters_requested semesters (SEMESTER_DAYS each) after the
+student's join date. Run this daily from cron; freed seats go to the room
+waitlists and promoted students are emailed.
+"""
+
+import sys
+
+from app import create_app, db
+from app.email import send_room_allocation_email
+from app.expiry import expire_students
+from app.models import User, Room
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            summary = expire_students()
+            print(f"Expired {summary['expired']} students in {summary['batches']} batches")
+            for room_id, count in sorted(summary['freed_seats'].items()):
+                print(f"  room {db.session.get(Room, room_id).room_number}: {count} seat(s) freed")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error expiring students: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        for student in summary['promoted']:
+            user = db.session.get(User, student.user_id)
+            room = db.session.get(Room, student.room_id)
+            print(f"  {user.email} promoted from the waitlist into room {room.room_number}")
+            try:
+                send_room_allocation_email(user.email, user.name, room.room_number)
+            except Exception as e:
+                print(f"  Failed to send room allocation email: {e}")
+
+if __name__ == '__main__':
+    main()
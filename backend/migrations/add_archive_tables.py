@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the student archive tables
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import db
+from migration_app import migration_app
+from app.models import ArchivedStudent, ArchivedRecord
+
+def create_archive_tables():
+    """Create the student archive tables"""
+    app = migration_app()
+    
+    with app.app_context():
+        try:
+            print("Creating student archive tables...")
+            
+            # Create tables
+            db.create_all()
+            
+            print("✓ Successfully created student archive tables")
+            print("  - ArchivedStudent")
+            print("  - ArchivedRecord")
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error creating student archive tables: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = create_archive_tables()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,42 @@
+"""
+Migration script to add near-duplicate complaint clustering
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Creates the complaint_cluster, complaint_signature and complaint_band tables
+    and adds cluster_id to Complaint; run cluster_complaints.py afterwards to
+    cluster the existing complaints
+    """
+    print("Starting migration to add complaint clustering...")
+    app = migration_app()
+    
+    with app.app_context():
+        db.create_all()
+        print("✓ Complaint clustering tables created")
+        
+        inspector = db.inspect(db.engine)
+        complaint_columns = [column['name'] for column in inspector.get_columns('complaint')]
+        
+        if 'cluster_id' not in complaint_columns:
+            print("Adding cluster_id column to Complaint model")
+            db.session.execute(text('ALTER TABLE complaint ADD COLUMN cluster_id INTEGER REFERENCES complaint_cluster (id);'))
+        else:
+            print("cluster_id column already exists")
+        
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_complaint_cluster_id ON complaint (cluster_id);'))
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,32 @@
+"""
+Migration script to add the indexes behind the paged complaint listings
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds (created_at, id) and (status, created_at, id) indexes on complaints
+    and a (complaint_id, created_at, id) index on replies
+    """
+    print("Starting migration to add complaint listing indexes...")
+    app = migration_app()
+    
+    with app.app_context():
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_complaint_created ON complaint (created_at, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_complaint_status_created ON complaint (status, created_at, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_complaint_reply_complaint_created ON complaint_reply (complaint_id, created_at, id);'))
+        print("✓ Complaint listing indexes created")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,62 @@
+"""
+Migration script to add priority and SLA deadline fields to Complaint
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds priority, deadline and escalated_at to Complaint with a (status, deadline)
+    index, gives existing complaints a normal priority deadline, and creates the
+    complaint_escalation table
+    """
+    print("Starting migration to add SLA fields to Complaint model...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        complaint_columns = [column['name'] for column in inspector.get_columns('complaint')]
+        
+        if 'priority' not in complaint_columns:
+            print("Adding priority column to Complaint model")
+            db.session.execute(text("ALTER TABLE complaint ADD COLUMN priority VARCHAR(10) DEFAULT 'normal';"))
+            db.session.execute(text("UPDATE complaint SET priority = 'normal' WHERE priority IS NULL;"))
+        else:
+            print("priority column already exists")
+        
+        if 'deadline' not in complaint_columns:
+            print("Adding deadline column to Complaint model")
+            db.session.execute(text('ALTER TABLE complaint ADD COLUMN deadline DATETIME;'))
+        else:
+            print("deadline column already exists")
+        
+        if 'escalated_at' not in complaint_columns:
+            print("Adding escalated_at column to Complaint model")
+            db.session.execute(text('ALTER TABLE complaint ADD COLUMN escalated_at DATETIME;'))
+        else:
+            print("escalated_at column already exists")
+        
+        for priority, hours in app.config['COMPLAINT_SLA_HOURS'].items():
+            db.session.execute(text(
+                "UPDATE complaint SET deadline = datetime(created_at, :offset) "
+                "WHERE deadline IS NULL AND priority = :priority;"
+            ), {'offset': f'+{hours} hours', 'priority': priority})
+        print("✓ Deadlines set for existing complaints")
+        
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_complaint_status_deadline ON complaint (status, deadline);'))
+        
+        db.create_all()
+        print("✓ ComplaintEscalation table created")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
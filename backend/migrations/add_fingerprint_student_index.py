@@ -0,0 +1,29 @@
+"""
+Migration script to index FingerprintData.student_id
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Indexes fingerprint_data.student_id, which backs the has_fingerprint
+    EXISTS subquery loaded with every student
+    """
+    print("Starting migration to index fingerprint data by student...")
+    app = migration_app()
+    
+    with app.app_context():
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_fingerprint_data_student_id ON fingerprint_data (student_id);'))
+        db.session.commit()
+        print("✓ Index ix_fingerprint_data_student_id created")
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the occupancy event log and daily occupancy series tables
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+from sqlalchemy import insert, literal, select
+
+from app import db
+from migration_app import migration_app
+from app.models import Student, OccupancyEvent, RoomOccupancySeries, OccupancyHistoryCursor
+
+def create_occupancy_history_tables():
+    """Create the history tables and seed the log with the current occupants"""
+    app = migration_app()
+    
+    with app.app_context():
+        try:
+            print("Creating occupancy history tables...")
+            
+            # Create tables
+            db.create_all()
+            
+            print("✓ Successfully created occupancy history tables")
+            print("  - OccupancyEvent")
+            print("  - RoomOccupancySeries")
+            print("  - OccupancyHistoryCursor")
+            
+            # History starts today: every current occupant takes their seat now
+            if OccupancyEvent.query.first() is None:
+                seated = select(
+                    Student.room_id, Student.id, literal(1), literal(datetime.utcnow())
+                ).where(
+                    Student.room_id.isnot(None),
+                    Student.is_approved == True,
+                    Student.status == 'active'
+                )
+                result = db.session.execute(
+                    insert(OccupancyEvent).from_select(
+                        ['room_id', 'student_id', 'delta', 'created_at'], seated
+                    )
+                )
+                db.session.commit()
+                print(f"✓ Seeded occupancy log with {result.rowcount} current occupants")
+            
+            return True
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error creating occupancy history tables: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = create_occupancy_history_tables()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
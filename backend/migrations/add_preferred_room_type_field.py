@@ -0,0 +1,35 @@
+"""
+Migration script to add the preferred_room_type field to Student model
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds preferred_room_type to Student, used by the room auto-allocation
+    """
+    print("Starting migration to add preferred_room_type to Student model...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        student_columns = [column['name'] for column in inspector.get_columns('student')]
+        
+        if 'preferred_room_type' not in student_columns:
+            print("Adding preferred_room_type column to Student model")
+            db.session.execute(text('ALTER TABLE student ADD COLUMN preferred_room_type VARCHAR(20);'))
+        else:
+            print("preferred_room_type column already exists")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
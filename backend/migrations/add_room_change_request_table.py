@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the room change request table
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import db
+from migration_app import migration_app
+from app.models import RoomChangeRequest
+
+def create_room_change_table():
+    """Create the room change request table"""
+    app = migration_app()
+    
+    with app.app_context():
+        try:
+            print("Creating room change request table...")
+            
+            # Create tables
+            db.create_all()
+            
+            print("✓ Successfully created room change request table")
+            print("  - RoomChangeRequest")
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error creating room change request table: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = create_room_change_table()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,43 @@
+"""
+Migration script to add block and floor fields to Room model
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds block and floor to Room, used by the admin occupancy map
+    """
+    print("Starting migration to add location fields to Room model...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        room_columns = [column['name'] for column in inspector.get_columns('room')]
+        
+        if 'block' not in room_columns:
+            print("Adding block column to Room model")
+            db.session.execute(text('ALTER TABLE room ADD COLUMN block VARCHAR(50);'))
+        else:
+            print("block column already exists")
+            
+        if 'floor' not in room_columns:
+            print("Adding floor column to Room model")
+            db.session.execute(text('ALTER TABLE room ADD COLUMN floor INTEGER;'))
+        else:
+            print("floor column already exists")
+        
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_room_location ON room (block, floor, room_number);'))
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
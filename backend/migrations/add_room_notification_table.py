@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the room notification table
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import db
+from migration_app import migration_app
+from app.models import RoomNotification
+
+def create_room_notification_table():
+    """Create the room notification table and its per-student index"""
+    app = migration_app()
+    
+    with app.app_context():
+        try:
+            print("Creating room notification table...")
+            
+            db.create_all(tables=[RoomNotification.__table__])
+            
+            print("✓ Successfully created room notification table")
+            print("  - RoomNotification")
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error creating room notification table: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = create_room_notification_table()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,47 @@
+"""
+Migration script to add capacity and occupied_count fields to Room model
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+from app.occupancy import rebuild_occupancy
+
+def run_migration():
+    """
+    Adds capacity and occupied_count to Room and fills occupied_count from the student table
+    """
+    print("Starting migration to add occupancy fields to Room model...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        room_columns = [column['name'] for column in inspector.get_columns('room')]
+        
+        if 'capacity' not in room_columns:
+            print("Adding capacity column to Room model")
+            db.session.execute(text('ALTER TABLE room ADD COLUMN capacity INTEGER NOT NULL DEFAULT 4;'))
+        else:
+            print("capacity column already exists")
+            
+        if 'occupied_count' not in room_columns:
+            print("Adding occupied_count column to Room model")
+            db.session.execute(text('ALTER TABLE room ADD COLUMN occupied_count INTEGER NOT NULL DEFAULT 0;'))
+        else:
+            print("occupied_count column already exists")
+        
+        db.session.commit()
+        
+        # Backfill the counters from current room assignments
+        updated = rebuild_occupancy()
+        db.session.commit()
+        print(f"Rebuilt occupancy for {updated} rooms")
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the room waitlist table
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import db
+from migration_app import migration_app
+from app.models import RoomWaitlistEntry
+
+def create_waitlist_table():
+    """Create the room waitlist table and its queue indexes"""
+    app = migration_app()
+    
+    with app.app_context():
+        try:
+            print("Creating room waitlist table...")
+            
+            # Create tables
+            db.create_all()
+            
+            print("✓ Successfully created room waitlist table")
+            print("  - RoomWaitlistEntry")
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error creating room waitlist table: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = create_waitlist_table()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,32 @@
+"""
+Migration script to add the full-text search index and its triggers
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import db
+from migration_app import migration_app
+from app.search import install_search_index
+
+def run_migration():
+    """
+    Creates the search_index FTS5 table and the triggers on complaint,
+    complaint_reply, notice and feedback, then fills the index
+    """
+    print("Starting migration to add search index...")
+    app = migration_app()
+    
+    with app.app_context():
+        if not install_search_index():
+            print("Search index requires SQLite, skipping")
+            return
+        print("✓ Search index and triggers created")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,35 @@
+"""
+Migration script to add the optimistic locking version field to Student model
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds the version column used to detect concurrent updates to a student
+    """
+    print("Starting migration to add version to Student model...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        student_columns = [column['name'] for column in inspector.get_columns('student')]
+        
+        if 'version' not in student_columns:
+            print("Adding version column to Student model")
+            db.session.execute(text('ALTER TABLE student ADD COLUMN version INTEGER NOT NULL DEFAULT 1;'))
+        else:
+            print("version column already exists")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,48 @@
+"""
+Migration script to add Fee.created_at and the per-student timeline indexes
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds created_at to Fee and a (student, time, id) index on every source
+    of the admin student timeline
+    """
+    print("Starting migration to add student timeline indexes...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        fee_columns = [column['name'] for column in inspector.get_columns('fee')]
+        
+        if 'created_at' not in fee_columns:
+            print("Adding created_at column to Fee model")
+            db.session.execute(text('ALTER TABLE fee ADD COLUMN created_at DATETIME;'))
+            # Best guess for existing fees: when they were paid, else when they fell due
+            db.session.execute(text(
+                'UPDATE fee SET created_at = COALESCE(payment_date, due_date, CURRENT_TIMESTAMP) '
+                'WHERE created_at IS NULL;'
+            ))
+        else:
+            print("created_at column already exists")
+        
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_attendance_student_timestamp ON attendance (student_id, timestamp, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_fee_student_created ON fee (student_id, created_at, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_complaint_user_created ON complaint (user_id, created_at, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_leave_request_student_created ON leave_request (student_id, created_at, id);'))
+        db.session.execute(text('CREATE INDEX IF NOT EXISTS idx_fee_notification_student_created ON fee_notification (student_id, created_at, id);'))
+        print("✓ Timeline indexes created")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,42 @@
+"""
+Migration script to add updated_at change tracking to User and Student, and the student tombstone table
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import db
+from app.models import StudentTombstone
+from migration_app import migration_app
+
+def run_migration():
+    """
+    Adds updated_at columns (backfilled with the current time) and their indexes
+    """
+    print("Starting migration to add updated_at to User and Student models...")
+    app = migration_app()
+    
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        for table in ('user', 'student'):
+            columns = [column['name'] for column in inspector.get_columns(table)]
+            if 'updated_at' not in columns:
+                print(f"Adding updated_at column to {table} table")
+                db.session.execute(text(f'ALTER TABLE "{table}" ADD COLUMN updated_at DATETIME;'))
+                db.session.execute(text(f'UPDATE "{table}" SET updated_at = CURRENT_TIMESTAMP;'))
+            else:
+                print(f"updated_at column already exists on {table} table")
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON "{table}" (updated_at);'))
+        
+        # Create the tombstone table
+        db.create_all()
+        print("Created StudentTombstone table")
+        
+        db.session.commit()
+        print("Migration completed successfully!")
+
+if __name__ == '__main__':
+    run_migration()
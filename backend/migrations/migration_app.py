@@ -0,0 +1,25 @@
+"""
+Database access for the migration scripts.
+
+Migrations run against a database that is older than the models, so they do
+not use create_app(): it creates the default admin user and builds the search
+indexes, querying columns that a later migration may not have added yet.
+migration_app() is a bare app with only the database configured.
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from config import Config
+from app import db
+
+def migration_app(config_class=Config):
+    """App for migrations: the database only, no tables created and no queries run"""
+    # Same import name as create_app(), so a relative SQLite path resolves to the same file
+    app = Flask('app')
+    app.config.from_object(config_class)
+    db.init_app(app)
+    return app
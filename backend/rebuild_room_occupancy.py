@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Recompute Room.occupied_count from the student table.
+
+Run this if the occupancy counters are ever suspected to be out of sync,
+e.g. after editing student records directly in the database.
+"""
+
+import sys
+
+from app import create_app, db
+from app.models import Room
+from app.occupancy import rebuild_occupancy
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            updated = rebuild_occupancy()
+            db.session.commit()
+            print(f"Rebuilt occupancy for {updated} rooms")
+            
+            for room in Room.query.order_by(Room.room_number).all():
+                print(f"  {room.room_number}: {room.get_occupancy()}/{room.get_capacity()} ({room.status})")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding room occupancy: {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Rebuild the admin full-text search index from the complaints, replies,
+notices and feedback tables.
+
+The index is kept current by triggers; run this if it is ever suspected to
+be out of sync, e.g. after restoring the database from a backup taken
+before the index existed.
+"""
+
+import sys
+
+from app import create_app, db
+from app.search import install_search_index, rebuild_search_index
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            install_search_index()
+            indexed = rebuild_search_index()
+            db.session.commit()
+            print(f"Indexed {indexed} documents")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding search index: {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
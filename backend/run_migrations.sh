@@ -14,21 +14,23 @@ echo "Current directory: $(pwd)"
 # Add the enrollment request field to Student table
 echo "Adding is_enrollment_requested field to Student table..."
 python3 -c "
-from app import create_app
+import sys
+sys.path.append('migrations')
 from app.models import db
+from migration_app import migration_app
 from sqlalchemy import text
 
-app = create_app()
+app = migration_app()
 with app.app_context():
     try:
         # Check if column exists
-        result = db.engine.execute(text('PRAGMA table_info(student);'))
+        result = db.session.execute(text('PRAGMA table_info(student);'))
         columns = [row[1] for row in result]
         
         if 'is_enrollment_requested' not in columns:
             print('Adding is_enrollment_requested column...')
-            db.engine.execute(text('ALTER TABLE student ADD COLUMN is_enrollment_requested BOOLEAN DEFAULT FALSE'))
-            db.engine.execute(text('UPDATE student SET is_enrollment_requested = FALSE WHERE is_enrollment_requested IS NULL'))
+            db.session.execute(text('ALTER TABLE student ADD COLUMN is_enrollment_requested BOOLEAN DEFAULT FALSE'))
+            db.session.execute(text('UPDATE student SET is_enrollment_requested = FALSE WHERE is_enrollment_requested IS NULL'))
             print('Successfully added is_enrollment_requested field')
         else:
             print('is_enrollment_requested column already exists')
@@ -40,4 +42,25 @@ with app.app_context():
         db.session.rollback()
 "
 
+# Later schema changes, oldest first; each one is safe to re-run
+for migration in add_room_occupancy_fields \
+    add_preferred_room_type_field \
+    add_student_version_field \
+    add_room_waitlist_table \
+    add_room_location_fields \
+    add_room_change_request_table \
+    add_occupancy_history_tables \
+    add_updated_at_fields \
+    add_timeline_indexes \
+    add_fingerprint_student_index \
+    add_archive_tables \
+    add_complaint_list_indexes \
+    add_search_index \
+    add_complaint_sla_fields \
+    add_complaint_clusters \
+    add_room_notification_table; do
+    echo "Running migrations/$migration.py..."
+    python3 "migrations/$migration.py" || exit 1
+done
+
 echo "Migration script completed." 
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch room auto-allocation
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student
+from app.allocation import plan_allocation, group_key
+
+
+def room(id, room_type='Double', capacity=4, occupied=0):
+    return SimpleNamespace(id=id, room_number=f'R{id:03d}', room_type=room_type, capacity=capacity, occupied_count=occupied)
+
+
+def student(id, course='CSE', semesters=2, preferred=None):
+    return SimpleNamespace(id=id, course=course, semesters_requested=semesters, preferred_room_type=preferred)
+
+
+def test_plan_respects_capacity_and_room_type():
+    rooms = [room(1, 'Single', capacity=1), room(2, 'Double', capacity=2, occupied=1)]
+    students = [student(1, preferred='Single'), student(2, preferred='Single'), student(3), student(4)]
+
+    placements, unplaced = plan_allocation(students, rooms)
+
+    by_student = {p.student.id: p.room.id for p in placements}
+    assert by_student[1] == 1
+    assert 2 in [u.student.id for u in unplaced]
+    assert len(placements) == 2
+    assert sum(1 for room_id in by_student.values() if room_id == 2) == 1
+
+
+def test_plan_groups_by_course_and_stay():
+    rooms = [room(i) for i in range(1, 5)] + [room(9, occupied=2)]
+    students = [student(i, course='ECE') for i in range(1, 5)] + \
+               [student(i, course='CSE', semesters=4) for i in range(5, 9)] + \
+               [student(20, course='MECH')]
+
+    placements, unplaced = plan_allocation(students, rooms, {9: {group_key('MECH', 2)}})
+
+    rooms_by_course = {}
+    for p in placements:
+        rooms_by_course.setdefault(p.student.course, set()).add(p.room.id)
+    assert not unplaced
+    assert len(rooms_by_course['ECE']) == 1
+    assert len(rooms_by_course['CSE']) == 1
+    assert rooms_by_course['MECH'] == {9}
+
+
+def test_plan_is_fast_for_a_semester_intake():
+    courses = ['CSE', 'ECE', 'MECH', 'CIVIL', 'EEE', 'IT']
+    types = ['Single', 'Double', 'Triple', None]
+    rooms = [room(i, types[i % 3], capacity=4, occupied=i % 3) for i in range(500)]
+    students = [student(i, courses[i % 6], 1 + i % 8, types[i % 4]) for i in range(2000)]
+
+    started = time.perf_counter()
+    placements, unplaced = plan_allocation(students, rooms)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert len(placements) + len(unplaced) == 2000
+    seats = {}
+    for p in placements:
+        seats[p.room.id] = seats.get(p.room.id, 0) + 1
+    assert all(p.room.occupied_count + seats[p.room.id] <= p.room.capacity for p in placements)
+
+
+def test_auto_allocate_endpoint(app, headers):
+    db.session.add_all([Room(room_number='101', room_type='Double', capacity=2),
+                        Room(room_number='102', room_type='Single', capacity=1)])
+    for i in range(4):
+        user = User(name=f'Student {i}', email=f's{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Student(user_id=user.id, roll_number=f'HMS{user.id:04d}', course='CSE',
+                               is_enrollment_requested=True))
+    db.session.commit()
+    client = app.test_client()
+
+    response = client.post('/api/admin/rooms/auto-allocate', json={'dry_run': True}, headers=headers)
+    plan = response.get_json()
+    assert response.status_code == 200
+    assert (plan['allocated'], plan['unallocated']) == (3, 1)
+    assert Student.query.filter_by(is_approved=True).count() == 0
+
+    response = client.post('/api/admin/rooms/auto-allocate', json={}, headers=headers)
+    assert response.get_json()['allocated'] == 3
+    db.session.expire_all()
+    assert Student.query.filter_by(is_approved=True, status='active').count() == 3
+    assert sorted(r.occupied_count for r in Room.query.all()) == [1, 2]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
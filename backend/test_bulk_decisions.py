@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk approve/reject decisions
+"""
+
+import time
+
+import pytest
+from sqlalchemy import insert
+
+from app import db
+from app.models import User, Room, Student
+
+
+def populate(rooms, seated_per_room, seated_rooms, pending):
+    db.session.execute(insert(Room), [
+        {'room_number': f'{i:03d}', 'room_type': 'Double', 'capacity': 4,
+         'occupied_count': seated_per_room if i < seated_rooms else 0}
+        for i in range(rooms)
+    ])
+    room_ids = [room_id for (room_id,) in db.session.query(Room.id).order_by(Room.id)]
+    total = seated_per_room * seated_rooms + pending
+    db.session.execute(insert(User), [
+        {'name': f'Student {i}', 'email': f's{i}@example.com', 'password_hash': 'x'} for i in range(total)
+    ])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.role == 'student').order_by(User.id)]
+    seated = seated_per_room * seated_rooms
+    db.session.execute(insert(Student), [{
+        'user_id': user_id,
+        'roll_number': f'R{i:04d}',
+        'room_id': room_ids[i // seated_per_room] if i < seated else None,
+        'is_approved': i < seated,
+        'status': 'active',
+        'is_enrollment_requested': True
+    } for i, user_id in enumerate(user_ids)])
+    db.session.commit()
+    student_ids = [student_id for (student_id,) in db.session.query(Student.id).order_by(Student.id)]
+    return room_ids, student_ids[:seated], student_ids[seated:]
+
+
+def test_five_hundred_decisions_in_one_request(app, headers, count_queries):
+    room_ids, seated, pending = populate(rooms=50, seated_per_room=2, seated_rooms=25, pending=450)
+    decisions = [{'student_id': student_id, 'action': 'reject'} for student_id in seated]
+    decisions += [{'student_id': student_id, 'action': 'approve', 'room_id': room_ids[i % 50], 'course': 'CSE'}
+                  for i, student_id in enumerate(pending)]
+
+    with count_queries() as statements:
+        started = time.perf_counter()
+        response = app.test_client().post('/api/admin/students/bulk-decision', json={'decisions': decisions}, headers=headers)
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['processed'] == 500
+    assert data['succeeded'] == 50 + 200 and data['failed'] == 250
+    assert all(r['room_full'] for r in data['results'] if not r['success'])
+    selects = [statement for statement in statements if statement.startswith('SELECT')]
+    print(f"500 decisions in {elapsed:.2f}s with {len(statements)} statements ({len(selects)} SELECTs)")
+    assert elapsed < 5
+    # Students and rooms are loaded once for the whole batch, not per decision
+    assert len(selects) < 20
+
+    db.session.expire_all()
+    assert all(room.occupied_count == 4 for room in Room.query.all())
+    assert Student.query.filter_by(is_approved=True).count() == 200
+    assert Student.query.filter_by(status='rejected').count() == 50
+    assert Student.query.filter_by(is_approved=True, course='CSE').count() == 200
+
+
+def test_invalid_items_fail_individually(app, headers):
+    room_ids, seated, pending = populate(rooms=1, seated_per_room=3, seated_rooms=1, pending=2)
+    decisions = [
+        {'student_id': pending[0], 'action': 'approve', 'room_id': room_ids[0]},
+        {'student_id': pending[1], 'action': 'approve', 'room_id': room_ids[0]},
+        {'student_id': pending[0], 'action': 'reject'},
+        {'student_id': 9999, 'action': 'reject'},
+        {'student_id': pending[1], 'action': 'approve'},
+        {'action': 'promote'},
+    ]
+    data = app.test_client().post('/api/admin/students/bulk-decision', json={'decisions': decisions},
+                                  headers=headers).get_json()
+    assert [r['success'] for r in data['results']] == [True, False, False, False, False, False]
+    assert data['results'][1]['room_full']
+    assert db.session.get(Room, room_ids[0]).occupied_count == 4
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q', '-s']))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate complaint clustering and cluster replies
+"""
+
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from app import db
+from app.models import User, Student, Complaint, ComplaintReply, ComplaintNotification
+from app.clustering import cluster_complaints, minhash, similarity
+
+
+def make_students(count):
+    users = []
+    for i in range(count):
+        user = User(name=f'Student {i}', email=f's{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Student(user_id=user.id, roll_number=f'R{i:03d}'))
+        users.append(user)
+    db.session.commit()
+    return users
+
+
+WATER = [
+    ('No water', 'There is no water supply in block A since morning'),
+    ('No water in block A', 'There is no water supply in block A since this morning'),
+    ('Water supply', 'no water supply in block A since morning, please fix'),
+]
+
+
+def raise_complaints(client, users, texts):
+    ids = []
+    for user, (subject, details) in zip(users, texts):
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+        response = client.post('/api/complaints', json={'subject': subject, 'details': details}, headers=headers)
+        assert response.status_code == 201
+        ids.append(response.get_json())
+    return ids
+
+
+def test_minhash_estimates_similarity():
+    same = minhash('There is no water supply in block A since morning')
+    close = minhash('There is no water supply in block A since this morning')
+    other = minhash('The wifi router on the second floor keeps restarting')
+    assert similarity(same, same) == 1.0
+    assert similarity(same, close) > 0.6
+    assert similarity(same, other) < 0.2
+    assert minhash('  !? ') is None
+
+
+def test_near_duplicates_share_a_cluster(app, admin):
+    client = app.test_client()
+    users = make_students(5)
+    water = raise_complaints(client, users, WATER)
+    wifi = raise_complaints(client, users[3:], [('Wifi', 'The wifi router on the second floor keeps restarting')])
+
+    assert len({complaint['cluster_id'] for complaint in water}) == 1
+    assert wifi[0]['cluster_id'] != water[0]['cluster_id']
+
+    # Resolved complaints do not take new members
+    Complaint.query.filter_by(cluster_id=water[0]['cluster_id']).update({'status': 'Resolved'})
+    db.session.commit()
+    later = raise_complaints(client, users[4:], WATER[:1])
+    assert later[0]['cluster_id'] != water[0]['cluster_id']
+
+
+def test_clustering_cost_does_not_grow(app, admin, count_queries):
+    client = app.test_client()
+    users = make_students(1)
+    headers = {'Authorization': f"Bearer {create_access_token(identity=str(users[0].id))}"}
+    post = lambda n: lambda: client.post('/api/complaints', headers=headers, json={
+        'subject': f'Issue {n}', 'details': f'Room {n} has a problem number {n * 7919} with item {n * 31}'})
+    with count_queries() as first:
+        post(0)()
+    for n in range(1, 40):
+        post(n)()
+    with count_queries() as last:
+        post(40)()
+    assert len(last) == len(first)
+
+
+def test_grouped_view(app, admin, headers):
+    client = app.test_client()
+    users = make_students(4)
+    water = raise_complaints(client, users, WATER)
+    raise_complaints(client, users[3:], [('Wifi', 'The wifi router on the second floor keeps restarting')])
+
+    clusters = client.get('/api/admin/complaints/clusters', headers=headers).get_json()
+    assert [cluster['size'] for cluster in clusters] == [1, 3]
+    assert clusters[1]['subject'] == 'No water'
+    assert [complaint['id'] for complaint in clusters[1]['complaints']] == [c['id'] for c in reversed(water)]
+
+    response = client.get('/api/admin/complaints/clusters?min_size=2', headers=headers)
+    assert [cluster['id'] for cluster in response.get_json()] == [water[0]['cluster_id']]
+
+    response = client.get('/api/admin/complaints/clusters?limit=1', headers=headers)
+    response = client.get('/api/admin/complaints/clusters?limit=1&before=' + response.headers['X-Next-Before'],
+                          headers=headers)
+    assert [cluster['id'] for cluster in response.get_json()] == [water[0]['cluster_id']]
+
+
+def test_cluster_reply_fans_out_in_bulk(app, admin, headers, count_queries):
+    client = app.test_client()
+    users = make_students(3)
+    water = raise_complaints(client, users, WATER)
+    cluster_id = water[0]['cluster_id']
+
+    with count_queries() as statements:
+        response = client.post(f'/api/admin/complaints/clusters/{cluster_id}/reply', headers=headers,
+                               json={'content': 'Water is back on', 'status': 'Resolved'})
+    assert response.status_code == 201
+    assert response.get_json()['replies'] == 3
+    assert response.get_json()['notifications'] == 3
+    inserts = [statement for statement in statements if statement.startswith('INSERT')]
+    assert len(inserts) == 2
+
+    assert ComplaintReply.query.filter_by(content='Water is back on', is_admin=True).count() == 3
+    assert {n.student_user_id for n in ComplaintNotification.query} == {user.id for user in users}
+    assert {c.status for c in Complaint.query.filter_by(cluster_id=cluster_id)} == {'Resolved'}
+
+    # Reopening the cluster lets its complaints be escalated again
+    Complaint.query.filter_by(cluster_id=cluster_id).update({'escalated_at': datetime.utcnow()})
+    db.session.commit()
+    response = client.post(f'/api/admin/complaints/clusters/{cluster_id}/reply', headers=headers,
+                           json={'content': 'Off again', 'status': 'Pending'})
+    assert response.status_code == 201
+    db.session.expire_all()
+    assert {(c.status, c.escalated_at) for c in Complaint.query.filter_by(cluster_id=cluster_id)} == {('Pending', None)}
+
+    assert client.post(f'/api/admin/complaints/clusters/{cluster_id}/reply', headers=headers,
+                       json={'content': ' '}).status_code == 400
+    assert client.post('/api/admin/complaints/clusters/999/reply', headers=headers,
+                       json={'content': 'x'}).status_code == 404
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(users[0].id))}"}
+    assert client.post(f'/api/admin/complaints/clusters/{cluster_id}/reply', headers=student_headers,
+                       json={'content': 'x'}).status_code == 403
+
+
+def test_backfill_clusters_bulk_loaded_complaints(app, admin):
+    users = make_students(3)
+    db.session.execute(insert(Complaint), [
+        {'subject': subject, 'details': details, 'user_id': user.id, 'status': 'Pending'}
+        for user, (subject, details) in zip(users, WATER)
+    ])
+    db.session.commit()
+    assert cluster_complaints(batch_size=2) == 3
+    assert len({complaint.cluster_id for complaint in Complaint.query}) == 1
+    assert cluster_complaints() == 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
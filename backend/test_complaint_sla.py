@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script for complaint SLA deadlines and escalation of overdue complaints
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+import app.email as app_email
+import app.sla as sla
+from app import db
+from app.models import User, Complaint, ComplaintEscalation
+from app.sla import SLAScheduler, escalate_complaints, overdue_complaints, start_sla_scheduler
+
+
+@pytest.fixture
+def emails(monkeypatch):
+    sent = []
+    monkeypatch.setattr(sla, 'send_complaint_escalation_email',
+                        lambda email, name, complaints: sent.append((email, [c[0] for c in complaints])))
+    return sent
+
+
+def raise_complaint(user, priority='normal', created_at=None, status='Pending'):
+    complaint = Complaint(subject=f'{priority} issue', details='x', user_id=user.id, priority=priority,
+                          status=status, created_at=created_at or datetime.utcnow())
+    db.session.add(complaint)
+    db.session.commit()
+    return complaint
+
+
+def test_deadline_follows_priority(app, admin):
+    created = datetime(2026, 3, 1, 9, 0)
+    complaint = raise_complaint(admin, 'urgent', created)
+    assert complaint.deadline == created + timedelta(hours=4)
+
+    complaint.priority = 'low'
+    db.session.commit()
+    assert complaint.deadline == created + timedelta(hours=168)
+
+    default = Complaint(subject='s', details='d', user_id=admin.id, created_at=created)
+    db.session.add(default)
+    db.session.commit()
+    assert (default.priority, default.deadline) == ('normal', created + timedelta(hours=72))
+
+
+def test_scheduler_escalates_due_complaints_once(app, admin, emails):
+    now = datetime.utcnow()
+    overdue = raise_complaint(admin, 'urgent', now - timedelta(hours=5))
+    resolved = raise_complaint(admin, 'urgent', now - timedelta(hours=5), status='Resolved')
+    upcoming = raise_complaint(admin, 'high', now - timedelta(hours=1))
+
+    scheduler = SLAScheduler(app)
+    scheduler.load()
+    assert [entry[1] for entry in scheduler.heap] == [overdue.id, upcoming.id]
+
+    assert scheduler.run_due(now) == [overdue.id]
+    assert emails == [(admin.email, [overdue.id])]
+    assert db.session.get(Complaint, overdue.id).escalated_at is not None
+    assert db.session.get(Complaint, resolved.id).escalated_at is None
+    assert ComplaintEscalation.query.filter_by(complaint_id=overdue.id, admin_user_id=admin.id).count() == 1
+
+    # Already escalated: a duplicate entry or another process does nothing
+    assert escalate_complaints([overdue.id], now) == []
+    assert ComplaintEscalation.query.count() == 1
+
+    # The upcoming one stays queued until its deadline, unless it is resolved first
+    assert scheduler.run_due(now) == []
+    db.session.get(Complaint, upcoming.id).status = 'Resolved'
+    db.session.commit()
+    assert scheduler.run_due(now + timedelta(days=2)) == []
+    assert scheduler.heap == []
+
+
+def test_scheduler_only_reads_new_rows(app, admin, emails, count_queries):
+    scheduler = SLAScheduler(app)
+    scheduler.load()
+    app.extensions['hms_sla_scheduler'] = scheduler
+    now = datetime.utcnow()
+
+    # Committed in this process: pushed by the session hook
+    pushed = raise_complaint(admin, 'urgent', now - timedelta(hours=6))
+    assert scheduler.heap == [(pushed.deadline, pushed.id)]
+
+    # Written with bulk SQL (or by another worker): picked up by the id poll
+    other = db.session.execute(insert(Complaint).returning(Complaint.id), [
+        {'subject': 's', 'details': 'd', 'user_id': admin.id, 'status': 'Pending',
+         'priority': 'high', 'created_at': now - timedelta(days=2), 'deadline': now - timedelta(days=1)}
+    ]).scalar_one()
+    db.session.commit()
+
+    with count_queries() as statements:
+        scheduler.poll()
+        escalated = scheduler.run_due(now)
+    assert sorted(escalated) == sorted([pushed.id, other])
+    assert 'complaint.id >' in statements[0]
+    assert len(statements) == 4
+    assert len(emails) == 1
+
+
+def test_reopened_complaints_can_escalate_again(app, admin, emails):
+    scheduler = SLAScheduler(app)
+    app.extensions['hms_sla_scheduler'] = scheduler
+    now = datetime.utcnow()
+    reopened = raise_complaint(admin, 'urgent', now - timedelta(hours=5))
+    extended = raise_complaint(admin, 'urgent', now - timedelta(hours=5))
+    assert sorted(scheduler.run_due(now)) == sorted([reopened.id, extended.id])
+
+    # Resolving keeps the flag; going back to pending clears it and queues the complaint
+    reopened.status = 'Resolved'
+    db.session.commit()
+    assert reopened.escalated_at is not None
+    reopened.status = 'Pending'
+    # A later deadline (here from a lower priority) clears it too
+    extended.priority = 'low'
+    db.session.commit()
+    assert reopened.escalated_at is None and extended.escalated_at is None
+    assert sorted(entry[1] for entry in scheduler.heap) == sorted([reopened.id, extended.id])
+
+    assert scheduler.run_due(now) == [reopened.id]
+    assert scheduler.run_due(extended.deadline) == [extended.id]
+    assert ComplaintEscalation.query.count() == 4
+
+
+def test_scheduler_disabled_when_testing(app):
+    assert start_sla_scheduler(app) is None
+    assert 'hms_sla_scheduler' not in app.extensions
+
+
+def test_overdue_endpoint(app, admin, headers):
+    now = datetime.utcnow()
+    first = raise_complaint(admin, 'urgent', now - timedelta(hours=10))
+    second = raise_complaint(admin, 'normal', now - timedelta(hours=80))
+    raise_complaint(admin, 'low', now - timedelta(hours=80))
+    raise_complaint(admin, 'urgent', now - timedelta(hours=10), status='Resolved')
+
+    items, next_after = overdue_complaints(now)
+    assert [item['id'] for item in items] == [second.id, first.id]
+    assert items[0]['overdue_seconds'] == 8 * 3600
+    assert next_after is None
+
+    client = app.test_client()
+    response = client.get('/api/admin/complaints/overdue?limit=1', headers=headers)
+    assert response.status_code == 200
+    assert [item['id'] for item in response.get_json()] == [second.id]
+    response = client.get('/api/admin/complaints/overdue?limit=1&after=' + response.headers['X-Next-After'],
+                          headers=headers)
+    assert [item['id'] for item in response.get_json()] == [first.id]
+
+    response = client.get('/api/admin/complaints/overdue?priority=urgent', headers=headers)
+    assert [item['priority'] for item in response.get_json()] == ['urgent']
+    assert client.get('/api/admin/complaints/overdue?priority=soon', headers=headers).status_code == 400
+
+
+def test_priority_on_create_and_update(app, admin, headers):
+    client = app.test_client()
+    response = client.post('/api/complaints', json={'subject': 'Leak', 'details': 'Tap', 'priority': 'High'},
+                           headers=headers)
+    assert response.status_code == 201
+    complaint = response.get_json()
+    assert complaint['priority'] == 'high'
+    assert complaint['deadline'] is not None
+
+    assert client.post('/api/complaints', json={'subject': 'x', 'details': 'y', 'priority': 'asap'},
+                       headers=headers).status_code == 400
+
+    response = client.put(f"/api/complaints/{complaint['id']}", json={'priority': 'urgent'}, headers=headers)
+    assert response.get_json()['deadline'] < complaint['deadline']
+
+    # Students cannot pick their own priority
+    student = User(name='Student', email='s@example.com', password_hash='x')
+    db.session.add(student)
+    db.session.commit()
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(student.id))}"}
+    response = client.post('/api/complaints', json={'subject': 'Fan', 'details': 'Slow', 'priority': 'urgent'},
+                           headers=student_headers)
+    assert response.status_code == 201
+    assert response.get_json()['priority'] == 'normal'
+
+
+def test_escalation_email_escapes_subject(app, monkeypatch):
+    sent = []
+    monkeypatch.setattr(app_email, 'send_email', lambda subject, recipient, html: sent.append(html))
+    app_email.send_complaint_escalation_email(
+        'admin@example.com', 'Admin', [(1, '<a href="http://x">click</a>', 'high', datetime(2026, 1, 1))])
+    assert '<a href' not in sent[0]
+    assert '&lt;a href=' in sent[0]
+
+    app_email.send_complaint_escalation_email('admin@example.com', '<b>Admin</b>', [])
+    assert '<b>Admin</b>' not in sent[1] and '&lt;b&gt;Admin' in sent[1]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
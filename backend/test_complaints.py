@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for complaint listing and batched serialization
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from app import db
+from app.models import User, Student, Complaint, ComplaintReply
+from app.complaints import complaint_query, serialize_complaints, DEFAULT_PAGE_SIZE
+
+
+def make_students(count):
+    user_ids = []
+    for i in range(count):
+        user = User(name=f'Student {i}', email=f's{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Student(user_id=user.id, roll_number=f'R{i:03d}', profile_picture=f'/p/{i}.png'))
+        user_ids.append(user.id)
+    db.session.commit()
+    return user_ids
+
+
+def add_complaints(admin, user_ids, count, replies_each, start=datetime(2026, 1, 1)):
+    """count complaints spread over the students, each with replies alternating admin / student"""
+    owners = [user_ids[n % len(user_ids)] for n in range(count)]
+    complaint_ids = db.session.execute(
+        insert(Complaint).returning(Complaint.id, sort_by_parameter_order=True),
+        [{'subject': f'Complaint {n}', 'details': 'x', 'user_id': owner, 'status': 'Pending',
+          'created_at': start + timedelta(minutes=n)}
+         for n, owner in enumerate(owners)]
+    ).scalars().all()
+    rows = [
+        {'complaint_id': complaint_id, 'content': f'Reply {r}', 'is_admin': r % 2 == 0,
+         'user_id': admin.id if r % 2 == 0 else owner, 'created_at': start + timedelta(minutes=n, seconds=r)}
+        for n, (complaint_id, owner) in enumerate(zip(complaint_ids, owners)) for r in range(replies_each)
+    ]
+    if rows:
+        db.session.execute(insert(ComplaintReply), rows)
+    db.session.commit()
+    return complaint_ids
+
+
+def test_serialization_query_count_is_constant(app, admin, count_queries):
+    user_ids = make_students(5)
+    add_complaints(admin, user_ids, 10, 3)
+    listing = lambda: serialize_complaints(complaint_query().order_by(Complaint.id).all())
+    with count_queries() as small_queries:
+        small = listing()
+    assert len(small) == 10
+
+    add_complaints(admin, user_ids, 490, 3, start=datetime(2026, 2, 1))
+    with count_queries() as large_queries:
+        large = listing()
+    assert len(large) == 500 and all(len(c['replies']) == 3 for c in large)
+    # Complaints, replies, authors, student profiles
+    assert len(large_queries) == len(small_queries) <= 5
+
+
+def test_listing_is_paged_by_default(app, admin, headers):
+    user_ids = make_students(2)
+    complaint_ids = add_complaints(admin, user_ids, DEFAULT_PAGE_SIZE + 5, 1)
+    client = app.test_client()
+    response = client.get('/api/complaints', headers=headers)
+    assert [c['id'] for c in response.get_json()] == complaint_ids[::-1][:DEFAULT_PAGE_SIZE]
+    rest = client.get('/api/complaints?before=' + response.headers['X-Next-Before'], headers=headers)
+    assert [c['id'] for c in rest.get_json()] == complaint_ids[4::-1]
+    assert 'X-Next-Before' not in rest.headers
+
+
+def test_count_covers_every_page(app, admin, headers):
+    user_ids = make_students(2)
+    add_complaints(admin, user_ids, DEFAULT_PAGE_SIZE + 5, 0)
+    client = app.test_client()
+    assert client.get('/api/complaints/count', headers=headers).get_json() == {'count': DEFAULT_PAGE_SIZE + 5}
+    assert client.get('/api/complaints/count?status=Resolved', headers=headers).get_json() == {'count': 0}
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(user_ids[0]))}"}
+    assert client.get('/api/complaints/count', headers=student_headers).get_json() == {'count': 13}
+
+
+def test_serialized_fields_match(app, admin, headers):
+    user_ids = make_students(2)
+    add_complaints(admin, user_ids, 2, 2)
+    client = app.test_client()
+    complaints = client.get('/api/complaints', headers=headers).get_json()
+    newest = complaints[0]
+    assert newest['user_id'] == user_ids[1]
+    assert newest['student_name'] == 'Student 1'
+    assert newest['student_roll_number'] == 'R001'
+    assert newest['student_profile_picture'] == '/p/1.png'
+    admin_reply, student_reply = client.get(f"/api/complaints/{newest['id']}/replies", headers=headers).get_json()
+    assert admin_reply['is_admin'] and admin_reply['user_name'] == admin.name
+    assert admin_reply['user_profile_picture'] is None
+    assert student_reply['user_profile_picture'] == '/p/1.png'
+    assert newest['last_reply']['id'] == student_reply['id']
+
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(user_ids[0]))}"}
+    own = client.get('/api/complaints', headers=student_headers).get_json()
+    assert [c['student_name'] for c in own] == ['Student 0']
+
+    complaint = db.session.get(Complaint, newest['id']).to_dict()
+    assert complaint['replies'] == [admin_reply, student_reply]
+    assert {key: complaint[key] for key in newest if key in complaint} == {
+        key: value for key, value in newest.items() if key in complaint}
+    assert db.session.get(ComplaintReply, student_reply['id']).to_dict() == student_reply
+
+
+def test_paged_listing_walks_every_complaint(app, admin, headers):
+    user_ids = make_students(3)
+    complaint_ids = add_complaints(admin, user_ids, 45, 2)
+    # Two complaints with the same timestamp must still both be listed once
+    db.session.query(Complaint).filter(Complaint.id.in_(complaint_ids[10:12])).update(
+        {'created_at': datetime(2026, 1, 1, 0, 10)}, synchronize_session=False)
+    db.session.query(Complaint).filter(Complaint.id.in_(complaint_ids[::3])).update(
+        {'status': 'Resolved'}, synchronize_session=False)
+    db.session.commit()
+    client = app.test_client()
+
+    seen, before = [], None
+    while True:
+        url = '/api/complaints?limit=10' + (f'&before={before}' if before else '')
+        response = client.get(url, headers=headers)
+        page = response.get_json()
+        assert len(page) <= 10
+        seen += page
+        before = response.headers.get('X-Next-Before')
+        if not before:
+            break
+    assert sorted(c['id'] for c in seen) == sorted(complaint_ids)
+    assert seen[0]['id'] == complaint_ids[-1]
+    assert all('replies' not in c for c in seen)
+    assert seen[0]['reply_count'] == 2
+    assert seen[0]['last_reply']['content'] == 'Reply 1' and not seen[0]['last_reply']['is_admin']
+
+    resolved = client.get('/api/complaints?status=Resolved&limit=100', headers=headers).get_json()
+    assert sorted(c['id'] for c in resolved) == sorted(complaint_ids[::3])
+
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(user_ids[0]))}"}
+    own = client.get('/api/complaints?limit=100', headers=student_headers).get_json()
+    assert len(own) == 15 and {c['user_id'] for c in own} == {user_ids[0]}
+
+    assert client.get('/api/complaints?before=nope', headers=headers).status_code == 400
+    assert client.get('/api/complaints?limit=1000', headers=headers).status_code == 400
+
+
+def test_first_page_cost_does_not_grow(app, admin, headers, count_queries):
+    user_ids = make_students(3)
+    add_complaints(admin, user_ids, 30, 1)
+    client = app.test_client()
+    with count_queries() as small_queries:
+        small = client.get('/api/complaints?limit=20', headers=headers)
+
+    add_complaints(admin, user_ids, 970, 4, start=datetime(2025, 1, 1))
+    with count_queries() as large_queries:
+        large = client.get('/api/complaints?limit=20', headers=headers)
+    assert small.get_json() == large.get_json()
+    assert len(large_queries) == len(small_queries) <= 6
+
+
+def test_replies_fetched_incrementally(app, admin, headers):
+    user_ids = make_students(2)
+    complaint_id = add_complaints(admin, user_ids, 1, 7)[0]
+    client = app.test_client()
+
+    response = client.get(f'/api/complaints/{complaint_id}/replies?limit=3', headers=headers)
+    first = response.get_json()
+    assert [r['content'] for r in first] == ['Reply 0', 'Reply 1', 'Reply 2']
+    after = response.headers['X-Next-After']
+
+    rest = client.get(f'/api/complaints/{complaint_id}/replies?after={after}', headers=headers).get_json()
+    assert [r['content'] for r in rest] == [f'Reply {r}' for r in range(3, 7)]
+    assert client.get(f'/api/complaints/{complaint_id}/replies?after={rest[-1]["id"]}',
+                      headers=headers).get_json() == []
+
+    other = {'Authorization': f"Bearer {create_access_token(identity=str(user_ids[1]))}"}
+    assert client.get(f'/api/complaints/{complaint_id}/replies', headers=other).status_code == 403
+    owner = {'Authorization': f"Bearer {create_access_token(identity=str(user_ids[0]))}"}
+    assert len(client.get(f'/api/complaints/{complaint_id}/replies', headers=owner).get_json()) == 7
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
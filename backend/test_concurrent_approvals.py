@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for race-free room capacity enforcement under concurrent approvals
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student
+from conftest import TestConfig
+
+
+@pytest.fixture
+def app_config():
+    class ConcurrentConfig(TestConfig):
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 20, 'max_overflow': 40}
+    return ConcurrentConfig
+
+
+def create_pending_students(count):
+    ids = []
+    for i in range(count):
+        user = User(name=f'Student {i}', email=f'student{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, roll_number=f'HMS{user.id:04d}', is_enrollment_requested=True)
+        db.session.add(student)
+        db.session.flush()
+        ids.append(student.id)
+    db.session.commit()
+    return ids
+
+
+def test_parallel_approvals_never_overfill_a_room(app, headers):
+    room = Room(room_number='101', room_type='Double', capacity=4)
+    db.session.add(room)
+    db.session.commit()
+    room_id = room.id
+    student_ids = create_pending_students(50)
+    db.session.remove()
+
+    def approve(student_id):
+        client = app.test_client()
+        return client.put(f'/api/admin/students/approve/{student_id}', json={'room_id': room_id}, headers=headers)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        responses = list(pool.map(approve, student_ids))
+    elapsed = time.perf_counter() - started
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == 4
+    assert statuses.count(400) == 46
+    assert all(response.get_json()['room_full'] for response in responses if response.status_code == 400)
+
+    room = db.session.get(Room, room_id)
+    assert room.occupied_count == 4
+    assert Student.query.filter_by(room_id=room_id, is_approved=True).count() == 4
+
+    print(f"50 concurrent approvals in {elapsed:.2f}s ({50 / elapsed:.0f} req/s)")
+    assert elapsed < 10
+
+
+def test_same_student_approved_into_two_rooms_at_once(app, headers):
+    rooms = [Room(room_number=f'20{i}', room_type='Double', capacity=4) for i in range(10)]
+    db.session.add_all(rooms)
+    db.session.commit()
+    room_ids = [r.id for r in rooms]
+    student_id = create_pending_students(1)[0]
+    db.session.remove()
+
+    def approve(room_id):
+        client = app.test_client()
+        return client.put(f'/api/admin/students/approve/{student_id}', json={'room_id': room_id}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        list(pool.map(approve, room_ids))
+
+    # However the requests interleaved, exactly one seat is held
+    student = db.session.get(Student, student_id)
+    counts = {r.id: r.occupied_count for r in Room.query.all()}
+    assert sum(counts.values()) == 1
+    assert counts[student.room_id] == 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q', '-s']))
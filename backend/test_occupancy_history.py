@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the occupancy event log and daily utilization series
+"""
+
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+import app.occupancy_history as occupancy_history
+from app import db
+from app.models import User, Room, Student, OccupancyEvent, RoomOccupancySeries
+from app.occupancy_history import update_history
+
+
+def create_pending_student(name):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name, is_enrollment_requested=True)
+    db.session.add(student)
+    db.session.commit()
+    return student.id
+
+
+def test_approve_and_reject_are_logged(app, headers):
+    room = Room(room_number='101', room_type='Double', capacity=2, block='A')
+    db.session.add(room)
+    db.session.commit()
+    room_id = room.id
+    first, second = create_pending_student('s1'), create_pending_student('s2')
+    client = app.test_client()
+
+    for student_id in (first, second):
+        response = client.put(f'/api/admin/students/approve/{student_id}', json={'room_id': room_id}, headers=headers)
+        assert response.status_code == 200
+    assert client.put(f'/api/admin/students/reject/{first}', json={}, headers=headers).status_code == 200
+
+    events = [(e.student_id, e.delta) for e in OccupancyEvent.query.order_by(OccupancyEvent.id)]
+    assert events == [(first, 1), (second, 1), (first, -1)]
+
+    data = client.get('/api/admin/rooms/utilization', headers=headers).get_json()
+    assert data['daily'][-1]['occupied'] == 1
+    assert data['daily'][0]['occupied'] == 0
+    assert data['blocks'][0]['block'] == 'A'
+
+
+def test_year_for_a_thousand_rooms(app, headers):
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=364)
+    rooms = [{'room_number': f'R{i:04d}', 'room_type': 'Double', 'capacity': 4,
+              'block': f'B{i % 5}'} for i in range(1000)]
+    db.session.execute(insert(Room), rooms)
+    room_ids = [room.id for room in Room.query.order_by(Room.id)]
+
+    rng = random.Random(7)
+    expected = {room_id: [0] * 365 for room_id in room_ids}
+
+    def log_events(first_day, last_day):
+        rows = []
+        for room_id in room_ids:
+            occupied = expected[room_id][first_day - 1] if first_day else 0
+            for day in range(first_day, last_day + 1):
+                if rng.random() < 0.05:
+                    delta = 1 if occupied == 0 or (occupied < 4 and rng.random() < 0.5) else -1
+                    occupied += delta
+                    when = datetime.combine(start + timedelta(days=day), datetime.min.time()) + timedelta(hours=12)
+                    rows.append({'room_id': room_id, 'delta': delta, 'created_at': when})
+                expected[room_id][day] = occupied
+            for day in range(last_day + 1, 365):
+                expected[room_id][day] = occupied
+        db.session.execute(insert(OccupancyEvent), rows)
+        db.session.commit()
+
+    # Fold most of the year, then the rest incrementally
+    log_events(0, 299)
+    client = app.test_client()
+    url = f"/api/admin/rooms/utilization?from={start:%Y-%m-%d}&to={today:%Y-%m-%d}&daily=true"
+    assert client.get(url, headers=headers).status_code == 200
+    log_events(300, 364)
+
+    started = time.perf_counter()
+    response = client.get(url, headers=headers)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert len(data['rooms']) == 1000
+    for room in data['rooms']:
+        assert room['daily'] == expected[room['room_id']]
+    assert [day['occupied'] for day in data['daily']] == [
+        sum(expected[room_id][day] for room_id in room_ids) for day in range(365)
+    ]
+    assert RoomOccupancySeries.query.count() <= 1000 * len({start.year, today.year})
+
+    # Already folded - a plain read
+    started = time.perf_counter()
+    client.get(url.replace('&daily=true', ''), headers=headers)
+    print(f"Year of history for 1000 rooms in {time.perf_counter() - started:.3f}s "
+          f"({elapsed:.3f}s with incremental fold)")
+    assert elapsed < 5
+
+
+def test_concurrent_year_rollover_keeps_the_first_row(app, monkeypatch):
+    room = Room(room_number='101', room_type='Double', capacity=2)
+    db.session.add(room)
+    db.session.flush()
+    db.session.add(OccupancyEvent(room_id=room.id, delta=1, created_at=datetime(2025, 6, 1, 12)))
+    db.session.commit()
+    update_history(date(2025, 12, 31))
+    db.session.commit()
+
+    # Another request extends the series to 2026 after this one has read it
+    load_series = occupancy_history._load_series
+
+    def racing_load(room_ids):
+        series = load_series(room_ids)
+        db.session.execute(insert(RoomOccupancySeries), [
+            {'room_id': room.id, 'year': 2026, 'counts': occupancy_history._pack(np.ones(366))}
+        ])
+        return series
+    monkeypatch.setattr(occupancy_history, '_load_series', racing_load)
+
+    assert update_history(date(2026, 1, 2)) == 0
+    db.session.commit()
+    rows = RoomOccupancySeries.query.filter_by(room_id=room.id).order_by(RoomOccupancySeries.year).all()
+    assert [row.year for row in rows] == [2025, 2026]
+    assert occupancy_history._unpack(rows[1].counts)[0] == 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q', '-s']))
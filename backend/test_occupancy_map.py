@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached building/floor/room occupancy map
+"""
+
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student
+
+
+def test_map_is_cached_until_assignments_change(app, headers, count_queries):
+    db.session.add_all([
+        Room(room_number='A101', room_type='Double', block='A', floor=1),
+        Room(room_number='A201', room_type='Double', block='A', floor=2),
+        Room(room_number='B101', room_type='Single', block='B', floor=1, capacity=1),
+    ])
+    user = User(name='Asha', email='asha@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number='HMS0002', is_enrollment_requested=True)
+    db.session.add(student)
+    db.session.commit()
+    client = app.test_client()
+
+    with count_queries() as statements:
+        first = client.get('/api/admin/occupancy-map', headers=headers)
+        second = client.get('/api/admin/occupancy-map', headers=headers)
+
+    assert first.status_code == 200
+    assert len([s for s in statements if 'FROM room' in s]) == 1
+    assert first.data == second.data
+    data = first.get_json()
+    assert [b['block'] for b in data['buildings']] == ['A', 'B']
+    assert [f['floor'] for f in data['buildings'][0]['floors']] == [1, 2]
+
+    not_modified = client.get('/api/admin/occupancy-map', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+
+    b101 = Room.query.filter_by(room_number='B101').first()
+    client.put(f'/api/admin/students/approve/{student.id}', json={'room_id': b101.id}, headers=headers)
+    data = client.get('/api/admin/occupancy-map', headers=headers).get_json()
+    room = data['buildings'][1]['floors'][0]['rooms'][0]
+    assert room['is_full']
+    assert room['occupants'][0]['name'] == 'Asha'
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
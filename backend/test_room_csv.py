@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk room CSV import and export
+"""
+
+import csv
+import io
+import time
+
+import pytest
+
+from app import db
+from app.models import Room
+
+
+def upload(client, headers, text, query=''):
+    data = {'file': (io.BytesIO(text.encode('utf-8')), 'rooms.csv')}
+    return client.post(f'/api/admin/rooms/import{query}', data=data, headers=headers,
+                       content_type='multipart/form-data')
+
+
+def test_import_reports_bad_and_duplicate_rows(app, headers):
+    db.session.add(Room(room_number='A101', room_type='Double'))
+    db.session.commit()
+    text = ('room_number,room_type,capacity,block,floor\n'
+            'A101,Double,4,A,1\n'
+            'A102,Double,2,A,1\n'
+            'A102,Single,1,A,1\n'
+            'A103,,4,A,1\n'
+            'A104,Triple,x,A,1\n'
+            'A105,Triple,,A,1\n')
+    client = app.test_client()
+
+    summary = upload(client, headers, text, '?dry_run=true').get_json()
+    assert (summary['imported'], summary['skipped']) == (2, 4)
+    assert Room.query.count() == 1
+
+    summary = upload(client, headers, text).get_json()
+    assert [e['line'] for e in summary['errors']] == [2, 4, 5, 6]
+    assert {r.room_number: r.capacity for r in Room.query.all()} == {'A101': 4, 'A102': 2, 'A105': 4}
+
+
+def test_import_derives_status_from_occupancy(app, headers):
+    # An exported file can be imported again; its status column is ignored
+    text = ('room_number,room_type,capacity,block,floor,status,occupied\n'
+            'C101,Double,2,C,1,Fully Occupied,2\n')
+    summary = upload(app.test_client(), headers, text).get_json()
+    assert summary['imported'] == 1
+    room = Room.query.filter_by(room_number='C101').one()
+    assert (room.status, room.occupied_count) == ('Vacant', 0)
+
+
+def test_import_and_export_ten_thousand_rooms(app, headers):
+    lines = ['room_number,room_type,capacity,block,floor']
+    lines += [f'{i:05d},Double,4,B{i // 1000},{i // 100 % 10}' for i in range(10000)]
+    client = app.test_client()
+
+    started = time.perf_counter()
+    summary = upload(client, headers, '\n'.join(lines)).get_json()
+    elapsed = time.perf_counter() - started
+    assert summary['imported'] == 10000
+    assert elapsed < 5
+
+    response = client.get('/api/admin/rooms/export', headers=headers)
+    assert response.is_streamed
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 10000
+    assert rows[123] == {'room_number': '00123', 'room_type': 'Double', 'capacity': '4', 'block': 'B0',
+                         'floor': '1', 'status': 'Vacant', 'occupied': '0'}
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for transactional room moves and swaps
+"""
+
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student, RoomChangeRequest
+from app.room_moves import find_cycles
+
+
+def make_room(number, capacity, occupants):
+    room = Room(room_number=number, room_type='Double', capacity=capacity, occupied_count=occupants)
+    db.session.add(room)
+    db.session.flush()
+    students = []
+    for i in range(occupants):
+        user = User(name=f'{number}-{i}', email=f'{number}-{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, roll_number=f'R{number}{i}', room_id=room.id,
+                          is_approved=True, status='active')
+        db.session.add(student)
+        db.session.flush()
+        students.append(student.id)
+    return room.id, students
+
+
+def test_find_cycles():
+    edges = [(1, 2), (2, 3), (3, 1), (4, 5), (5, 4), (6, 7)]
+    cycles = find_cycles(edges)
+    assert sorted(sorted(cycle) for cycle in cycles) == [[0, 1, 2], [3, 4]]
+    assert find_cycles([(1, 2), (2, 3)]) == []
+
+
+def test_three_way_swap_between_full_rooms(app, headers):
+    a, (a1, a2) = make_room('A', 2, 2)
+    b, (b1, b2) = make_room('B', 2, 2)
+    c, (c1, c2) = make_room('C', 2, 2)
+    db.session.commit()
+
+    moves = [
+        {'student_id': a1, 'room_id': b},
+        {'student_id': b1, 'room_id': c},
+        {'student_id': c1, 'room_id': a},
+    ]
+    response = app.test_client().post('/api/admin/rooms/moves', json={'moves': moves}, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [sorted(cycle) for cycle in data['cycles']] == [sorted([a1, b1, c1])]
+    assert data['occupancy_changes'] == {}
+
+    assert {s.id: s.room_id for s in Student.query.all()} == {
+        a1: b, a2: a, b1: c, b2: b, c1: a, c2: c
+    }
+    assert all(room.occupied_count == 2 for room in Room.query.all())
+    assert RoomChangeRequest.query.filter_by(batch_id=data['batch_id']).count() == 3
+
+
+def test_batch_is_rejected_as_a_whole_when_a_room_overflows(app, headers):
+    a, (a1, a2) = make_room('A', 2, 2)
+    b, (b1,) = make_room('B', 2, 1)
+    db.session.commit()
+
+    moves = [{'student_id': a1, 'room_id': b}, {'student_id': a2, 'room_id': b}]
+    response = app.test_client().post('/api/admin/rooms/moves', json={'moves': moves}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['room_id'] == b
+    assert db.session.get(Student, a1).room_id == a
+    assert RoomChangeRequest.query.count() == 0
+
+    # One move fits and frees a seat in A
+    response = app.test_client().post('/api/admin/rooms/moves', json={'moves': moves[:1]}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['occupancy_changes'] == {str(a): -1, str(b): 1}
+    counts = {room.id: room.occupied_count for room in Room.query.all()}
+    assert counts == {a: 1, b: 2}
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
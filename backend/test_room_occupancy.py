@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the denormalized room occupancy counter
+"""
+
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student
+from app.occupancy import rebuild_occupancy
+
+
+def make_student(index):
+    user = User(name=f'Student {index}', email=f'student{index}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=f'HMS{user.id:04d}', is_enrollment_requested=True)
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_approve_reject_and_move_keep_counter_exact(app, headers):
+    client = app.test_client()
+    room_a = Room(room_number='A1', room_type='Double', capacity=2)
+    room_b = Room(room_number='B1', room_type='Double', capacity=2)
+    db.session.add_all([room_a, room_b])
+    db.session.commit()
+    students = [make_student(i) for i in range(3)]
+
+    for student in students[:2]:
+        response = client.put(f'/api/admin/students/approve/{student.id}', json={'room_id': room_a.id}, headers=headers)
+        assert response.status_code == 200
+
+    # Room A is full now
+    response = client.put(f'/api/admin/students/approve/{students[2].id}', json={'room_id': room_a.id}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['room_full']
+
+    # Re-approving a student into the room they already occupy is allowed
+    response = client.put(f'/api/admin/students/approve/{students[0].id}', json={'room_id': room_a.id}, headers=headers)
+    assert response.status_code == 200
+
+    # Reassigning moves the seat
+    response = client.put(f'/api/admin/students/approve/{students[0].id}', json={'room_id': room_b.id}, headers=headers)
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert (room_a.occupied_count, room_b.occupied_count) == (1, 1)
+
+    response = client.put(f'/api/admin/students/reject/{students[1].id}', headers=headers)
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert room_a.occupied_count == 0
+    assert room_a.status == 'Vacant'
+    assert room_b.status == '1/2'
+
+
+def test_editing_capacity_recomputes_status(app, headers):
+    client = app.test_client()
+    room = Room(room_number='D1', room_type='Double', capacity=2)
+    db.session.add(room)
+    db.session.commit()
+    student = make_student(1)
+    response = client.put(f'/api/admin/students/approve/{student.id}', json={'room_id': room.id}, headers=headers)
+    assert response.status_code == 200
+
+    # A client-sent status is ignored
+    response = client.put(f'/api/rooms/{room.id}', json={'status': 'Vacant', 'block': 'B'}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['status'] == '1/2'
+
+    response = client.put(f'/api/rooms/{room.id}', json={'capacity': 1, 'status': 'Vacant'}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'Fully Occupied'
+
+    response = client.put(f'/api/rooms/{room.id}', json={'capacity': 3, 'room_number': 'D2'}, headers=headers)
+    assert response.get_json()['status'] == '1/3'
+
+    # Shrinking below the occupants changes nothing
+    client.put(f'/api/admin/students/approve/{make_student(2).id}', json={'room_id': room.id}, headers=headers)
+    response = client.put(f'/api/rooms/{room.id}', json={'capacity': 1, 'room_number': 'D3'}, headers=headers)
+    assert response.status_code == 409
+    db.session.expire_all()
+    assert (room.room_number, room.capacity, room.status) == ('D2', 3, '2/3')
+
+    # Bad capacities are rejected before anything is written
+    for capacity in ('x', None, 2.5, True, 0, -1):
+        response = client.put(f'/api/rooms/{room.id}', json={'capacity': capacity, 'room_number': 'D4'}, headers=headers)
+        assert response.status_code == 400, capacity
+    db.session.expire_all()
+    assert (room.room_number, room.capacity) == ('D2', 3)
+
+
+def test_room_listings_use_a_single_select(app, headers, count_queries):
+    client = app.test_client()
+    db.session.add_all([Room(room_number=f'R{i}', room_type='Double') for i in range(20)])
+    db.session.add(Room(room_number='FULL', room_type='Double', capacity=1, occupied_count=1))
+    db.session.commit()
+    db.session.remove()
+
+    # One query for the admin user lookup, one for the room list
+    with count_queries() as statements:
+        response = client.get('/api/rooms/available', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 20
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM room' in s]) == 1
+
+
+def test_rebuild_occupancy(app):
+    room = Room(room_number='C1', room_type='Double', occupied_count=3)
+    db.session.add(room)
+    db.session.commit()
+    student = make_student(1)
+    student.is_approved = True
+    student.room_id = room.id
+    db.session.commit()
+
+    rebuild_occupancy()
+    db.session.commit()
+    assert room.occupied_count == 1
+    assert room.status == '1/4'
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized room recommendations
+"""
+
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from app import db
+from app.models import User, Room, Student
+from app.recommendations import recommend_rooms
+
+
+def seed(rooms, students_per_room, courses):
+    db.session.execute(insert(Room), [
+        {'id': i, 'room_number': f'R{i:04d}', 'room_type': ['Single', 'Double', 'Triple'][i % 3],
+         'capacity': 4, 'occupied_count': students_per_room}
+        for i in range(1, rooms + 1)
+    ])
+    users, students = [], []
+    for i in range(1, rooms * students_per_room + 1):
+        room_id = (i - 1) // students_per_room + 1
+        users.append({'id': 1000 + i, 'name': f'S{i}', 'email': f's{i}@example.com', 'password_hash': 'x'})
+        students.append({'id': i, 'user_id': 1000 + i, 'room_id': room_id, 'roll_number': f'R{i}',
+                         'course': courses[room_id % len(courses)], 'semesters_requested': 1 + room_id % 8,
+                         'date_of_birth': date(2000 + room_id % 6, 1, 1), 'is_approved': True, 'status': 'active'})
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(Student), students)
+    db.session.commit()
+
+
+def candidate(**fields):
+    user = User(name='Candidate', email='candidate@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number='CAND', is_enrollment_requested=True, **fields)
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_best_match_ranks_first(app, headers):
+    seed(rooms=6, students_per_room=2, courses=['CSE', 'ECE', 'MECH'])
+    student = candidate(course='ECE', semesters_requested=2, date_of_birth=date(2001, 6, 1),
+                        preferred_room_type='Double')
+
+    response = app.test_client().get(f'/api/admin/students/{student.id}/room-recommendations?k=3', headers=headers)
+
+    recommendations = response.get_json()['recommendations']
+    assert len(recommendations) == 3
+    # Room 1 is the Double room full of ECE students on a 2 semester stay
+    assert recommendations[0]['id'] == 1
+    assert recommendations[0]['components']['course'] == 1.0
+    assert [r['score'] for r in recommendations] == sorted((r['score'] for r in recommendations), reverse=True)
+
+
+def test_scoring_is_fast_once_features_are_cached(app):
+    seed(rooms=1500, students_per_room=3, courses=[f'Course {i}' for i in range(40)])
+    student = candidate(course='Course 7', semesters_requested=3, date_of_birth=date(2002, 1, 1))
+    recommend_rooms(student, 5)
+
+    started = time.perf_counter()
+    for _ in range(10):
+        recommendations = recommend_rooms(student, 5)
+    elapsed = (time.perf_counter() - started) / 10
+
+    assert len(recommendations) == 5
+    assert elapsed < 0.05
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the room waitlist and automatic promotion
+"""
+
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.email import send_room_allocation_email
+from app.models import User, Room, Student, RoomWaitlistEntry, RoomNotification, FeeNotification
+from app.waitlist import fill_freed_seat
+
+
+def make_student(index):
+    user = User(name=f'Student {index}', email=f'student{index}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=f'HMS{user.id:04d}', is_enrollment_requested=True)
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_freed_seat_goes_to_head_of_room_queue(app, headers):
+    client = app.test_client()
+    room = Room(room_number='101', room_type='Single', capacity=1)
+    other = Room(room_number='102', room_type='Single', capacity=1, occupied_count=1)
+    db.session.add_all([room, other])
+    db.session.commit()
+    occupant, by_type, by_room = make_student(1), make_student(2), make_student(3)
+    client.put(f'/api/admin/students/approve/{occupant.id}', json={'room_id': room.id}, headers=headers)
+
+    # A type-wide entry queued first still loses to an entry for the room itself
+    response = client.post('/api/admin/rooms/waitlist', json={'student_id': by_type.id, 'room_type': 'Single'}, headers=headers)
+    assert response.status_code == 201
+    response = client.post('/api/admin/rooms/waitlist', json={'student_id': by_room.id, 'room_id': room.id}, headers=headers)
+    assert response.status_code == 201
+
+    response = client.put(f'/api/admin/students/reject/{occupant.id}', headers=headers)
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert by_room.is_approved and by_room.room_id == room.id
+    assert room.occupied_count == 1
+    assert RoomNotification.query.filter_by(student_id=by_room.id).count() == 1
+    assert FeeNotification.query.filter_by(student_id=by_room.id).count() == 0
+    assert [e.student_id for e in RoomWaitlistEntry.query.all()] == [by_type.id]
+
+
+def test_room_type_queue_and_stale_entries(app, headers):
+    client = app.test_client()
+    room = Room(room_number='201', room_type='Double', capacity=1)
+    db.session.add(room)
+    db.session.commit()
+    occupant, rejected, waiting = make_student(1), make_student(2), make_student(3)
+    client.put(f'/api/admin/students/approve/{occupant.id}', json={'room_id': room.id}, headers=headers)
+    for student in (rejected, waiting):
+        client.post('/api/admin/rooms/waitlist', json={'student_id': student.id, 'room_type': 'Double'}, headers=headers)
+
+    # Rejecting a waitlisted student takes them off the queue
+    client.put(f'/api/admin/students/reject/{rejected.id}', headers=headers)
+    assert RoomWaitlistEntry.query.count() == 1
+
+    client.put(f'/api/admin/students/reject/{occupant.id}', headers=headers)
+    db.session.expire_all()
+    assert waiting.room_id == room.id and waiting.is_approved
+    assert RoomWaitlistEntry.query.count() == 0
+
+
+def test_full_room_leaves_waiting_student_untouched(app, headers):
+    room = Room(room_number='301', room_type='Single', capacity=1, occupied_count=1)
+    db.session.add(room)
+    db.session.commit()
+    waiting = make_student(1)
+    db.session.add(RoomWaitlistEntry(student_id=waiting.id, room_id=room.id))
+    db.session.commit()
+
+    # The freed seat was already taken by a concurrent approval
+    assert fill_freed_seat(room.id) is None
+    db.session.commit()
+    db.session.expire_all()
+    assert not waiting.is_approved and waiting.room_id is None and waiting.approval_date is None
+    assert room.occupied_count == 1
+    assert RoomWaitlistEntry.query.filter_by(student_id=waiting.id).count() == 1
+    assert RoomNotification.query.filter_by(student_id=waiting.id).count() == 0
+
+
+def test_student_reads_room_notifications(app):
+    client = app.test_client()
+    student, other = make_student(1), make_student(2)
+    db.session.add(RoomNotification(student_id=student.id, title='Room allocated', content='Room 101'))
+    db.session.commit()
+    own = {'Authorization': f"Bearer {create_access_token(identity=str(student.user_id))}"}
+    others = {'Authorization': f"Bearer {create_access_token(identity=str(other.user_id))}"}
+
+    response = client.get('/api/student/room-notifications', headers=own)
+    assert response.status_code == 200
+    [notification] = response.get_json()
+    assert notification['title'] == 'Room allocated' and not notification['is_read']
+    assert client.get('/api/student/room-notifications', headers=others).get_json() == []
+
+    url = f"/api/student/room-notifications/{notification['id']}/read"
+    assert client.post(url, headers=others).status_code == 404
+    assert client.post(url, headers=own).status_code == 200
+    assert client.get('/api/student/room-notifications', headers=own).get_json()[0]['is_read']
+
+
+def test_room_allocation_email_escapes_name(monkeypatch):
+    sent = []
+    monkeypatch.setattr('app.email.send_email', lambda subject, email, html: sent.append(html))
+    send_room_allocation_email('student@example.com', '<b>Eve</b>', '101')
+    assert '&lt;b&gt;Eve&lt;/b&gt;' in sent[0] and '<b>Eve</b>' not in sent[0]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached roommates endpoint
+"""
+
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, Room, Student
+
+
+def add_student(name, room_id, **fields):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name, room_id=room_id, **fields)
+    db.session.add(student)
+    db.session.commit()
+    return student, {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def test_roommates_are_scoped_cached_and_invalidated(app, headers):
+    rooms = [Room(room_number='101', room_type='Double', capacity=4, occupied_count=2),
+             Room(room_number='102', room_type='Double', capacity=4, occupied_count=1)]
+    db.session.add_all(rooms)
+    db.session.commit()
+    room_id, other_room_id = rooms[0].id, rooms[1].id
+
+    alice, alice_headers = add_student('alice', room_id, is_approved=True, status='active')
+    bob, _ = add_student('bob', room_id, is_approved=True, status='active')
+    add_student('carol', room_id, is_approved=False)
+    add_student('dave', room_id, is_approved=True, status='rejected')
+    add_student('erin', other_room_id, is_approved=True, status='active')
+    client = app.test_client()
+
+    response = client.get('/api/student/roommates', headers=alice_headers)
+    assert response.status_code == 200
+    assert [r['name'] for r in response.get_json()] == ['alice', 'bob']
+    etag = response.headers['ETag']
+
+    # The frontend still passes its own room id; another room is refused
+    assert client.get(f'/api/student/roommates?room_id={room_id}', headers=alice_headers).status_code == 200
+    assert client.get(f'/api/student/roommates?room_id={other_room_id}', headers=alice_headers).status_code == 403
+
+    response = client.get('/api/student/roommates', headers={**alice_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # A roommate's new picture invalidates the cached list
+    bob.profile_picture = 'uploads/bob.png'
+    db.session.commit()
+    response = client.get('/api/student/roommates', headers={**alice_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()[1]['profile_picture'] == 'uploads/bob.png'
+
+    # Admins can read any room
+    response = client.get(f'/api/student/roommates?room_id={other_room_id}', headers=headers)
+    assert [r['name'] for r in response.get_json()] == ['erin']
+
+
+def test_student_without_room_gets_empty_list(app):
+    _, headers = add_student('frank', None, is_enrollment_requested=True)
+    response = app.test_client().get('/api/student/roommates', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the admin full-text search index
+"""
+
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete, insert, text, update
+
+from app import db
+from app.models import User, Complaint, ComplaintReply, Notice, Feedback
+from app.search import rebuild_search_index, search_documents, SearchQueryError
+
+
+def hits(q, types=None):
+    return [(result['type'], result['id']) for result in search_documents(q, types)]
+
+
+def test_triggers_keep_index_in_sync(admin):
+    complaint = Complaint(subject='Broken window', details='The window in my room is cracked', user_id=admin.id)
+    db.session.add(complaint)
+    db.session.flush()
+    reply = ComplaintReply(complaint_id=complaint.id, user_id=admin.id, content='Carpenter booked', is_admin=True)
+    notice = Notice(title='Water outage', content='No water on Sunday morning')
+    feedback = Feedback(content='The mess food is great', user_id=admin.id)
+    db.session.add_all([reply, notice, feedback])
+    db.session.commit()
+
+    assert hits('window') == [('complaint', complaint.id)]
+    assert hits('carpenter') == [('complaint_reply', reply.id)]
+    assert hits('water sunday') == [('notice', notice.id)]
+    assert hits('mess') == [('feedback', feedback.id)]
+
+    complaint.details = 'The door lock is jammed'
+    db.session.commit()
+    assert hits('cracked') == []
+    assert hits('jammed') == [('complaint', complaint.id)]
+
+    # Bulk SQL writes are picked up by the triggers too
+    db.session.execute(update(Notice).where(Notice.id == notice.id).values(title='Power cut'))
+    db.session.execute(delete(ComplaintReply).where(ComplaintReply.id == reply.id))
+    db.session.commit()
+    assert hits('outage') == []
+    assert hits('power') == [('notice', notice.id)]
+    assert hits('carpenter') == []
+
+    db.session.delete(feedback)
+    db.session.commit()
+    assert hits('mess') == []
+
+
+def test_types_ranking_and_snippets(admin):
+    complaint = Complaint(subject='Wifi down', details='No internet since morning', user_id=admin.id)
+    db.session.add_all([complaint, Notice(title='Holiday', content='Wifi maintenance on Friday')])
+    db.session.commit()
+    db.session.add(ComplaintReply(complaint_id=complaint.id, user_id=admin.id,
+                                  content='Router replaced, wifi should be back', is_admin=True))
+    db.session.commit()
+
+    results = search_documents('wifi')
+    # A title match outranks a body match
+    assert results[0]['type'] == 'complaint'
+    assert {result['type'] for result in results} == {'complaint', 'complaint_reply', 'notice'}
+    reply = next(result for result in results if result['type'] == 'complaint_reply')
+    assert reply['complaint_id'] == complaint.id
+    assert '**wifi**' in reply['snippet']
+
+    assert hits('wifi', ['notice', 'feedback']) == [('notice', 1)]
+    assert hits('maint') == [('notice', 1)]
+    with pytest.raises(SearchQueryError):
+        search_documents('  ?! ')
+
+
+def test_rebuild(admin):
+    db.session.add_all([Notice(title=f'Notice {n}', content='Mess timings changed') for n in range(3)])
+    db.session.commit()
+    db.session.execute(text('DELETE FROM search_index'))
+    assert hits('timings') == []
+    assert rebuild_search_index() == 3
+    db.session.commit()
+    assert len(hits('timings')) == 3
+
+
+def test_search_endpoint(app, admin, headers):
+    db.session.add(Feedback(content='Hot water please', user_id=admin.id))
+    db.session.commit()
+    client = app.test_client()
+
+    response = client.get('/api/admin/search?q=hot+wat&types=feedback', headers=headers)
+    assert response.status_code == 200
+    assert [result['type'] for result in response.get_json()] == ['feedback']
+
+    assert client.get('/api/admin/search?q=hot&types=rooms', headers=headers).status_code == 400
+    assert client.get('/api/admin/search', headers=headers).status_code == 400
+
+    student = User(name='Student', email='s@example.com', password_hash='x')
+    db.session.add(student)
+    db.session.commit()
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(student.id))}"}
+    assert client.get('/api/admin/search?q=hot', headers=student_headers).status_code == 403
+
+
+def test_search_is_fast_at_100k_documents(admin):
+    words = ['leak', 'fan', 'light', 'door', 'bed', 'noise', 'mess', 'wifi', 'water', 'lock']
+    db.session.execute(insert(Complaint), [
+        {'subject': f'{words[n % 10]} issue {n}', 'details': f'{words[n * 7 % 10]} in block {n % 40}',
+         'user_id': admin.id, 'status': 'Pending'}
+        for n in range(50000)
+    ])
+    db.session.execute(insert(Notice), [
+        {'title': f'Notice {n}', 'content': f'{words[n % 10]} schedule for block {n % 40}'}
+        for n in range(50000)
+    ])
+    db.session.execute(insert(Complaint), [
+        {'subject': 'Ceiling fan sparks', 'details': 'Sparks from the regulator', 'user_id': admin.id,
+         'status': 'Pending'}
+    ])
+    db.session.commit()
+
+    search_documents('regulator')
+    started = time.perf_counter()
+    results = search_documents('sparks regul')
+    elapsed = time.perf_counter() - started
+    assert [result['title'] for result in results] == ['Ceiling fan sparks']
+    assert elapsed < 0.05
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script for semester rollover archival and restore
+"""
+
+from datetime import datetime, timedelta, date
+
+import pytest
+
+from app import db
+from app.models import (User, Room, Student, StudentTombstone, Attendance, Fee, FeeNotification, RoomNotification,
+                        Complaint, ComplaintReply, ComplaintNotification, ComplaintEscalation,
+                        ComplaintSignature, ComplaintBand, FingerprintData, ArchivedStudent, ArchivedRecord)
+from app.archive import archive_students
+from app.clustering import assign_cluster
+from app.student_search import search_students
+
+
+TODAY = date(2026, 7, 1)
+
+
+def make_student(name, **fields):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name.upper(), **fields)
+    db.session.add(student)
+    db.session.flush()
+    return student
+
+
+def add_history(student, admin):
+    db.session.add(Attendance(student_id=student.id, date=date(2026, 1, 5), status='Present'))
+    db.session.add(Fee(student_id=student.id, description='Rent', amount=500, due_date=datetime(2026, 1, 1)))
+    db.session.add(FeeNotification(student_id=student.id, title='Due', content='Pay'))
+    db.session.add(RoomNotification(student_id=student.id, title='Room allocated', content='Room 101'))
+    db.session.add(FingerprintData(student_id=student.id, right_thumb_template='t' * 100))
+    complaint = Complaint(subject='Fan', details='Broken', user_id=student.user_id)
+    db.session.add(complaint)
+    db.session.flush()
+    db.session.add(ComplaintReply(content='On it', complaint_id=complaint.id, user_id=admin.id, is_admin=True))
+
+
+def populate():
+    admin = User.query.filter_by(role='admin').first()
+    room = Room(room_number='101', room_type='Double', capacity=4)
+    db.session.add(room)
+    db.session.flush()
+    long_ago = datetime.utcnow() - timedelta(days=90)
+    students = {
+        # Rejected months ago: archived
+        'rejected': make_student('rejected', status='rejected', updated_at=long_ago),
+        # Rejected yesterday: kept for now
+        'fresh': make_student('fresh', status='rejected'),
+        # One semester from 2025-09-01 ended in March, room already freed: archived
+        'left': make_student('left', is_approved=True, status='inactive', room_id=room.id,
+                             join_date=date(2025, 9, 1), semesters_requested=1),
+        # Stay ended but still seated: left for the expiry job
+        'seated': make_student('seated', is_approved=True, room_id=room.id,
+                               join_date=date(2025, 9, 1), semesters_requested=1),
+        # Four semesters: still staying
+        'staying': make_student('staying', is_approved=True, room_id=room.id,
+                                join_date=date(2025, 9, 1), semesters_requested=4)
+    }
+    for student in students.values():
+        add_history(student, admin)
+    db.session.commit()
+    # Set after the flush hooks have stamped updated_at
+    db.session.execute(db.update(Student).where(Student.id == students['rejected'].id)
+                       .values(updated_at=long_ago).execution_options(synchronize_session=False))
+    db.session.commit()
+    return {name: (student.id, student.user_id) for name, student in students.items()}
+
+
+def test_archive_moves_students_and_history(app, headers):
+    ids = populate()
+    assert search_students('left')
+
+    summary = archive_students(today=TODAY, batch_size=1)
+    assert summary['students'] == 2 and summary['batches'] == 2
+    # 7 records each: attendance, fee, fee and room notifications, fingerprint, complaint and its reply
+    assert summary['records'] == 14
+
+    remaining = {s.roll_number for s in Student.query.all()}
+    assert remaining == {'FRESH', 'SEATED', 'STAYING'}
+    assert Complaint.query.count() == 3 and ComplaintReply.query.count() == 3
+    assert Attendance.query.count() == 3 and FingerprintData.query.count() == 3
+    assert RoomNotification.query.count() == 3
+    assert {t.student_id for t in StudentTombstone.query} == {ids['rejected'][0], ids['left'][0]}
+    assert User.query.filter_by(email='left@example.com').first() is not None
+    assert search_students('left') == []
+
+    client = app.test_client()
+    listing = client.get('/api/admin/archive/students', headers=headers).get_json()
+    assert {s['roll_number'] for s in listing} == {'REJECTED', 'LEFT'}
+    assert {s['reason'] for s in listing} == {'rejected', 'stay_ended'}
+    assert [s['roll_number'] for s in client.get('/api/admin/archive/students?q=lef',
+                                                  headers=headers).get_json()] == ['LEFT']
+
+    detail = client.get(f"/api/admin/archive/students/{ids['left'][0]}", headers=headers).get_json()
+    assert detail['student']['join_date'] == '2025-09-01'
+    assert len(detail['records']['complaint']) == 1 and len(detail['records']['complaint_reply']) == 1
+    assert detail['records']['fee'][0]['description'] == 'Rent'
+
+    # Running again finds nothing new
+    assert archive_students(today=TODAY)['students'] == 0
+
+
+def test_restore_puts_everything_back(app, headers):
+    ids = populate()
+    archive_students(today=TODAY)
+    student_id, user_id = ids['left']
+    client = app.test_client()
+
+    response = client.post(f'/api/admin/archive/students/{student_id}/restore', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['restored_records'] == 7
+    assert data['student']['id'] == student_id and data['student']['has_fingerprint'] is True
+
+    student = db.session.get(Student, student_id)
+    assert student.join_date == date(2025, 9, 1) and student.status == 'inactive'
+    assert Attendance.query.filter_by(student_id=student_id).count() == 1
+    assert RoomNotification.query.filter_by(student_id=student_id).count() == 1
+    complaint = Complaint.query.filter_by(user_id=user_id).one()
+    assert len(complaint.replies) == 1
+    assert ArchivedStudent.query.filter_by(student_id=student_id).first() is None
+    assert ArchivedRecord.query.filter_by(student_id=student_id).count() == 0
+    assert search_students('left')[0]['id'] == student_id
+
+    assert client.post(f'/api/admin/archive/students/{student_id}/restore', headers=headers).status_code == 404
+
+
+def test_complaint_alerts_and_signatures_follow_the_complaint(app, admin, headers):
+    ids = populate()
+    student_id, user_id = ids['left']
+    complaint = Complaint.query.filter_by(user_id=user_id).one()
+    assign_cluster(complaint)
+    db.session.add(ComplaintNotification(student_user_id=user_id, complaint_id=complaint.id,
+                                         reply_id=complaint.replies[0].id))
+    db.session.add(ComplaintEscalation(admin_user_id=admin.id, complaint_id=complaint.id))
+    db.session.commit()
+
+    archive_students(today=TODAY)
+    live = {c.id for c in Complaint.query}
+    for model in (ComplaintReply, ComplaintNotification, ComplaintEscalation, ComplaintSignature, ComplaintBand):
+        assert {row.complaint_id for row in model.query} <= live
+
+    client = app.test_client()
+    response = client.post(f'/api/admin/archive/students/{student_id}/restore', headers=headers)
+    assert response.status_code == 200
+    complaint = Complaint.query.filter_by(user_id=user_id).one()
+    notification = ComplaintNotification.query.filter_by(student_user_id=user_id).one()
+    assert notification.complaint_id == complaint.id and notification.reply_id == complaint.replies[0].id
+    assert ComplaintEscalation.query.filter_by(complaint_id=complaint.id).count() == 1
+    assert db.session.get(ComplaintSignature, complaint.id) is not None
+    assert ComplaintBand.query.filter_by(complaint_id=complaint.id).count() > 0
+    assert complaint.cluster_id is not None
+
+
+def test_archived_student_cannot_log_in(app):
+    ids = populate()
+    user = db.session.get(User, ids['rejected'][1])
+    user.set_password('Secret@123')
+    db.session.commit()
+    archive_students(today=TODAY)
+
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': 'rejected@example.com', 'password': 'Secret@123'})
+    assert response.status_code == 403
+    assert response.get_json()['status'] == 'archived'
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
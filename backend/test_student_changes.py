@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the admin student delta-sync endpoint
+"""
+
+import time
+
+import pytest
+
+from app import db
+from app import changes
+from app.models import User, Room, Student, FingerprintData
+
+
+@pytest.fixture(autouse=True)
+def settle_immediately(monkeypatch):
+    monkeypatch.setattr(changes, 'SETTLE_SECONDS', 0)
+
+
+def add_student(name):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name, is_enrollment_requested=True)
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_changes_feed(app, headers, count_queries):
+    client = app.test_client()
+    room = Room(room_number='101', room_type='Double', capacity=4)
+    db.session.add(room)
+    students = [add_student(f's{i}') for i in range(5)]
+    db.session.commit()
+
+    def poll(cursor=None):
+        time.sleep(0.01)
+        url = '/api/admin/students/changes' + (f'?since={cursor}' if cursor else '')
+        data = client.get(url, headers=headers).get_json()
+        return data, data['cursor']
+
+    data, cursor = poll()
+    assert data['full'] and len(data['students']) == 5
+
+    data, cursor = poll(cursor)
+    assert data['students'] == [] and data['removed'] == []
+
+    # An idle poll is a single query against the indexes
+    with count_queries() as statements:
+        changes.student_changes(changes.decode_cursor(cursor))
+    assert len(statements) == 1
+
+    db.session.get(User, students[0].user_id).name = 'Renamed'
+    students[1].room_id = room.id
+    db.session.add(FingerprintData(student_id=students[2].id, right_thumb_template='x'))
+    db.session.commit()
+    data, cursor = poll(cursor)
+    by_id = {s['id']: s for s in data['students']}
+    assert set(by_id) == {students[0].id, students[1].id, students[2].id}
+    assert by_id[students[0].id]['name'] == 'Renamed'
+    assert by_id[students[1].id]['room_number'] == '101'
+    assert by_id[students[2].id]['has_fingerprint'] is True
+
+    removed_id = students[4].id
+    db.session.delete(students[4])
+    db.session.commit()
+    data, cursor = poll(cursor)
+    assert data['students'] == [] and data['removed'] == [removed_id]
+
+    data, cursor = poll(cursor)
+    assert data['students'] == [] and data['removed'] == []
+    assert client.get('/api/admin/students/changes?since=yesterday', headers=headers).status_code == 400
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the set-based expiry of students whose stay has ended
+"""
+
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student, RoomWaitlistEntry, OccupancyEvent, NoticeNotification, ArchivedStudent
+from app.expiry import expire_students
+
+
+def make_student(name, **fields):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name.upper(), **fields)
+    db.session.add(student)
+    db.session.flush()
+    return student
+
+
+def populate(count):
+    """count seated students, half of them on a one semester stay from last year"""
+    rooms = [Room(room_number=str(100 + i), room_type='Double', capacity=count // 4, occupied_count=count // 4)
+             for i in range(4)]
+    db.session.add_all(rooms)
+    db.session.flush()
+    for i in range(count):
+        make_student(f's{i}', is_approved=True, room_id=rooms[i % 4].id, join_date=date(2025, 1, 10),
+                     semesters_requested=1 if i % 2 else 8)
+    db.session.commit()
+    return rooms
+
+
+def test_expiry_frees_seats_with_constant_queries(app, count_queries):
+    rooms = populate(400)
+    with count_queries() as statements:
+        summary = expire_students(today=date(2026, 1, 1), batch_size=100)
+
+    assert summary['expired'] == 200 and summary['batches'] == 2
+    assert sum(summary['freed_seats'].values()) == 200
+    assert len([s for s in statements if s.startswith('UPDATE student')]) == 2
+    # Per batch: ids, student UPDATE, a counter UPDATE per room, event log, waitlist, commit;
+    # nothing per student
+    assert len(statements) < 40
+
+    db.session.expire_all()
+    # Odd-numbered students, all in the second and fourth rooms, had one semester
+    assert [room.occupied_count for room in rooms] == [100, 0, 100, 0]
+    inactive = Student.query.filter_by(status='inactive').all()
+    assert len(inactive) == 200 and all(s.room_id is None and s.version == 2 for s in inactive)
+    assert OccupancyEvent.query.filter_by(delta=-1).count() == 200
+
+    assert expire_students(today=date(2026, 1, 1))['expired'] == 0
+
+
+def test_freed_seats_go_to_the_waitlist(app, headers):
+    room = Room(room_number='101', room_type='Single', capacity=1, occupied_count=1)
+    db.session.add(room)
+    db.session.flush()
+    leaving = make_student('leaving', is_approved=True, room_id=room.id, join_date=date(2020, 1, 1))
+    waiting = make_student('waiting', is_enrollment_requested=True)
+    db.session.add(RoomWaitlistEntry(student_id=waiting.id, room_id=room.id))
+    db.session.commit()
+
+    response = app.test_client().post('/api/admin/students/expire', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['expired'] == 1
+    assert data['freed_seats'] == {str(room.id): 1}
+    assert data['promoted_from_waitlist'] == [waiting.id]
+
+    db.session.expire_all()
+    assert leaving.status == 'inactive' and leaving.room_id is None
+    assert waiting.room_id == room.id and waiting.is_approved
+    assert room.occupied_count == 1
+
+
+def test_expired_students_get_no_new_notices(app, headers):
+    make_student('gone', is_approved=True, status='inactive')
+    current = make_student('current', is_approved=True)
+    archived = make_student('archived', status='rejected')
+    db.session.commit()
+    db.session.add(ArchivedStudent(student_id=archived.id, user_id=archived.user_id, reason='rejected',
+                                   batch_id='b', data='{}'))
+    db.session.delete(archived)
+    db.session.commit()
+
+    response = app.test_client().post('/api/notices', json={'title': 'Water', 'content': 'Off at 9'}, headers=headers)
+    assert response.status_code == 201
+    assert [n.student_user_id for n in NoticeNotification.query] == [current.user_id]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed student roster export
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from app import db
+from app.models import User, Room, Student, FingerprintData
+from app.roster import EXPORT_BATCH_SIZE, export_roster
+
+
+def populate(count):
+    room = Room(room_number='101', room_type='Double', capacity=count, block='A')
+    db.session.add(room)
+    db.session.flush()
+    user_ids = db.session.execute(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{'name': f'Student {i}', 'email': f's{i}@example.com', 'password_hash': 'x', 'role': 'student'}
+         for i in range(count)]
+    ).scalars().all()
+    student_ids = db.session.execute(
+        insert(Student).returning(Student.id, sort_by_parameter_order=True),
+        [{'user_id': user_id, 'roll_number': f'R{i:05d}', 'course': 'CSE', 'is_approved': i % 2 == 0,
+          'is_enrollment_requested': True, 'room_id': room.id if i % 2 == 0 else None}
+         for i, user_id in enumerate(user_ids)]
+    ).scalars().all()
+    db.session.add(FingerprintData(student_id=student_ids[0], right_thumb_template='x' * 1000))
+    db.session.commit()
+    return student_ids
+
+
+def test_csv_export_streams_every_student(app, headers):
+    count = EXPORT_BATCH_SIZE * 2 + 7
+    student_ids = populate(count)
+    client = app.test_client()
+
+    response = client.get('/api/admin/students/export', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'students.csv' in response.headers['Content-Disposition']
+    assert response.is_streamed
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [int(row['id']) for row in rows] == student_ids
+    assert rows[0]['has_fingerprint'] == 'True'
+    assert rows[0]['room_number'] == '101' and rows[0]['block'] == 'A'
+    assert rows[1]['has_fingerprint'] == 'False' and rows[1]['room_number'] == ''
+
+
+def test_header_is_sent_before_the_first_row(app):
+    populate(3)
+    chunks = export_roster('csv')
+    assert next(chunks).startswith('id,roll_number,name,email')
+    assert len(list(chunks)) == 1
+
+
+def test_ndjson_sends_each_row_as_it_is_read(app):
+    student_ids = populate(EXPORT_BATCH_SIZE + 3)
+    chunks = export_roster('ndjson')
+    assert json.loads(next(chunks))['id'] == student_ids[0]
+    assert len(list(chunks)) == len(student_ids) - 1
+
+
+def test_ndjson_export_with_filters(app, headers):
+    populate(20)
+    client = app.test_client()
+
+    response = client.get('/api/admin/students/export?format=ndjson&approved=true&has_fingerprint=false',
+                          headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    students = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(students) == 9
+    assert all(student['is_approved'] and not student['has_fingerprint'] for student in students)
+    assert students[0]['email'] == 's2@example.com'
+
+
+def test_invalid_format_and_non_admin(app, headers):
+    client = app.test_client()
+    assert client.get('/api/admin/students/export?format=xml', headers=headers).status_code == 400
+
+    user = User(name='Student', email='student@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    student_headers = {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+    assert client.get('/api/admin/students/export', headers=student_headers).status_code == 403
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
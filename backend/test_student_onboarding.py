@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk student onboarding from CSV
+"""
+
+import io
+import json
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from app import db
+from app.models import User, Student
+from app.student_search import search_students
+from conftest import TestConfig
+
+
+@pytest.fixture
+def app_config():
+    class OnboardingConfig(TestConfig):
+        ONBOARDING_HASH_WORKERS = 2
+    return OnboardingConfig
+
+
+def upload(client, headers, text, credentials='temporary_password'):
+    data = {'file': (io.BytesIO(text.encode('utf-8')), 'students.csv'), 'credentials': credentials}
+    response = client.post('/api/admin/students/import', data=data, headers=headers,
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.is_streamed
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_import_issues_temporary_passwords(app, headers):
+    rows = ['name,email,roll_number,course,date_of_birth']
+    rows += [f'Student {i},student{i}@college.edu,,CSE,2004-01-0{i % 9 + 1}' for i in range(6)]
+    rows += ['Duplicate,student0@college.edu,,CSE,', 'No Email,,,CSE,', 'Bad Date,bad@college.edu,,CSE,01/02/2004',
+             'Given Roll,given@college.edu,ADM001,ECE,']
+    client = app.test_client()
+
+    lines = upload(client, headers, '\n'.join(rows))
+    errors = [line for line in lines if line['type'] == 'error']
+    created = [line for line in lines if line['type'] == 'student']
+    assert [line['line'] for line in errors] == [8, 9, 10]
+    assert len(created) == 7
+    assert lines[-1] == {'type': 'summary', 'total': 10, 'created': 7, 'failed': 3}
+    assert any(line['type'] == 'progress' for line in lines)
+
+    student = db.session.get(Student, created[0]['student_id'])
+    assert student.roll_number == f"HMS{created[0]['user_id']:04d}"
+    assert student.course == 'CSE' and not student.is_approved
+    assert created[-1]['roll_number'] == 'ADM001'
+    assert search_students('given')[0]['roll_number'] == 'ADM001'
+
+    response = client.post('/api/login', json={'email': created[0]['email'], 'password': created[0]['temporary_password']})
+    assert response.status_code == 200
+
+
+def test_import_issues_reset_links(app, headers):
+    client = app.test_client()
+    lines = upload(client, headers, 'name,email\nLink Student,link@college.edu\n', credentials='reset_link')
+    created = [line for line in lines if line['type'] == 'student']
+    assert 'temporary_password' not in created[0]
+
+    token = parse_qs(urlparse(created[0]['reset_link']).query)['token'][0]
+    response = client.post('/api/reset-password', json={'password': 'NewPass@123'},
+                           headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    response = client.post('/api/login', json={'email': 'link@college.edu', 'password': 'NewPass@123'})
+    assert response.status_code == 200
+
+    # The link is spent, and was never a login
+    response = client.post('/api/reset-password', json={'password': 'Again@123'},
+                           headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 400
+    response = client.get('/api/complaints', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+
+
+def test_existing_emails_match_in_any_case(app, headers):
+    db.session.add(User(name='Old Account', email='Mixed.Case@College.edu', password_hash='x'))
+    db.session.commit()
+    lines = upload(app.test_client(), headers, 'name,email\nNew Account,mixed.case@college.edu\n')
+    assert lines[0]['type'] == 'error' and 'already registered' in lines[0]['message']
+    assert lines[-1]['created'] == 0
+    assert User.query.count() == 2
+
+
+def test_missing_columns_are_rejected_before_streaming(app, headers):
+    data = {'file': (io.BytesIO(b'full_name,mail\nA,b\n'), 'students.csv')}
+    response = app.test_client().post('/api/admin/students/import', data=data, headers=headers,
+                                      content_type='multipart/form-data')
+    assert response.status_code == 400
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the joined, keyset-paginated student listings
+"""
+
+
+import pytest
+
+from app import db
+from app.models import User, Room, Student, FingerprintData
+
+
+def populate():
+    room = Room(room_number='101', room_type='Double', capacity=40)
+    db.session.add(room)
+    db.session.flush()
+    for i in range(30):
+        user = User(name=f'Student {i}', email=f's{i}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        approved = i < 24
+        student = Student(
+            user_id=user.id, roll_number=f'R{i:03d}', course='CSE' if i % 2 else 'ECE',
+            is_approved=approved, is_enrollment_requested=True,
+            room_id=room.id if approved and i % 3 else None,
+            status='inactive' if i == 5 else 'active'
+        )
+        db.session.add(student)
+        db.session.flush()
+        if i % 4 == 0:
+            db.session.add(FingerprintData(student_id=student.id, right_thumb_template='x' * 1000))
+    db.session.commit()
+    return room.id
+
+
+def test_pages_match_the_full_listing(app, headers, count_queries):
+    room_id = populate()
+    client = app.test_client()
+
+    with count_queries() as statements:
+        full = client.get('/api/admin/students/approved', headers=headers).get_json()
+    assert len(full) == 24
+    # Token user lookup plus one listing query, however many students there are
+    assert len(statements) <= 3
+    assert full[1]['room_number'] == '101' and 'room_number' not in full[0]
+    assert full[0]['has_fingerprint'] is True and full[1]['has_fingerprint'] is False
+    assert set(full[0]) >= {'id', 'name', 'email', 'roll_number', 'course', 'status', 'has_fingerprint'}
+
+    pages, after_id = [], None
+    while True:
+        url = '/api/admin/students/approved?limit=10' + (f'&after_id={after_id}' if after_id else '')
+        response = client.get(url, headers=headers)
+        pages.extend(response.get_json())
+        after_id = response.headers.get('X-Next-After-Id')
+        if not after_id:
+            break
+    assert pages == full
+
+    pending = client.get('/api/admin/students/pending', headers=headers).get_json()
+    assert [s['roll_number'] for s in pending] == [f'R{i:03d}' for i in range(24, 30)]
+
+
+def test_filters(app, headers):
+    room_id = populate()
+    client = app.test_client()
+
+    def ids(query):
+        response = client.get(f'/api/admin/students/approved?{query}', headers=headers)
+        return [s['roll_number'] for s in response.get_json()]
+
+    assert ids('course=cse') == [f'R{i:03d}' for i in range(24) if i % 2]
+    assert ids(f'room_id={room_id}') == [f'R{i:03d}' for i in range(24) if i % 3]
+    assert ids('status=inactive') == ['R005']
+    assert ids('has_fingerprint=true') == [f'R{i:03d}' for i in range(24) if i % 4 == 0]
+    assert len(ids('has_fingerprint=false')) == 18
+    assert client.get('/api/admin/students/approved?limit=0', headers=headers).status_code == 400
+
+
+def test_listings_never_read_fingerprint_templates(app, headers, count_queries):
+    populate()
+    client = app.test_client()
+
+    with count_queries() as statements:
+        for url in ('/api/admin/students/approved', '/api/admin/students/pending',
+                    '/api/admin/students/changes', '/api/admin/students/export'):
+            assert client.get(url, headers=headers).status_code == 200
+        students = [student.to_dict() for student in Student.query.all()]
+
+    assert sum(student['has_fingerprint'] for student in students) == 8
+    assert statements and not any('thumb_template' in statement for statement in statements)
+
+
+def test_has_fingerprint_follows_enrollment(app):
+    user = User(name='New', email='new@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number='NEW')
+    db.session.add(student)
+    db.session.commit()
+    assert student.to_dict()['has_fingerprint'] is False
+
+    db.session.add(FingerprintData(student_id=student.id, left_thumb_template='x'))
+    db.session.commit()
+    assert student.to_dict()['has_fingerprint'] is True
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process student typeahead index
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, update
+
+from app import db
+from app.models import User, Student, StudentTombstone
+from app import student_search
+from app.student_search import search_students, build_student_index, CATCH_UP_SECONDS
+
+FIRST = ['arjun', 'priya', 'rahul', 'sneha', 'vikram', 'ananya', 'karthik', 'divya', 'rohan', 'meera']
+LAST = ['sharma', 'reddy', 'iyer', 'gupta', 'nair', 'rao', 'patel', 'singh', 'das', 'menon']
+COURSES = ['Computer Science', 'Mechanical Engineering', 'Civil Engineering', 'Electronics', 'Biotechnology']
+
+
+def populate(count):
+    db.session.execute(insert(User), [{
+        'name': f'{FIRST[i % 10]} {LAST[i // 10 % 10]} {i}',
+        'email': f'student{i}@college.edu',
+        'password_hash': 'x'
+    } for i in range(count)])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.role == 'student').order_by(User.id)]
+    db.session.execute(insert(Student), [{
+        'user_id': user_id,
+        'roll_number': f'HMS{i:05d}',
+        'course': COURSES[i % 5],
+        'contact_number': f'+91 98{i:08d}',
+        'is_approved': i % 2 == 0
+    } for i, user_id in enumerate(user_ids)])
+    db.session.commit()
+
+
+def test_prefix_search_over_twenty_thousand_students(app, count_queries):
+    populate(20000)
+    started = time.perf_counter()
+    build_student_index()  # as at startup
+    print(f"Index built in {time.perf_counter() - started:.2f}s")
+
+    queries = ['pri', 'student123', 'hms0042', 'mech', 'priya red', '9800001', 'zzz', 'a']
+    with count_queries() as statements:
+        started = time.perf_counter()
+        for _ in range(100):
+            for q in queries:
+                search_students(q)
+        total = time.perf_counter() - started
+    elapsed = total / (100 * len(queries))
+    print(f"Average search: {elapsed * 1000:.3f} ms")
+    # Only the catch-up queries, at most two per second
+    assert len(statements) <= 2 * (int(total / CATCH_UP_SECONDS) + 1)
+    assert elapsed < 0.001
+
+    results = search_students('priya red')
+    assert len(results) == 20
+    assert all(r['name'].startswith('priya reddy') for r in results)
+    assert [r['roll_number'] for r in search_students('hms0004')] == [f'HMS0004{i}' for i in range(10)]
+    assert search_students('student12345@')[0]['roll_number'] == 'HMS12345'
+    assert search_students('9800000042')[0]['roll_number'] == 'HMS00042'
+    assert search_students('zzz') == []
+
+
+def test_index_follows_commits(app, headers):
+    client = app.test_client()
+
+    user = User(name='Zoya Khan', email='zk@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number='HMS99999', course='Physics')
+    db.session.add(student)
+    db.session.commit()
+
+    response = client.get('/api/admin/students/search?q=zoy', headers=headers)
+    assert [r['roll_number'] for r in response.get_json()] == ['HMS99999']
+
+    user.name = 'Yara Khan'
+    student.course = 'Chemistry'
+    db.session.commit()
+    assert search_students('zoy') == []
+    assert search_students('yara chem')[0]['course'] == 'Chemistry'
+
+    db.session.delete(student)
+    db.session.commit()
+    assert search_students('yara') == []
+
+    # Uncommitted changes are not indexed
+    user.name = 'Xena Khan'
+    db.session.flush()
+    db.session.rollback()
+    assert search_students('xena') == []
+
+
+def test_index_catches_up_with_other_processes(app, monkeypatch):
+    monkeypatch.setattr(student_search, 'CATCH_UP_SECONDS', 0)
+    assert search_students('wanda') == []
+
+    # Another worker writes on its own connection; this process sees no session events
+    with db.engine.begin() as connection:
+        user_id = connection.execute(insert(User).values(
+            name='Wanda Lee', email='wl@example.com', password_hash='x')).inserted_primary_key[0]
+        student_id = connection.execute(insert(Student).values(
+            user_id=user_id, roll_number='HMS77777', course='Physics')).inserted_primary_key[0]
+    assert [r['roll_number'] for r in search_students('wanda')] == ['HMS77777']
+
+    with db.engine.begin() as connection:
+        connection.execute(update(User).where(User.id == user_id).values(name='Vera Lee'))
+        connection.execute(update(Student).where(Student.id == student_id).values(updated_at=datetime.utcnow()))
+    assert search_students('wanda') == []
+    assert search_students('vera')[0]['id'] == student_id
+
+    with db.engine.begin() as connection:
+        connection.execute(delete(Student).where(Student.id == student_id))
+        connection.execute(insert(StudentTombstone).values(student_id=student_id, deleted_at=datetime.utcnow()))
+    assert search_students('vera') == []
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q', '-s']))
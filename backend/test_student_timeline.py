@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the merged, cursor-paginated student timeline
+"""
+
+import random
+from datetime import datetime, timedelta, date
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import User, Student, Attendance, Fee, Complaint, LeaveRequest, FeeNotification
+
+
+def make_student(name):
+    user = User(name=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, roll_number=name, is_approved=True)
+    db.session.add(student)
+    db.session.flush()
+    return student
+
+
+def populate(student, count, seed=0):
+    """Add count events spread over the five sources, some sharing a timestamp"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        at = start + timedelta(hours=rng.randrange(count // 2))
+        kind = rng.randrange(5)
+        if kind == 0:
+            db.session.add(Attendance(student_id=student.id, date=at.date(), status='Present', timestamp=at))
+        elif kind == 1:
+            db.session.add(Fee(student_id=student.id, description=f'Fee {i}', amount=100, created_at=at))
+        elif kind == 2:
+            db.session.add(Complaint(subject=f'Complaint {i}', details='x', user_id=student.user_id, created_at=at))
+        elif kind == 3:
+            db.session.add(LeaveRequest(student_id=student.id, start_date=date(2026, 2, 1),
+                                        end_date=date(2026, 2, 2), reason='x', created_at=at))
+        else:
+            db.session.add(FeeNotification(student_id=student.id, title=f'Notice {i}', content='x', created_at=at))
+    db.session.commit()
+
+
+def all_events(student):
+    events = []
+    for model, owner, time in ((Attendance, Attendance.student_id, 'timestamp'),
+                               (Complaint, Complaint.user_id, 'created_at'),
+                               (Fee, Fee.student_id, 'created_at'),
+                               (FeeNotification, FeeNotification.student_id, 'created_at'),
+                               (LeaveRequest, LeaveRequest.student_id, 'created_at')):
+        owner_id = student.user_id if model is Complaint else student.id
+        events += [(getattr(row, time), model.__tablename__, row.id)
+                   for row in model.query.filter(owner == owner_id)]
+    return events
+
+
+def test_pages_walk_the_merged_timeline(app, headers):
+    student = make_student('alice')
+    other = make_student('bob')
+    populate(student, 300)
+    populate(other, 50, seed=1)
+    expected = sorted(all_events(student), key=lambda e: e[0], reverse=True)
+    client = app.test_client()
+
+    seen, before = [], None
+    while True:
+        url = f'/api/admin/students/{student.id}/timeline?limit=40'
+        if before:
+            url += f'&before={before}'
+        data = client.get(url, headers=headers).get_json()
+        assert len(data['events']) <= 40
+        seen += [(datetime.strptime(e['timestamp'], '%Y-%m-%d %H:%M:%S'), e['type'], e['id'])
+                 for e in data['events']]
+        before = data['next_before']
+        if not before:
+            break
+
+    assert len(seen) == 300
+    assert len(set((t, i) for _, t, i in seen)) == 300
+    assert [e[0] for e in seen] == [e[0] for e in expected]
+    assert sorted(seen) == sorted(expected)
+
+
+def test_a_page_reads_only_what_it_needs(app, count_queries):
+    student = make_student('alice')
+    populate(student, 2000)
+    from app.timeline import student_timeline
+
+    loaded = []
+    load_listener = lambda target, context: loaded.append(target)
+    models = (Attendance, Fee, Complaint, LeaveRequest, FeeNotification)
+    for model in models:
+        event.listen(model, 'load', load_listener)
+    try:
+        with count_queries() as fetched:
+            events, cursor = student_timeline(student, limit=50)
+    finally:
+        for model in models:
+            event.remove(model, 'load', load_listener)
+
+    assert len(events) == 50 and cursor
+    # Far fewer rows than the 2000 on file, and a handful of queries
+    assert len(loaded) < 150
+    assert len(fetched) < 20
+
+
+def test_bad_cursor_and_missing_student(app, headers):
+    student = make_student('alice')
+    db.session.commit()
+    client = app.test_client()
+    response = client.get(f'/api/admin/students/{student.id}/timeline?before=garbage', headers=headers)
+    assert response.status_code == 400
+    response = client.get(f'/api/admin/students/{student.id}/timeline?limit=0', headers=headers)
+    assert response.status_code == 400
+    assert client.get('/api/admin/students/9999/timeline', headers=headers).status_code == 404
+    data = client.get(f'/api/admin/students/{student.id}/timeline', headers=headers).get_json()
+    assert data == {'student_id': student.id, 'events': [], 'next_before': None}
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,56 @@
+import React, { useState } from 'react';
+import { MessageSquare } from 'lucide-react';
+
+interface ReplyPreviewProps {
+  complaint: any;
+  onExpand: (complaintId: number) => Promise<void>;
+  formatDate: (dateString: string) => string;
+}
+
+/**
+ * A complaint from a listing page carries only its reply count and a preview
+ * of the last reply; the full thread is fetched when the reader expands it.
+ */
+const ReplyPreview: React.FC<ReplyPreviewProps> = ({ complaint, onExpand, formatDate }) => {
+  const [expanding, setExpanding] = useState(false);
+  const reply = complaint.last_reply;
+
+  if (!reply) {
+    return <p className="text-sm text-gray-500">No replies yet</p>;
+  }
+
+  const expand = async () => {
+    setExpanding(true);
+    try {
+      await onExpand(complaint.id);
+    } finally {
+      setExpanding(false);
+    }
+  };
+
+  return (
+    <div className="space-y-2">
+      <div className={`p-3 rounded-lg ${reply.is_admin ? 'bg-blue-50 ml-4' : 'bg-gray-50'}`}>
+        <div className="flex items-center gap-2 mb-1">
+          <span className={`font-medium ${reply.is_admin ? 'text-blue-600' : 'text-gray-800'}`}>
+            {reply.user_name} {reply.is_admin && '(Admin)'}
+          </span>
+          <span className="text-xs text-gray-500">• {formatDate(reply.created_at)}</span>
+        </div>
+        <p className="text-gray-700">{reply.content}</p>
+      </div>
+      <button
+        onClick={expand}
+        disabled={expanding}
+        className="text-sm flex items-center gap-1 text-blue-500 hover:text-blue-700 disabled:opacity-50"
+      >
+        <MessageSquare size={14} />
+        {expanding
+          ? "Loading..."
+          : complaint.reply_count > 1 ? `View all ${complaint.reply_count} replies` : "View reply"}
+      </button>
+    </div>
+  );
+};
+
+export default ReplyPreview;
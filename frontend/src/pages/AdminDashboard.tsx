@@ -2,6 +2,8 @@ import { FileText, Bed, Users, Wallet, Calendar, MessageSquare, UserCheck, LogOu
 import { useEffect, useState, useRef, useCallback } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
 import api, { directFetch } from "../utils/api";
+import { fetchComplaintPage, fetchReplies, withReply, fetchAllComplaintIds, fetchComplaintCount } from "../utils/complaints";
+import ReplyPreview from "../components/ReplyPreview";
 import { logout, isAdmin, getUserInfo } from "../utils/auth";
 import ProfileAvatar from "../components/ProfileAvatar";
 import BackgroundSlideshow from "../components/BackgroundSlideshow";
@@ -65,9 +67,9 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
     const fetchComplaints = async () => {
       try {
         setLoading(true);
-        const response = await api.get('/complaints');
         // Get the 5 most recent complaints
-        const recentComplaints = response.data.slice(0, 5);
+        const page = await fetchComplaintPage(5);
+        const recentComplaints = page.complaints;
         setComplaints(recentComplaints);
         
         // Mark complaints as viewed
@@ -80,7 +82,7 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
           console.error('Failed to mark complaints as viewed:', apiErr);
           // Fallback to localStorage method
           try {
-            const allComplaintIds = response.data.map((c: any) => c.id);
+            const allComplaintIds = await fetchAllComplaintIds();
             localStorage.setItem('viewedComplaints', JSON.stringify(allComplaintIds));
             // Still dispatch the event even with the fallback method
             window.dispatchEvent(new CustomEvent('complaints-viewed'));
@@ -112,6 +114,20 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
     navigate(`/admin/student-management/${studentId}`);
   };
   
+  // The listing only carries a preview of the last reply; load the thread on demand
+  const expandThread = async (complaintId: number) => {
+    try {
+      const replies = await fetchReplies(complaintId);
+      setComplaints(prev => prev.map(c => c.id === complaintId ? { ...c, replies } : c));
+    } catch (err) {
+      console.error('Failed to load replies:', err);
+      notify.error(
+        "Loading Failed", 
+        "Failed to load the replies. Please try again later."
+      );
+    }
+  };
+
   const handleReply = (complaintId: number) => {
     setReplyingTo(complaintId);
     setReplyContent("");
@@ -132,10 +148,7 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
       setComplaints(prev => 
         prev.map(c => {
           if (c.id === complaintId) {
-            return {
-              ...c,
-              replies: [...(c.replies || []), response.data]
-            };
+            return withReply(c, response.data);
           }
           return c;
         })
@@ -247,10 +260,7 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
               setComplaints(prev => 
                 prev.map(c => {
                   if (c.id === complaintId) {
-                    return {
-                      ...c,
-                      replies: [...(c.replies || []), response.data]
-                    };
+                    return withReply(c, response.data);
                   }
                   return c;
                 })
@@ -357,6 +367,9 @@ const RecentComplaints = ({ onClose }: { onClose: () => void }) => {
               <div className="mt-4 pl-14">
                 {/* Existing replies */}
                 <div className="space-y-3">
+                  {complaint.replies === undefined && (
+                    <ReplyPreview complaint={complaint} onExpand={expandThread} formatDate={formatDate} />
+                  )}
                   {complaint.replies?.map((reply: any) => (
                     <div 
                       key={reply.id}
@@ -490,15 +503,14 @@ const AdminDashboard = () => {
       console.error("Failed to check for new complaints:", err);
       // Fallback to old localStorage method if API fails
       try {
-        const response = await api.get('/complaints');
-        const allComplaints = response.data;
+        const allComplaintIds = await fetchAllComplaintIds();
         
         // Update total complaint count
-        setComplaintCount(allComplaints.length);
+        setComplaintCount(allComplaintIds.length);
         
         // Calculate unviewed complaints using localStorage as fallback
         const viewedComplaints = JSON.parse(localStorage.getItem('viewedComplaints') || '[]');
-        const unviewedCount = allComplaints.filter((complaint: any) => !viewedComplaints.includes(complaint.id)).length;
+        const unviewedCount = allComplaintIds.filter((id: number) => !viewedComplaints.includes(id)).length;
         setUnviewedComplaintCount(unviewedCount);
       } catch (fallbackErr) {
         console.error("Fallback complaint check also failed:", fallbackErr);
@@ -668,11 +680,9 @@ const AdminDashboard = () => {
         
         // Fetch complaints count
         try {
-          const complaintsResponse = await api.get('/complaints');
-          console.log("Complaints response:", complaintsResponse.data);
-          
           // Set total complaint count
-          setComplaintCount(complaintsResponse.data.length);
+          const total = await fetchComplaintCount();
+          setComplaintCount(total);
           
           // Get unviewed complaint count from API
           try {
@@ -683,8 +693,9 @@ const AdminDashboard = () => {
             console.error("Failed to get unviewed count from API, using fallback:", countErr);
             // Fallback to localStorage method if API fails
             const viewedComplaints = JSON.parse(localStorage.getItem('viewedComplaints') || '[]');
-            const unviewedCount = complaintsResponse.data.filter((complaint: any) => 
-              !viewedComplaints.includes(complaint.id)
+            const allComplaintIds = await fetchAllComplaintIds();
+            const unviewedCount = allComplaintIds.filter((id: number) => 
+              !viewedComplaints.includes(id)
             ).length;
             setUnviewedComplaintCount(unviewedCount);
           }
@@ -781,9 +792,8 @@ const AdminDashboard = () => {
       .catch(err => {
         console.error('Failed to mark complaints as viewed via API:', err);
         // Fallback to localStorage method
-        api.get('/complaints')
-          .then(response => {
-            const allComplaintIds = response.data.map((c: any) => c.id);
+        fetchAllComplaintIds()
+          .then(allComplaintIds => {
             localStorage.setItem('viewedComplaints', JSON.stringify(allComplaintIds));
             console.log('Marked complaints as viewed via localStorage fallback');
           })
@@ -856,9 +866,8 @@ const AdminDashboard = () => {
           .catch(err => {
             console.error('Failed to mark complaints as viewed via API:', err);
             // Fallback to localStorage method
-            api.get('/complaints')
-              .then(response => {
-                const allComplaintIds = response.data.map((c: any) => c.id);
+            fetchAllComplaintIds()
+              .then(allComplaintIds => {
                 localStorage.setItem('viewedComplaints', JSON.stringify(allComplaintIds));
                 console.log('Marked complaints as viewed via localStorage fallback');
               })
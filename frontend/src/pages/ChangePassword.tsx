@@ -18,6 +18,12 @@ const ChangePassword = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
+    // Reset links issued to imported students carry the token in the URL
+    const linkToken = new URLSearchParams(window.location.search).get('token');
+    if (linkToken) {
+      localStorage.setItem('resetToken', linkToken);
+    }
+
     // Check if we have a reset token
     const resetToken = localStorage.getItem('resetToken');
     if (!resetToken) {
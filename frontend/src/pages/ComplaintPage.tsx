@@ -1,6 +1,8 @@
 import { useState, useEffect } from "react";
 import { MessageSquare, Edit, Trash2, Reply, Send, Save, X } from "lucide-react";
 import api from "../utils/api";
+import { fetchComplaintPage, fetchAllComplaintIds, fetchReplies, withReply } from "../utils/complaints";
+import ReplyPreview from "../components/ReplyPreview";
 import { getUserInfo } from "../utils/auth";
 import ProfileAvatar from "../components/ProfileAvatar";
 import { useNavigate } from "react-router-dom";
@@ -16,6 +18,9 @@ interface Complaint {
   details: string;
   created_at: string;
   updated_at: string;
+  // Listing pages carry reply_count and last_reply; replies once the thread is loaded
+  reply_count?: number;
+  last_reply?: Reply | null;
   replies?: Reply[];
 }
 
@@ -35,6 +40,8 @@ const ComplaintPage = () => {
   const [form, setForm] = useState({ subject: "", details: "" });
   const [complaints, setComplaints] = useState<Complaint[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextBefore, setNextBefore] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [submitting, setSubmitting] = useState(false);
   const [editingComplaint, setEditingComplaint] = useState<number | null>(null);
@@ -49,14 +56,16 @@ const ComplaintPage = () => {
   const isUserAdmin = user?.role === 'admin';
   const navigate = useNavigate();
 
-  // Fetch all complaints
+  // Fetch the first page of complaints
   useEffect(() => {
     const fetchComplaints = async () => {
       try {
         setLoading(true);
-        const response = await api.get('/complaints');
+        const page = await fetchComplaintPage();
+        const firstPage = page.complaints;
         // API returns complaints sorted by created_at in descending order (latest first)
-        setComplaints(response.data);
+        setComplaints(firstPage);
+        setNextBefore(page.nextBefore);
         
         // Mark complaints as viewed if user is admin
         const userInfo = getUserInfo();
@@ -68,7 +77,7 @@ const ComplaintPage = () => {
             window.dispatchEvent(new CustomEvent('complaints-viewed'));
             
             // Show a subtle notification if there were new complaints
-            if (response.data.length > 0) {
+            if (firstPage.length > 0) {
               notify.info(
                 "Complaints Updated", 
                 "All complaints have been marked as viewed."
@@ -78,7 +87,7 @@ const ComplaintPage = () => {
             console.error('Failed to mark complaints as viewed via API:', err);
             // Fallback to localStorage
             try {
-              const allComplaintIds = response.data.map((c: any) => c.id);
+              const allComplaintIds = await fetchAllComplaintIds();
               localStorage.setItem('viewedComplaints', JSON.stringify(allComplaintIds));
               // Still dispatch the event even with the fallback method
               window.dispatchEvent(new CustomEvent('complaints-viewed'));
@@ -103,6 +112,38 @@ const ComplaintPage = () => {
     fetchComplaints();
   }, []);
 
+  async function loadMore() {
+    if (!nextBefore) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchComplaintPage(20, nextBefore);
+      setComplaints(prev => [...prev, ...page.complaints]);
+      setNextBefore(page.nextBefore);
+    } catch (err) {
+      console.error('Failed to load more complaints:', err);
+      notify.error(
+        "Loading Failed", 
+        "Failed to load more complaints. Please try again later."
+      );
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  // The listing only carries a preview of the last reply; load the thread on demand
+  const expandThread = async (complaintId: number) => {
+    try {
+      const replies = await fetchReplies(complaintId);
+      setComplaints(prev => prev.map(c => c.id === complaintId ? { ...c, replies } : c));
+    } catch (err) {
+      console.error('Failed to load replies:', err);
+      notify.error(
+        "Loading Failed", 
+        "Failed to load the replies. Please try again later."
+      );
+    }
+  };
+
   function handleChange(key: string, value: string) {
     setForm((prev) => ({ ...prev, [key]: value }));
   }
@@ -276,10 +317,7 @@ const ComplaintPage = () => {
       setComplaints(prev => 
         prev.map(c => {
           if (c.id === complaintId) {
-            return {
-              ...c,
-              replies: [...(c.replies || []), response.data]
-            };
+            return withReply(c, response.data);
           }
           return c;
         })
@@ -405,10 +443,7 @@ const ComplaintPage = () => {
               setComplaints(prev => 
                 prev.map(c => {
                   if (c.id === complaintId) {
-                    return {
-                      ...c,
-                      replies: [...(c.replies || []), response.data]
-                    };
+                    return withReply(c, response.data);
                   }
                   return c;
                 })
@@ -615,7 +650,9 @@ const ComplaintPage = () => {
                   
                   {/* Replies list */}
                   <div className="space-y-4">
-                    {complaint.replies && complaint.replies.length > 0 ? (
+                    {complaint.replies === undefined ? (
+                      <ReplyPreview complaint={complaint} onExpand={expandThread} formatDate={formatDate} />
+                    ) : complaint.replies.length > 0 ? (
                       complaint.replies.map(reply => (
                         <div key={reply.id} className={`flex items-start gap-3 ${reply.is_admin ? 'ml-4' : ''}`}>
                           <ProfileAvatar
@@ -715,6 +752,19 @@ const ComplaintPage = () => {
                 </div>
               </div>
             ))}
+            
+            {/* Older complaints are fetched a page at a time */}
+            {nextBefore && (
+              <div className="flex justify-center">
+                <button 
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 bg-gray-100 text-gray-700 rounded-md text-sm hover:bg-gray-200 disabled:opacity-50"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1,6 +1,8 @@
 import { Info, Bed, Wallet, FileText, Calendar, MessageSquare, Clock, User, Book, MapPin, LogOut, Users, Edit, Check, X, Phone, Cake, Trash2, Reply, Send, Upload, Camera, Save, Home, Settings, RefreshCw } from "lucide-react";
 import { useState, useEffect, useCallback } from "react";
 import api, { directFetch, updateStudentProfile, uploadProfilePicture } from "../utils/api";
+import { fetchComplaintPage, fetchReplies, withReply } from "../utils/complaints";
+import ReplyPreview from "../components/ReplyPreview";
 import { logout, getUserInfo } from "../utils/auth";
 import { useNavigate } from "react-router-dom";
 import { notify } from "../utils/notifications";
@@ -165,9 +167,9 @@ const RecentComplaints = () => {
     const fetchComplaints = async () => {
       try {
         setLoading(true);
-        const response = await api.get('/complaints');
         // Get the 5 most recent complaints
-        const recentComplaints = response.data.slice(0, 5);
+        const page = await fetchComplaintPage(5);
+        const recentComplaints = page.complaints;
         setComplaints(recentComplaints);
       } catch (err) {
         console.error('Failed to fetch complaints:', err);
@@ -269,6 +271,20 @@ const RecentComplaints = () => {
     }
   };
 
+  // The listing only carries a preview of the last reply; load the thread on demand
+  const expandThread = async (complaintId: number) => {
+    try {
+      const replies = await fetchReplies(complaintId);
+      setComplaints(prev => prev.map(c => c.id === complaintId ? { ...c, replies } : c));
+    } catch (err) {
+      console.error('Failed to load replies:', err);
+      notify.error(
+        "Loading Failed", 
+        "Failed to load the replies. Please try again later."
+      );
+    }
+  };
+
   const handleReply = (complaintId: number) => {
     setReplyingTo(complaintId);
     setReplyContent("");
@@ -287,10 +303,7 @@ const RecentComplaints = () => {
       setComplaints(prev => 
         prev.map(c => {
           if (c.id === complaintId) {
-            return {
-              ...c,
-              replies: [...(c.replies || []), response.data]
-            };
+            return withReply(c, response.data);
           }
           return c;
         })
@@ -438,6 +451,9 @@ const RecentComplaints = () => {
               <div className="mt-4 pl-14 border-t pt-4">
                 {/* Existing replies */}
                 <div className="space-y-3">
+                  {complaint.replies === undefined && (
+                    <ReplyPreview complaint={complaint} onExpand={expandThread} formatDate={formatDate} />
+                  )}
                   {complaint.replies?.map((reply: any) => (
                     <div 
                       key={reply.id}
@@ -661,6 +677,7 @@ const StudentDashboard = () => {
         
         // Check for approval status change and show notification
         await checkForApprovalNotification(data);
+        await showRoomNotifications();
         
         setStudent(data);
         setProfileForm({
@@ -695,6 +712,20 @@ const StudentDashboard = () => {
     }
   }, []);  // Empty dependency array as this only needs to run once on mount
   
+  // Show unread room notifications (e.g. a seat allocated from the waitlist) once
+  const showRoomNotifications = async () => {
+    try {
+      const response = await api.get('/student/room-notifications');
+      const unread = response.data.filter((notification: any) => !notification.is_read);
+      for (const notification of unread) {
+        notify.success(notification.title, notification.content, { duration: 10000 });
+        await api.post(`/student/room-notifications/${notification.id}/read`);
+      }
+    } catch (err) {
+      console.error('Failed to fetch room notifications:', err);
+    }
+  };
+  
   // Function to check for approval notifications and show toast
   const checkForApprovalNotification = async (studentData: StudentProfile) => {
     try {
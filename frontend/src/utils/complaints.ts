@@ -0,0 +1,62 @@
+import api from './api';
+
+/**
+ * GET /complaints returns one page at a time, newest first, with a reply
+ * count and a preview of the last reply instead of the replies. The cursor
+ * of the next page comes back in the X-Next-Before header.
+ */
+export const fetchComplaintPage = async (limit = 20, before?: string | null) => {
+  const response = await api.get('/complaints', {
+    params: { limit, ...(before ? { before } : {}) }
+  });
+  return {
+    complaints: response.data as any[],
+    nextBefore: (response.headers['x-next-before'] as string | undefined) || null
+  };
+};
+
+/** Number of complaints the current user can see */
+export const fetchComplaintCount = async () => {
+  const response = await api.get('/complaints/count');
+  return response.data.count as number;
+};
+
+/** Ids of every complaint the current user can see, walking the pages */
+export const fetchAllComplaintIds = async () => {
+  const ids: number[] = [];
+  let before: string | null = null;
+  do {
+    const page = await fetchComplaintPage(100, before);
+    ids.push(...page.complaints.map(complaint => complaint.id));
+    before = page.nextBefore;
+  } while (before);
+  return ids;
+};
+
+/**
+ * Every reply of a complaint, oldest first, following the X-Next-After
+ * header of GET /complaints/:id/replies
+ */
+export const fetchReplies = async (complaintId: number) => {
+  const replies: any[] = [];
+  let after: string | null = null;
+  do {
+    const response: any = await api.get(`/complaints/${complaintId}/replies`, {
+      params: after ? { after } : {}
+    });
+    replies.push(...response.data);
+    after = response.headers['x-next-after'] || null;
+  } while (after);
+  return replies;
+};
+
+/**
+ * A complaint with a new reply. The thread is only extended once it has
+ * been loaded; until then the count and last reply preview are updated.
+ */
+export const withReply = (complaint: any, reply: any) => ({
+  ...complaint,
+  replies: complaint.replies && [...complaint.replies, reply],
+  reply_count: (complaint.reply_count || 0) + 1,
+  last_reply: reply
+});